@@ -0,0 +1 @@
+# AgentBox SDK 性能基准测试
@@ -0,0 +1,72 @@
+"""
+批量元数据操作基准测试 - 逐个调用 files.exists / get_info 与一次批量调用的耗时随路径数的变化
+
+用法:
+    python -m benchmarks.bench_batch_fs --counts 1,10,50,100 --iterations 5
+"""
+import argparse
+import time
+from typing import List, Optional
+
+from benchmarks.common import parse_list, summarize, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.batch_fs import exists_many, get_info_many, make_dirs
+
+
+DEFAULT_COUNTS = [1, 10, 50, 100]
+
+
+def run_benchmark(counts: List[int], iterations: int = 5) -> dict:
+    rows = []
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        for count in counts:
+            paths = [f"/home/user/preflight/dir_{i}" for i in range(count)]
+            make_dirs(sbx, paths)
+
+            cases = [
+                ("exists", lambda: [sbx.files.exists(p) for p in paths]),
+                ("exists_many", lambda: exists_many(sbx, paths)),
+                ("get_info", lambda: [sbx.files.get_info(p) for p in paths]),
+                ("get_info_many", lambda: get_info_many(sbx, paths)),
+            ]
+            for method, run in cases:
+                samples = []
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    run()
+                    samples.append(time.perf_counter() - start)
+                latency = summarize(samples)
+                print(f"  {count:>4} 路径 {method:<14} p50={latency['p50'] * 1000:8.1f}ms")
+                rows.append({"paths": count, "method": method, "latency": latency})
+
+            sbx.commands.run("rm -rf /home/user/preflight")
+    finally:
+        sbx.kill()
+
+    return {
+        "benchmark": "batch_fs",
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="批量元数据操作基准测试")
+    parser.add_argument(
+        "--counts",
+        type=lambda v: parse_list(v, int),
+        default=DEFAULT_COUNTS,
+        help=f"逗号分隔的路径数列表 (默认 {','.join(map(str, DEFAULT_COUNTS))})"
+    )
+    parser.add_argument("--iterations", "-n", type=int, default=5, help="重复次数 (默认 5)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.counts, args.iterations)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
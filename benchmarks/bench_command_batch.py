@@ -0,0 +1,81 @@
+"""
+批量命令执行基准测试 - N 条独立小命令逐个 commands.run 与一次 run_batch 的总耗时
+
+用法:
+    python -m benchmarks.bench_command_batch --counts 10,50,200 --parallelism 1,8
+"""
+import argparse
+import time
+from typing import List, Optional
+
+from benchmarks.common import parse_list, summarize, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.command_batch import run_batch
+
+
+DEFAULT_COUNTS = [10, 50, 200]
+
+# 模拟安装前检查: 每条命令探测一个工具或文件
+CHECKS = [
+    "command -v python3",
+    "command -v git",
+    "test -d /home/user",
+    "cat /etc/os-release",
+    "uname -r",
+]
+
+
+def run_benchmark(counts: List[int], parallelism: List[int], iterations: int = 3) -> dict:
+    rows = []
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        for count in counts:
+            commands = [f"{CHECKS[i % len(CHECKS)]} || true" for i in range(count)]
+            cases = [("commands.run", lambda: [sbx.commands.run(c) for c in commands])]
+            for p in parallelism:
+                cases.append((f"run_batch_p{p}", lambda p=p: run_batch(sbx, commands, parallelism=p)))
+
+            for method, run in cases:
+                samples = []
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    run()
+                    samples.append(time.perf_counter() - start)
+                latency = summarize(samples)
+                print(f"  {count:>4} 条命令 {method:<14} p50={latency['p50'] * 1000:9.1f}ms")
+                rows.append({"commands": count, "method": method, "latency": latency})
+    finally:
+        sbx.kill()
+
+    return {
+        "benchmark": "command_batch",
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="批量命令执行基准测试")
+    parser.add_argument(
+        "--counts",
+        type=lambda v: parse_list(v, int),
+        default=DEFAULT_COUNTS,
+        help=f"逗号分隔的命令数列表 (默认 {','.join(map(str, DEFAULT_COUNTS))})"
+    )
+    parser.add_argument(
+        "--parallelism",
+        type=lambda v: parse_list(v, int),
+        default=[1, 8],
+        help="逗号分隔的 run_batch 并行度 (默认 1,8)"
+    )
+    parser.add_argument("--iterations", "-n", type=int, default=3, help="重复次数 (默认 3)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.counts, args.parallelism, args.iterations)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
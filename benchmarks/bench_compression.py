@@ -0,0 +1,218 @@
+"""
+传输压缩基准测试 - 各算法/级别的压缩比、本地 CPU 吞吐和端到端上传耗时
+
+本地部分不需要沙箱: 对不同类型的负载测量压缩比与压缩/解压 MB/s。
+加 --upload 时额外在沙箱中对比 不压缩 / 各算法 的 write_compressed 端到端耗时。
+
+用法:
+    python -m benchmarks.bench_compression --size 16MB
+    python -m benchmarks.bench_compression --size 64MB --upload --codecs gzip,zstd
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from benchmarks.common import format_size, parse_list, parse_size, summarize, throughput, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.compression import CODECS, choose_codec, write_compressed
+
+
+DEFAULT_LEVELS = {"gzip": [1, 6, 9], "zstd": [1, 3, 9], "xz": [0, 6]}
+
+
+def make_source(size: int) -> bytes:
+    """拼接本仓库的 Python 源码，模拟代码类负载"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    chunks = []
+    for dirpath, _, names in os.walk(root):
+        for name in sorted(names):
+            if name.endswith(".py"):
+                with open(os.path.join(dirpath, name), "rb") as f:
+                    chunks.append(f.read())
+    source = b"".join(chunks) or b"print('hello')\n"
+    return (source * (size // len(source) + 1))[:size]
+
+
+def make_csv(size: int) -> bytes:
+    rng = random.Random(0)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "timestamp", "user", "amount", "status"])
+    i = 0
+    while buffer.tell() < size:
+        writer.writerow([
+            i,
+            1700000000 + i * 37,
+            f"user_{rng.randrange(5000)}",
+            f"{rng.random() * 1000:.2f}",
+            rng.choice(["ok", "failed", "pending"]),
+        ])
+        i += 1
+    return buffer.getvalue().encode()[:size]
+
+
+def make_log(size: int) -> bytes:
+    rng = random.Random(1)
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        line = (
+            f"2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z "
+            f"{rng.choice(['INFO', 'WARN', 'DEBUG'])} worker-{rng.randrange(16)} "
+            f"request_id={rng.getrandbits(64):016x} latency_ms={rng.randrange(1, 900)}\n"
+        ).encode()
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return b"".join(lines)[:size]
+
+
+def make_random(size: int) -> bytes:
+    return os.urandom(size)
+
+
+PAYLOADS = {
+    "source": make_source,
+    "csv": make_csv,
+    "log": make_log,
+    "random": make_random,
+}
+
+
+def bench_local(payload: bytes, codec_names: List[str], iterations: int) -> List[dict]:
+    """本地测量各算法/级别的压缩比和 CPU 吞吐"""
+    rows = []
+    for name in codec_names:
+        codec = CODECS[name]
+        if not codec.available:
+            print(f"⚠ 跳过 {name}: 未安装 zstandard")
+            continue
+        for level in DEFAULT_LEVELS[name]:
+            compress_samples = []
+            decompress_samples = []
+            compressed = b""
+            for _ in range(iterations):
+                start = time.perf_counter()
+                compressed = codec.compress(payload, level)
+                compress_samples.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                codec.decompress(compressed)
+                decompress_samples.append(time.perf_counter() - start)
+            rows.append({
+                "codec": name,
+                "level": level,
+                "ratio": len(compressed) / len(payload),
+                "compress_mb_per_s": throughput(len(payload), summarize(compress_samples)["p50"]),
+                "decompress_mb_per_s": throughput(len(payload), summarize(decompress_samples)["p50"]),
+                "compress_cpu_seconds": summarize(compress_samples),
+            })
+    return rows
+
+
+def bench_upload(payload: bytes, codec_names: List[str], iterations: int) -> List[dict]:
+    """在沙箱中对比不压缩与各算法的端到端上传耗时"""
+    rows = []
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        for name in [None] + codec_names:
+            if name is not None and not CODECS[name].available:
+                continue
+            samples = []
+            stats = {}
+            try:
+                for _ in range(iterations):
+                    stats = write_compressed(sbx, "/home/user/compression_bench.bin", payload, codec=name)
+                    samples.append(stats["seconds"])
+            except Exception as e:
+                print(f"❌ 上传 (codec={name}) 失败: {e}")
+                traceback.print_exc()
+                continue
+            rows.append({
+                "codec": name,
+                "level": stats.get("level"),
+                "wire_bytes": stats.get("wire_bytes"),
+                "latency": summarize(samples),
+                "effective_mb_per_s": throughput(len(payload), summarize(samples)["p50"]),
+            })
+    finally:
+        sbx.kill()
+    return rows
+
+
+def run_benchmark(
+    size: int,
+    payload_names: List[str],
+    codec_names: List[str],
+    iterations: int = 3,
+    upload: bool = False,
+) -> dict:
+    results: Dict[str, dict] = {}
+    for payload_name in payload_names:
+        payload = PAYLOADS[payload_name](size)
+        codec, level, ratio = choose_codec(payload)
+        entry = {
+            "auto_choice": {"codec": codec.name if codec else None, "level": level, "estimated_ratio": ratio},
+            "local": bench_local(payload, codec_names, iterations),
+        }
+        for row in entry["local"]:
+            print(
+                f"  {payload_name:<7} {row['codec']:<5} L{row['level']:<2} "
+                f"ratio={row['ratio']:.3f} "
+                f"compress={row['compress_mb_per_s']:8.1f} MB/s "
+                f"decompress={row['decompress_mb_per_s']:8.1f} MB/s"
+            )
+        if upload:
+            entry["upload"] = bench_upload(payload, codec_names, iterations)
+            for row in entry["upload"]:
+                print(
+                    f"  {payload_name:<7} upload codec={row['codec']} "
+                    f"p50={row['latency']['p50']:.2f}s {row['effective_mb_per_s']:.2f} MB/s"
+                )
+        results[payload_name] = entry
+
+    return {
+        "benchmark": "compression",
+        "size": size,
+        "size_label": format_size(size),
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="传输压缩基准测试")
+    parser.add_argument("--size", type=parse_size, default=parse_size("16MB"), help="负载大小 (默认 16MB)")
+    parser.add_argument(
+        "--payloads",
+        type=parse_list,
+        default=list(PAYLOADS),
+        help=f"逗号分隔的负载类型 (默认 {','.join(PAYLOADS)})"
+    )
+    parser.add_argument(
+        "--codecs",
+        type=parse_list,
+        default=list(CODECS),
+        help=f"逗号分隔的压缩算法 (默认 {','.join(CODECS)})"
+    )
+    parser.add_argument("--iterations", "-n", type=int, default=3, help="重复次数 (默认 3)")
+    parser.add_argument("--upload", action="store_true", help="同时在沙箱中测量端到端上传耗时")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    unknown = (set(args.payloads) - set(PAYLOADS)) | (set(args.codecs) - set(CODECS))
+    if unknown:
+        parser.error(f"未知负载类型或压缩算法: {', '.join(sorted(unknown))}")
+
+    report = run_benchmark(args.size, args.payloads, args.codecs, args.iterations, args.upload)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+多沙箱命令分发基准测试 - 逐个 connect + commands.run 与 fan_out 在不同并发上限下的总耗时和单沙箱延迟
+
+用法:
+    python -m benchmarks.bench_fanout --sandboxes 20 --concurrency 1,8,32
+    python -m benchmarks.bench_fanout --metadata role=web --concurrency 32,128
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.common import parse_list, write_report
+
+from ucloud_sandbox import AsyncSandbox
+
+from utils.fanout import fan_out, resolve_targets
+
+
+DEFAULT_CONCURRENCY = [1, 8, 32]
+DEFAULT_COMMAND = "cat /proc/loadavg"
+
+
+def parse_metadata(value: str) -> Dict[str, str]:
+    """解析 key=value,key=value"""
+    return dict(item.split("=", 1) for item in parse_list(value))
+
+
+async def bench_loop(ids: List[str], cmd: str) -> float:
+    """基线: 逐个连接并执行"""
+    start = time.perf_counter()
+    for sandbox_id in ids:
+        sbx = await AsyncSandbox.connect(sandbox_id)
+        await sbx.commands.run(cmd)
+    return time.perf_counter() - start
+
+
+async def bench(
+    sandboxes: int,
+    metadata: Optional[Dict[str, str]],
+    concurrency: List[int],
+    cmd: str,
+    timeout: float,
+) -> List[dict]:
+    created = []
+    if metadata is None:
+        marker = f"bench-fanout-{int(time.time())}"
+        metadata = {"bench_fanout": marker}
+        print(f"创建 {sandboxes} 个沙箱...")
+        created = await asyncio.gather(*[
+            AsyncSandbox.create(timeout=1800, metadata=metadata) for _ in range(sandboxes)
+        ])
+
+    rows = []
+    try:
+        ids = await resolve_targets(metadata=metadata)
+        print(f"目标沙箱: {len(ids)} 个")
+
+        seconds = await bench_loop(ids, cmd)
+        print(f"  逐个执行        总耗时={seconds:8.2f}s")
+        rows.append({"method": "loop", "sandboxes": len(ids), "wall_seconds": seconds})
+
+        for limit in concurrency:
+            report = await fan_out(cmd, sandbox_ids=ids, concurrency=limit, timeout=timeout)
+            latency = report["latency"]
+            print(
+                f"  fan_out c={limit:<5} 总耗时={report['wall_seconds']:8.2f}s "
+                f"p50={latency['p50'] * 1000:8.1f}ms p99={latency['p99'] * 1000:8.1f}ms "
+                f"失败={report['failed']}"
+            )
+            rows.append({
+                "method": f"fan_out_c{limit}",
+                "sandboxes": len(ids),
+                "wall_seconds": report["wall_seconds"],
+                "latency": latency,
+                "failed": report["failed"],
+                "failure_groups": {key: group["count"] for key, group in report["failure_groups"].items()},
+            })
+    finally:
+        await asyncio.gather(*[s.kill() for s in created], return_exceptions=True)
+    return rows
+
+
+def run_benchmark(
+    sandboxes: int,
+    metadata: Optional[Dict[str, str]],
+    concurrency: List[int],
+    cmd: str = DEFAULT_COMMAND,
+    timeout: float = 30,
+) -> dict:
+    return {
+        "benchmark": "fanout",
+        "command": cmd,
+        "results": asyncio.run(bench(sandboxes, metadata, concurrency, cmd, timeout)),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="多沙箱命令分发基准测试")
+    parser.add_argument("--sandboxes", type=int, default=20, help="新建的沙箱数 (默认 20，指定 --metadata 时不新建)")
+    parser.add_argument(
+        "--metadata",
+        type=parse_metadata,
+        help="使用已有沙箱: 按 key=value[,key=value] 从 Sandbox.list() 中筛选"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda v: parse_list(v, int),
+        default=DEFAULT_CONCURRENCY,
+        help=f"逗号分隔的并发上限列表 (默认 {','.join(map(str, DEFAULT_CONCURRENCY))})"
+    )
+    parser.add_argument("--command", type=str, default=DEFAULT_COMMAND, help=f"执行的命令 (默认 {DEFAULT_COMMAND!r})")
+    parser.add_argument("--timeout", type=float, default=30, help="单个沙箱的超时时间 (秒，默认 30)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.sandboxes, args.metadata, args.concurrency, args.command, args.timeout)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
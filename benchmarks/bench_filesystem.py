@@ -0,0 +1,270 @@
+"""
+文件系统吞吐基准测试 - 不同负载大小下各读写 API 的 MB/s 与单次延迟
+
+覆盖:
+    写入: 单文件 files.write (bytes / stream)、批量 files.write_files
+    读取: files.read 的 text / bytes / stream 三种格式
+    客户端: 同步 Sandbox 与异步 AsyncSandbox
+
+用法:
+    python -m benchmarks.bench_filesystem --sizes 1KB,1MB,64MB --iterations 3
+    python -m benchmarks.bench_filesystem --sizes 1KB,1GB --clients sync --output fs.json
+
+注意: 负载在本地内存中生成，1GB 负载至少需要约 2GB 可用内存。
+"""
+import argparse
+import asyncio
+import base64
+import io
+import os
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from benchmarks.common import (
+    format_size,
+    parse_list,
+    parse_size,
+    summarize,
+    throughput,
+    write_report,
+)
+
+from ucloud_sandbox import AsyncSandbox, Sandbox
+
+
+DEFAULT_SIZES = ["1KB", "64KB", "1MB", "16MB", "128MB", "1GB"]
+
+WRITE_OPS = ("write_bytes", "write_stream", "write_files_batch")
+READ_OPS = ("read_text", "read_bytes", "read_stream")
+
+BENCH_DIR = "/home/user/fs_bench"
+
+
+def make_payload(size: int) -> bytes:
+    """生成随机 ASCII 负载，既可按文本读取，又不易被传输层压缩"""
+    raw = base64.b64encode(os.urandom(size * 3 // 4 + 3))
+    return raw[:size]
+
+
+def collect(results: Dict[str, List[float]], op: str, size: int, seconds: float, count: int = 1):
+    """记录一次操作的耗时，count 为本次操作涉及的文件数"""
+    results.setdefault(op, []).append(seconds)
+    results.setdefault(f"{op}:mb_per_s", []).append(throughput(size * count, seconds))
+
+
+def bench_sync(payload: bytes, iterations: int, batch_count: int, batch_max_size: int) -> dict:
+    """同步客户端: 对单个负载大小执行全部读写操作"""
+    size = len(payload)
+    text = payload.decode()
+    path = f"{BENCH_DIR}/payload.bin"
+    samples: Dict[str, List[float]] = {}
+
+    sbx = Sandbox.create(timeout=600)
+    try:
+        sbx.files.make_dir(BENCH_DIR)
+        for _ in range(iterations):
+            start = time.perf_counter()
+            sbx.files.write(path, payload)
+            collect(samples, "write_bytes", size, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            sbx.files.write(path, io.BytesIO(payload))
+            collect(samples, "write_stream", size, time.perf_counter() - start)
+
+            if size <= batch_max_size:
+                files = [
+                    {"path": f"{BENCH_DIR}/batch_{i}.bin", "data": payload}
+                    for i in range(batch_count)
+                ]
+                start = time.perf_counter()
+                sbx.files.write_files(files)
+                collect(samples, "write_files_batch", size, time.perf_counter() - start, batch_count)
+
+            start = time.perf_counter()
+            content = sbx.files.read(path)
+            collect(samples, "read_text", size, time.perf_counter() - start)
+            assert content == text, "read_text 内容不一致"
+
+            start = time.perf_counter()
+            content = sbx.files.read(path, format="bytes")
+            collect(samples, "read_bytes", size, time.perf_counter() - start)
+            assert len(content) == size, "read_bytes 长度不一致"
+            del content
+
+            start = time.perf_counter()
+            received = sum(len(chunk) for chunk in sbx.files.read(path, format="stream"))
+            collect(samples, "read_stream", size, time.perf_counter() - start)
+            assert received == size, "read_stream 长度不一致"
+    finally:
+        sbx.kill()
+
+    return samples
+
+
+async def bench_async(payload: bytes, iterations: int, batch_count: int, batch_max_size: int) -> dict:
+    """异步客户端: 对单个负载大小执行全部读写操作"""
+    size = len(payload)
+    text = payload.decode()
+    path = f"{BENCH_DIR}/payload.bin"
+    samples: Dict[str, List[float]] = {}
+
+    sbx = await AsyncSandbox.create(timeout=600)
+    try:
+        await sbx.files.make_dir(BENCH_DIR)
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await sbx.files.write(path, payload)
+            collect(samples, "write_bytes", size, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await sbx.files.write(path, io.BytesIO(payload))
+            collect(samples, "write_stream", size, time.perf_counter() - start)
+
+            if size <= batch_max_size:
+                files = [
+                    {"path": f"{BENCH_DIR}/batch_{i}.bin", "data": payload}
+                    for i in range(batch_count)
+                ]
+                start = time.perf_counter()
+                await sbx.files.write_files(files)
+                collect(samples, "write_files_batch", size, time.perf_counter() - start, batch_count)
+
+            start = time.perf_counter()
+            content = await sbx.files.read(path)
+            collect(samples, "read_text", size, time.perf_counter() - start)
+            assert content == text, "read_text 内容不一致"
+
+            start = time.perf_counter()
+            content = await sbx.files.read(path, format="bytes")
+            collect(samples, "read_bytes", size, time.perf_counter() - start)
+            assert len(content) == size, "read_bytes 长度不一致"
+            del content
+
+            start = time.perf_counter()
+            received = 0
+            async for chunk in await sbx.files.read(path, format="stream"):
+                received += len(chunk)
+            collect(samples, "read_stream", size, time.perf_counter() - start)
+            assert received == size, "read_stream 长度不一致"
+    finally:
+        await sbx.kill()
+
+    return samples
+
+
+def summarize_samples(client: str, size: int, samples: Dict[str, List[float]]) -> List[dict]:
+    """把原始样本整理为每个 (客户端, 操作, 大小) 一行的结果"""
+    rows = []
+    for op in WRITE_OPS + READ_OPS:
+        if op not in samples:
+            continue
+        rows.append({
+            "client": client,
+            "op": op,
+            "size": size,
+            "size_label": format_size(size),
+            "latency": summarize(samples[op]),
+            "mb_per_s": summarize(samples[f"{op}:mb_per_s"]),
+        })
+    return rows
+
+
+def print_rows(rows: List[dict]):
+    for row in rows:
+        print(
+            f"  {row['client']:<5} {row['op']:<18} {row['size_label']:>6} "
+            f"p50={row['latency']['p50'] * 1000:9.1f}ms "
+            f"{row['mb_per_s']['p50']:9.2f} MB/s"
+        )
+
+
+def run_benchmark(
+    sizes: List[int],
+    clients: List[str],
+    iterations: int = 3,
+    batch_count: int = 8,
+    batch_max_size: int = 64 * 1024 ** 2,
+) -> dict:
+    """按负载大小依次执行，每个大小只在内存中保留一份负载"""
+    rows = []
+    for size in sizes:
+        payload = make_payload(size)
+        for client in clients:
+            try:
+                if client == "sync":
+                    samples = bench_sync(payload, iterations, batch_count, batch_max_size)
+                else:
+                    samples = asyncio.run(bench_async(payload, iterations, batch_count, batch_max_size))
+            except Exception as e:
+                print(f"❌ {client} 客户端在 {format_size(size)} 负载下失败: {e}")
+                traceback.print_exc()
+                continue
+            client_rows = summarize_samples(client, size, samples)
+            print_rows(client_rows)
+            rows.extend(client_rows)
+        del payload
+
+    return {
+        "benchmark": "filesystem",
+        "iterations": iterations,
+        "batch_count": batch_count,
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="文件系统吞吐基准测试")
+    parser.add_argument(
+        "--sizes",
+        type=lambda v: parse_list(v, parse_size),
+        default=[parse_size(s) for s in DEFAULT_SIZES],
+        help=f"逗号分隔的负载大小 (默认 {','.join(DEFAULT_SIZES)})"
+    )
+    parser.add_argument(
+        "--clients",
+        type=parse_list,
+        default=["sync", "async"],
+        help="逗号分隔的客户端类型: sync,async (默认两者)"
+    )
+    parser.add_argument(
+        "--iterations", "-n",
+        type=int,
+        default=3,
+        help="每个负载大小的重复次数 (默认 3)"
+    )
+    parser.add_argument(
+        "--batch-count",
+        type=int,
+        default=8,
+        help="write_files 批量写入的文件数 (默认 8)"
+    )
+    parser.add_argument(
+        "--batch-max-size",
+        type=parse_size,
+        default=parse_size("64MB"),
+        help="超过该大小的负载跳过批量写入 (默认 64MB)"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=str,
+        help="JSON 报告输出路径 (默认打印到标准输出)"
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.clients) - {"sync", "async"}
+    if unknown:
+        parser.error(f"未知客户端类型: {', '.join(sorted(unknown))}")
+
+    report = run_benchmark(
+        args.sizes,
+        args.clients,
+        args.iterations,
+        args.batch_count,
+        args.batch_max_size,
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
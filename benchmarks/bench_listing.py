@@ -0,0 +1,100 @@
+"""
+递归列目录基准测试 - files.list(depth=N) 与流式 iter_entries 的首页延迟、总耗时和返回条目数
+
+用法:
+    python -m benchmarks.bench_listing --path /usr --depth 6 --pattern '*.py'
+"""
+import argparse
+import time
+import traceback
+from typing import List, Optional
+
+from benchmarks.common import summarize, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.listing import iter_entries
+
+
+def run_benchmark(
+    path: str,
+    depth: int,
+    pattern: Optional[str] = None,
+    page_size: int = 500,
+    iterations: int = 3,
+) -> dict:
+    rows = []
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        cases = {
+            "files.list": {"total": [], "first": [], "entries": 0},
+            "iter_entries": {"total": [], "first": [], "entries": 0},
+        }
+        for _ in range(iterations):
+            try:
+                start = time.perf_counter()
+                entries = sbx.files.list(path, depth=depth)
+                elapsed = time.perf_counter() - start
+                cases["files.list"]["total"].append(elapsed)
+                cases["files.list"]["first"].append(elapsed)
+                cases["files.list"]["entries"] = len(entries)
+            except Exception as e:
+                print(f"❌ files.list 失败: {e}")
+                traceback.print_exc()
+
+            start = time.perf_counter()
+            first = None
+            count = 0
+            for page in iter_entries(sbx, path, page_size=page_size, depth=depth, pattern=pattern):
+                if first is None:
+                    first = time.perf_counter() - start
+                count += len(page)
+            total = time.perf_counter() - start
+            cases["iter_entries"]["total"].append(total)
+            cases["iter_entries"]["first"].append(first if first is not None else total)
+            cases["iter_entries"]["entries"] = count
+
+        for method, samples in cases.items():
+            if not samples["total"]:
+                continue
+            row = {
+                "method": method,
+                "entries": samples["entries"],
+                "first_page": summarize(samples["first"]),
+                "total": summarize(samples["total"]),
+            }
+            print(
+                f"  {method:<13} 条目 {row['entries']:>7} "
+                f"首页 p50={row['first_page']['p50'] * 1000:8.1f}ms "
+                f"总计 p50={row['total']['p50'] * 1000:8.1f}ms"
+            )
+            rows.append(row)
+    finally:
+        sbx.kill()
+
+    return {
+        "benchmark": "listing",
+        "path": path,
+        "depth": depth,
+        "pattern": pattern,
+        "page_size": page_size,
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="递归列目录基准测试")
+    parser.add_argument("--path", type=str, default="/usr", help="起始目录 (默认 /usr)")
+    parser.add_argument("--depth", type=int, default=4, help="遍历深度 (默认 4)")
+    parser.add_argument("--pattern", type=str, help="iter_entries 在沙箱内应用的文件名通配符")
+    parser.add_argument("--page-size", type=int, default=500, help="每页条目数 (默认 500)")
+    parser.add_argument("--iterations", "-n", type=int, default=3, help="重复次数 (默认 3)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.path, args.depth, args.pattern, args.page_size, args.iterations)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
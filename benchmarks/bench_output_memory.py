@@ -0,0 +1,157 @@
+"""
+命令输出内存基准测试 - 命令持续输出大量数据时，commands.run 与 run_bounded 的本地峰值 RSS
+
+每种方式在独立子进程中运行，运行期间定时采样 RSS，用于观察内存是否随输出量增长:
+    run        commands.run，SDK 在结果中累积全部输出 (现有做法)
+    callback   commands.run + on_stdout 回调 (回调中不保留数据)
+    bounded    utils.output_capture.run_bounded，头尾各 64KB
+    spill      run_bounded，完整输出落盘
+
+用法:
+    python -m benchmarks.bench_output_memory --size 1GB
+    python -m benchmarks.bench_output_memory --size 256MB --modes run,bounded
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+from benchmarks.bench_upload_memory import current_rss_kb, peak_rss_kb
+from benchmarks.common import format_size, parse_list, parse_size, throughput, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.output_capture import OutputCapture, run_bounded
+
+
+MODES = ["run", "callback", "bounded", "spill"]
+
+RSS_SAMPLE_INTERVAL = 0.5
+
+
+def output_command(size: int) -> str:
+    """类似编译日志的输出，共 size 字节"""
+    return f"yes 'CC src/module.c -o build/module.o [-Wall -O2]' | head -c {size}"
+
+
+def run_once(mode: str, sandbox_id: str, size: int, spill_dir: str, queue):
+    """子进程入口: 连接沙箱，按指定方式运行一次命令并回报内存数据"""
+    sbx = Sandbox.connect(sandbox_id)
+    baseline = current_rss_kb()
+    samples = []
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(RSS_SAMPLE_INTERVAL):
+            samples.append(current_rss_kb())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+
+    cmd = output_command(size)
+    if mode == "run":
+        received = len(sbx.commands.run(cmd, timeout=0).stdout)
+    elif mode == "callback":
+        counter = [0]
+        sbx.commands.run(cmd, timeout=0, on_stdout=lambda data: counter.__setitem__(0, counter[0] + len(data)))
+        received = counter[0]
+    elif mode == "bounded":
+        received = run_bounded(sbx, cmd).stdout.total_bytes
+    elif mode == "spill":
+        capture = OutputCapture(spill_path=os.path.join(spill_dir, "output.log"))
+        received = run_bounded(sbx, cmd, stdout=capture).stdout.total_bytes
+    else:
+        raise ValueError(f"未知方式: {mode}")
+
+    seconds = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    queue.put({
+        "baseline_rss_kb": baseline,
+        "peak_rss_kb": peak_rss_kb(),
+        "rss_samples_kb": samples,
+        "received_bytes": received,
+        "seconds": seconds,
+    })
+
+
+def measure(mode: str, sandbox_id: str, size: int, spill_dir: str) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=run_once, args=(mode, sandbox_id, size, spill_dir, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"子进程退出码 {process.exitcode}")
+    return result
+
+
+def run_benchmark(size: int, modes: List[str]) -> dict:
+    rows = []
+    sbx = Sandbox.create(timeout=3600)
+    try:
+        with tempfile.TemporaryDirectory() as spill_dir:
+            for mode in modes:
+                try:
+                    result = measure(mode, sbx.sandbox_id, size, spill_dir)
+                except Exception as e:
+                    print(f"❌ 方式 {mode} 失败: {e}")
+                    continue
+                growth_mb = (result["peak_rss_kb"] - result["baseline_rss_kb"]) / 1024
+                rss = result["rss_samples_kb"]
+                row = {
+                    "mode": mode,
+                    "size": size,
+                    "size_label": format_size(size),
+                    "received_bytes": result["received_bytes"],
+                    "seconds": result["seconds"],
+                    "mb_per_s": throughput(size, result["seconds"]),
+                    "baseline_rss_mb": result["baseline_rss_kb"] / 1024,
+                    "peak_rss_mb": result["peak_rss_kb"] / 1024,
+                    "peak_growth_mb": growth_mb,
+                    # 后半程与前半程的平均 RSS 之差，接近 0 表示内存平稳
+                    "rss_drift_mb": (
+                        (sum(rss[len(rss) // 2:]) / len(rss[len(rss) // 2:])
+                         - sum(rss[:len(rss) // 2]) / len(rss[:len(rss) // 2])) / 1024
+                        if len(rss) >= 2 else 0.0
+                    ),
+                    "rss_samples_mb": [kb / 1024 for kb in rss],
+                }
+                print(
+                    f"  {mode:<9} {row['size_label']:>6} peak RSS +{growth_mb:8.1f}MB "
+                    f"漂移 {row['rss_drift_mb']:+7.1f}MB {row['mb_per_s']:8.2f} MB/s"
+                )
+                rows.append(row)
+    finally:
+        sbx.kill()
+
+    return {"benchmark": "output_memory", "results": rows}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="命令输出内存基准测试")
+    parser.add_argument("--size", type=parse_size, default=parse_size("1GB"), help="命令输出总量 (默认 1GB)")
+    parser.add_argument(
+        "--modes",
+        type=parse_list,
+        default=MODES,
+        help=f"逗号分隔的方式 (默认 {','.join(MODES)})"
+    )
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"未知方式: {', '.join(sorted(unknown))}")
+
+    report = run_benchmark(args.size, args.modes)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+PTY 测试耗时基准 - test_pty_complete 中依赖输出的场景，固定 sleep (改造前) 与 PtyDriver 模式等待 (改造后) 的总耗时
+
+固定 sleep 模式同时检查 sleep 结束时期望的输出是否已经到达，未到达的次数即该写法在当前环境下的潜在不稳定次数。
+沙箱创建耗时两种写法相同，不计入。
+
+用法:
+    python -m benchmarks.bench_pty_expect --iterations 5
+"""
+import argparse
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+from benchmarks.common import summarize, write_report
+
+from ucloud_sandbox import PtySize, Sandbox
+
+from utils.pty_expect import PtyDriver
+
+
+SIZE = PtySize(rows=24, cols=80)
+
+# (场景名, 创建参数, [(输入, 改造前的 sleep 秒数, 期望输出的正则或 None)])
+SCENARIOS: List[Tuple[str, dict, List[Tuple[bytes, float, Optional[str]]]]] = [
+    ("send_stdin", {}, [
+        (b"echo 'Hello PTY'\n", 0.5, r"[\r\n]Hello PTY\r\n"),
+    ]),
+    ("interactive", {}, [
+        (b"cd /home/user\n", 0.3, None),
+        (b"pwd\n", 0.3, r"[\r\n]/home/user\r\n"),
+        (b"ls -la\n", 0.3, r"[\r\n]total \d+"),
+        (b"exit\n", 0.3, None),
+    ]),
+    ("with_envs", {"envs": {"MY_VAR": "my_value"}}, [
+        (b"echo $MY_VAR\n", 0.5, r"[\r\n]my_value\r\n"),
+    ]),
+    ("with_cwd", {"cwd": "/home/user/pty_cwd"}, [
+        (b"pwd\n", 0.3, r"[\r\n]/home/user/pty_cwd\r\n"),
+    ]),
+]
+
+
+def run_sleep(sbx: Sandbox, kwargs: dict, steps) -> int:
+    """改造前: 发送后固定 sleep，返回 sleep 结束时期望输出尚未到达的次数"""
+    handle = sbx.pty.create(size=SIZE, timeout=0, **kwargs)
+    # 只用于收集输出以检查是否到达，不参与等待
+    pty = PtyDriver(sbx, handle=handle)
+    missed = 0
+    try:
+        for data, delay, pattern in steps:
+            sbx.pty.send_stdin(handle.pid, data)
+            time.sleep(delay)
+            if pattern is not None:
+                if re.search(pattern, pty.buffer):
+                    pty.expect(pattern, timeout=0)
+                else:
+                    missed += 1
+    finally:
+        pty.close()
+    return missed
+
+
+def run_expect(sbx: Sandbox, kwargs: dict, steps) -> int:
+    """改造后: 发送后等待期望输出，没有期望输出的步骤不等待；exit 等待 PTY 退出"""
+    pty = PtyDriver(sbx, size=SIZE, **kwargs)
+    try:
+        for data, _, pattern in steps:
+            pty.send(data)
+            if pattern is not None:
+                pty.expect(pattern)
+            elif data == b"exit\n":
+                pty.wait_closed()
+    finally:
+        pty.close()
+    return 0
+
+
+def run_benchmark(iterations: int = 5) -> dict:
+    modes: List[Tuple[str, Callable]] = [("sleep", run_sleep), ("expect", run_expect)]
+    rows = []
+    totals = {mode: [0.0] * iterations for mode, _ in modes}
+
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        sbx.files.make_dir("/home/user/pty_cwd")
+        for name, kwargs, steps in SCENARIOS:
+            for mode, run in modes:
+                samples = []
+                missed = 0
+                for i in range(iterations):
+                    start = time.perf_counter()
+                    missed += run(sbx, kwargs, steps)
+                    elapsed = time.perf_counter() - start
+                    samples.append(elapsed)
+                    totals[mode][i] += elapsed
+                latency = summarize(samples)
+                print(f"  {name:<12} {mode:<7} p50={latency['p50'] * 1000:8.1f}ms 未到达={missed}")
+                rows.append({"scenario": name, "mode": mode, "latency": latency, "missed": missed})
+    finally:
+        sbx.kill()
+
+    summary = {mode: summarize(samples) for mode, samples in totals.items()}
+    print(
+        f"  模块合计 (p50): sleep={summary['sleep']['p50']:.2f}s "
+        f"expect={summary['expect']['p50']:.2f}s"
+    )
+    return {
+        "benchmark": "pty_expect",
+        "results": rows,
+        "module_total": summary,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="PTY 测试固定 sleep 与模式等待耗时对比")
+    parser.add_argument("--iterations", "-n", type=int, default=5, help="重复次数 (默认 5)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.iterations)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+PTY 往返延迟与吞吐基准 - 单字节回显延迟、批量输出吞吐、输出负载下的调整大小延迟，在同一沙箱的不同 PTY 数量下分别测量
+
+每个 PTY 由独立线程接收输出 (与同步 SDK 的用法一致)，多个 PTY 同时测量:
+- echo: PTY 中运行 `stty raw -echo; cat`，逐字节 send_stdin 并等待该字节被 cat 回显，
+  同时记录 send_stdin 调用本身的返回耗时 (请求方向) 以区分请求与输出两个方向
+- bulk: 各 PTY 同时执行 `yes | head -c 每个 PTY 的大小`，总数据量在 PTY 之间平分
+- resize: PTY 中持续输出 (每轮 64KB 后打印当前大小)，测量 pty.resize 调用返回耗时
+  以及新大小出现在输出中的耗时
+
+为区分 SDK / 传输 / 沙箱各自的耗时，同时测量两个基线:
+- commands.run("true") 的往返耗时 (不经过 PTY 的控制面请求)
+- 沙箱内 `yes | head -c 大小 > /dev/null` 的耗时 (沙箱本身产生输出的速度上限)
+
+用法:
+    python -m benchmarks.bench_pty_latency --pty-counts 1,4,16 --echo-samples 200
+    python -m benchmarks.bench_pty_latency --size 1GB --pty-counts 1,8 --resizes 20
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from benchmarks.common import format_size, parse_list, parse_size, summarize, throughput, write_report
+
+from ucloud_sandbox import PtySize, Sandbox
+
+
+SIZE = PtySize(rows=24, cols=80)
+RESIZE_SIZES = [PtySize(rows=40, cols=120), PtySize(rows=24, cols=80)]
+DEFAULT_PTY_COUNTS = [1, 4, 16]
+# 在命令中拆开标记，避免终端回显的命令行本身匹配到标记
+READY = b"__READY__"
+DONE = b"__DONE__"
+
+
+class PtyStream:
+    """一个 PTY 及其接收线程: 统计收到的字节数，并可等待输出中出现指定标记"""
+
+    def __init__(self, sbx: Sandbox, size: PtySize = SIZE):
+        self.sbx = sbx
+        self.handle = sbx.pty.create(size=size, timeout=0)
+        self.pid = self.handle.pid
+        self.received = 0
+        self._tail = b""
+        self._markers: List[bytes] = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        try:
+            self.handle.wait(on_pty=self._on_data)
+        except Exception:
+            pass
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+    def _on_data(self, data: bytes):
+        with self._cond:
+            self.received += len(data)
+            if self._markers:
+                # 只在上一块末尾 + 本块中查找，负载输出很大时也不会重复扫描
+                window = self._tail + data
+                self._markers = [m for m in self._markers if m not in window]
+            self._tail = (self._tail + data[-64:])[-64:]
+            self._cond.notify_all()
+
+    def send(self, data: bytes):
+        self.sbx.pty.send_stdin(self.pid, data)
+
+    def watch(self, marker: bytes):
+        """开始等待 marker，需在发送可能产生它的输入之前调用"""
+        with self._cond:
+            self._markers.append(marker)
+
+    def wait_marker(self, marker: bytes, timeout: float = 60):
+        with self._cond:
+            if not self._cond.wait_for(lambda: marker not in self._markers or self._closed, timeout):
+                raise TimeoutError(f"等待 {marker!r} 超时")
+            if marker in self._markers:
+                raise EOFError(f"PTY 已退出，未出现 {marker!r}")
+
+    def wait_received(self, count: int, timeout: float = 10):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.received >= count or self._closed, timeout):
+                raise TimeoutError(f"等待第 {count} 字节超时")
+
+    def start(self, command: str, marker: bytes = READY):
+        """执行命令并等待其打印 marker"""
+        self.watch(marker)
+        self.send(command.encode() + b"\n")
+        self.wait_marker(marker)
+
+    def close(self):
+        try:
+            self.sbx.pty.kill(self.pid)
+        except Exception:
+            pass
+        self._thread.join(5)
+
+
+def _split(marker: bytes) -> str:
+    text = marker.decode()
+    return f"{text[:4]}''{text[4:]}"
+
+
+def run_parallel(streams: List[PtyStream], fn: Callable[[PtyStream], object]) -> list:
+    with ThreadPoolExecutor(max_workers=len(streams)) as pool:
+        return list(pool.map(fn, streams))
+
+
+def bench_echo(streams: List[PtyStream], samples: int) -> dict:
+    """每个 PTY 逐字节发送并等待回显"""
+    def probe(stream: PtyStream):
+        stream.start(f"stty raw -echo; printf {_split(READY)}; cat")
+        rtt, send = [], []
+        for i in range(samples):
+            expected = stream.received + 1
+            start = time.perf_counter()
+            stream.send(bytes([97 + i % 26]))
+            sent = time.perf_counter()
+            stream.wait_received(expected)
+            rtt.append(time.perf_counter() - start)
+            send.append(sent - start)
+        return rtt, send
+
+    results = run_parallel(streams, probe)
+    rtt = [value for samples_, _ in results for value in samples_]
+    send = [value for _, samples_ in results for value in samples_]
+    return {"rtt": summarize(rtt), "send_stdin": summarize(send)}
+
+
+def bench_bulk(streams: List[PtyStream], size: int) -> dict:
+    """各 PTY 同时输出 size / PTY 数 字节"""
+    per_pty = size // len(streams)
+
+    def prepare(stream: PtyStream):
+        stream.start(f"stty raw -echo; printf {_split(READY)}")
+        stream.watch(DONE)
+        return stream.received
+
+    def run(stream: PtyStream):
+        stream.send(f"yes | head -c {per_pty}; echo {_split(DONE)}\n".encode())
+        stream.wait_marker(DONE, timeout=3600)
+        return time.perf_counter() - start
+
+    base = run_parallel(streams, prepare)
+    start = time.perf_counter()
+    finished = run_parallel(streams, run)
+    wall = max(finished)
+    received = sum(stream.received - b for stream, b in zip(streams, base))
+    return {
+        "per_pty_size": per_pty,
+        "bytes": received,
+        "seconds": wall,
+        "mb_per_s": throughput(received, wall),
+        "per_pty_mb_per_s": summarize([throughput(per_pty, seconds) for seconds in finished]),
+    }
+
+
+def bench_resize(streams: List[PtyStream], resizes: int) -> dict:
+    """持续输出的同时调整大小，等待输出中出现新的大小"""
+    # 每轮输出 64KB 后打印当前大小；不用 SIGWINCH trap，trap 执行期间到达的信号会丢失
+    command = (
+        f"stty -echo; printf {_split(READY)}; "
+        "while :; do yes | head -c 65536; echo; echo __SIZE_$(stty size | tr ' ' x)__; done"
+    )
+
+    def probe(stream: PtyStream):
+        stream.start(command)
+        call, applied = [], []
+        for i in range(resizes):
+            size = RESIZE_SIZES[i % len(RESIZE_SIZES)]
+            marker = f"__SIZE_{size.rows}x{size.cols}__".encode()
+            stream.watch(marker)
+            start = time.perf_counter()
+            stream.sbx.pty.resize(stream.pid, size)
+            call.append(time.perf_counter() - start)
+            stream.wait_marker(marker)
+            applied.append(time.perf_counter() - start)
+        return call, applied
+
+    results = run_parallel(streams, probe)
+    return {
+        "resize_call": summarize([value for call, _ in results for value in call]),
+        "applied": summarize([value for _, applied in results for value in applied]),
+    }
+
+
+def bench_baseline(sbx: Sandbox, size: int, samples: int) -> dict:
+    """不经过 PTY 的命令往返耗时，以及沙箱内产生同样数据量的耗时"""
+    command_rtt = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        sbx.commands.run("true")
+        command_rtt.append(time.perf_counter() - start)
+    result = sbx.commands.run(
+        f"s=$(date +%s%N); yes | head -c {size} > /dev/null; e=$(date +%s%N); echo $((e - s))",
+        timeout=600,
+    )
+    seconds = int(result.stdout.strip()) / 1e9
+    return {
+        "command_rtt": summarize(command_rtt),
+        "sandbox_generate_seconds": seconds,
+        "sandbox_generate_mb_per_s": throughput(size, seconds),
+    }
+
+
+def with_streams(sbx: Sandbox, count: int, fn: Callable[[List[PtyStream]], dict]) -> dict:
+    """每项测量使用新建的 count 个 PTY，结束后关闭"""
+    streams = [PtyStream(sbx) for _ in range(count)]
+    try:
+        return fn(streams)
+    finally:
+        for stream in streams:
+            stream.close()
+
+
+def run_benchmark(
+    pty_counts: List[int],
+    size: int,
+    echo_samples: int = 200,
+    resizes: int = 20,
+) -> dict:
+    rows = []
+    sbx = Sandbox.create(timeout=3600)
+    try:
+        baseline = bench_baseline(sbx, size, echo_samples // 4 or 1)
+        print(
+            f"  基线: commands.run p50={baseline['command_rtt']['p50'] * 1000:.2f}ms "
+            f"沙箱内产生 {format_size(size)} {baseline['sandbox_generate_mb_per_s']:.2f} MB/s"
+        )
+        for count in pty_counts:
+            echo = with_streams(sbx, count, lambda streams: bench_echo(streams, echo_samples))
+            bulk = with_streams(sbx, count, lambda streams: bench_bulk(streams, size))
+            resize = with_streams(sbx, count, lambda streams: bench_resize(streams, resizes))
+            print(
+                f"  PTY={count:<3} 回显 p50={echo['rtt']['p50'] * 1000:7.2f}ms p99={echo['rtt']['p99'] * 1000:7.2f}ms "
+                f"(send_stdin p50={echo['send_stdin']['p50'] * 1000:.2f}ms) "
+                f"吞吐 {bulk['mb_per_s']:8.2f} MB/s "
+                f"调整大小 p50={resize['applied']['p50'] * 1000:7.2f}ms"
+            )
+            rows.append({"pty_count": count, "echo": echo, "bulk": bulk, "resize": resize})
+    finally:
+        sbx.kill()
+
+    return {
+        "benchmark": "pty_latency",
+        "size": size,
+        "echo_samples": echo_samples,
+        "resizes": resizes,
+        "baseline": baseline,
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="PTY 往返延迟与吞吐基准测试")
+    parser.add_argument(
+        "--pty-counts",
+        type=lambda v: parse_list(v, int),
+        default=DEFAULT_PTY_COUNTS,
+        help="逗号分隔的每沙箱 PTY 数量 (默认 1,4,16)"
+    )
+    parser.add_argument(
+        "--size",
+        type=parse_size,
+        default=parse_size("1GB"),
+        help="批量输出的总数据量，在各 PTY 之间平分 (默认 1GB)"
+    )
+    parser.add_argument("--echo-samples", type=int, default=200, help="每个 PTY 的回显次数 (默认 200)")
+    parser.add_argument("--resizes", type=int, default=20, help="每个 PTY 的调整大小次数 (默认 20)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.pty_counts, args.size, args.echo_samples, args.resizes)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
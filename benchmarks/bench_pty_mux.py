@@ -0,0 +1,251 @@
+"""
+多 PTY 复用基准 - 同步 SDK 每个 PTY 一个接收线程与 PtyManager 单事件循环，在不同 PTY 数量下的对比
+
+每轮在 --sandboxes 个沙箱中平均创建 N 个 PTY，各自执行 `yes | head -c 每个 PTY 的大小` 后退出，
+另开一个运行 `cat` 的交互 PTY，在批量输出进行期间测量单字节回显延迟 (输出多的 PTY 是否拖慢交互 PTY)。
+报告总耗时、聚合 MB/s、各 PTY 吞吐的 Jain 公平性指数 (1 为完全公平)、运行期间的线程数峰值和回显延迟。
+
+用法:
+    python -m benchmarks.bench_pty_mux --pty-counts 10,50,100 --sandboxes 2 --size 256MB
+"""
+import argparse
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+from benchmarks.common import format_size, parse_list, parse_size, summarize, throughput, write_report
+
+from ucloud_sandbox import AsyncSandbox, PtySize, Sandbox
+
+from utils.pty_mux import PtyManager
+
+
+SIZE = PtySize(rows=24, cols=80)
+DEFAULT_PTY_COUNTS = [10, 50, 100]
+ECHO_COMMAND = "stty raw -echo; printf __RE''ADY__; cat"
+
+
+def bulk_command(size: int) -> str:
+    return f"stty raw -echo; yes | head -c {size}; exit"
+
+
+def jain_index(values: List[float]) -> float:
+    """Jain 公平性指数: (Σx)² / (n·Σx²)"""
+    squares = sum(v * v for v in values)
+    return sum(values) ** 2 / (len(values) * squares) if squares else 1.0
+
+
+class ThreadSampler:
+    """后台采样线程数峰值"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_threaded(sandboxes: List[Sandbox], count: int, size: int, echo_samples: int) -> dict:
+    """同步 SDK: 每个 PTY 一个线程执行 handle.wait(on_pty=...)"""
+    per_pty = size // count
+    received = [0] * count
+    finished = [0.0] * count
+    echo_cond = threading.Condition()
+    echo_state = {"received": 0, "ready": False}
+
+    def on_echo(data: bytes):
+        with echo_cond:
+            if echo_state["ready"]:
+                echo_state["received"] += len(data)
+            elif b"__READY__" in data:
+                echo_state["ready"] = True
+            echo_cond.notify_all()
+
+    def reader(index: int, handle):
+        def on_pty(data: bytes):
+            received[index] += len(data)
+        try:
+            handle.wait(on_pty=on_pty)
+        except Exception:
+            pass
+        finished[index] = time.perf_counter() - start
+
+    echo_sbx = sandboxes[0]
+    echo_handle = echo_sbx.pty.create(size=SIZE, timeout=0)
+    echo_thread = threading.Thread(target=lambda: _wait_quietly(echo_handle, on_echo), daemon=True)
+    echo_thread.start()
+    echo_sbx.pty.send_stdin(echo_handle.pid, ECHO_COMMAND.encode() + b"\n")
+    with echo_cond:
+        echo_cond.wait_for(lambda: echo_state["ready"], 30)
+
+    handles = [(sandboxes[i % len(sandboxes)], sandboxes[i % len(sandboxes)].pty.create(size=SIZE, timeout=0)) for i in range(count)]
+    rtt = []
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        threads = [threading.Thread(target=reader, args=(i, handle), daemon=True) for i, (_, handle) in enumerate(handles)]
+        for thread in threads:
+            thread.start()
+        for sbx, handle in handles:
+            sbx.pty.send_stdin(handle.pid, bulk_command(per_pty).encode() + b"\n")
+        for i in range(echo_samples):
+            if not any(thread.is_alive() for thread in threads):
+                break
+            with echo_cond:
+                expected = echo_state["received"] + 1
+            sent = time.perf_counter()
+            echo_sbx.pty.send_stdin(echo_handle.pid, bytes([97 + i % 26]))
+            with echo_cond:
+                echo_cond.wait_for(lambda: echo_state["received"] >= expected, 10)
+            rtt.append(time.perf_counter() - sent)
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+    echo_sbx.pty.kill(echo_handle.pid)
+    echo_thread.join(5)
+    return _result(received, finished, wall, sampler.peak, rtt, per_pty)
+
+
+def _wait_quietly(handle, on_pty):
+    try:
+        handle.wait(on_pty=on_pty)
+    except Exception:
+        pass
+
+
+async def run_mux(sandbox_ids: List[str], count: int, size: int, echo_samples: int) -> dict:
+    """PtyManager: 所有 PTY 在同一个事件循环中接收"""
+    per_pty = size // count
+    sandboxes = [await AsyncSandbox.connect(sandbox_id) for sandbox_id in sandbox_ids]
+    async with PtyManager() as manager:
+        echo = await manager.create(sandboxes[0], key="echo")
+        await echo.sendline(ECHO_COMMAND)
+        buffer = b""
+        while b"__READY__" not in buffer:
+            buffer += await echo.read()
+
+        ptys = await asyncio.gather(*[manager.create(sandboxes[i % len(sandboxes)], key=str(i)) for i in range(count)])
+        received = [0] * count
+        finished = [0.0] * count
+        done = asyncio.Event()
+        echoed = asyncio.Event()
+
+        async def consume():
+            remaining = count
+            while remaining:
+                item = await manager.next()
+                if item is None:
+                    break
+                pty, data = item
+                if pty is echo:
+                    echoed.set()
+                    continue
+                index = int(pty.key)
+                if data:
+                    received[index] += len(data)
+                else:
+                    finished[index] = time.perf_counter() - start
+                    remaining -= 1
+            done.set()
+
+        with ThreadSampler() as sampler:
+            start = time.perf_counter()
+            consumer = asyncio.create_task(consume())
+            await asyncio.gather(*[pty.sendline(bulk_command(per_pty)) for pty in ptys])
+            rtt = []
+            for i in range(echo_samples):
+                if done.is_set():
+                    break
+                echoed.clear()
+                sent = time.perf_counter()
+                await echo.send(bytes([97 + i % 26]))
+                # 回显与其他 PTY 的输出经同一个 next() 轮询取出
+                await asyncio.wait_for(echoed.wait(), 10)
+                rtt.append(time.perf_counter() - sent)
+            await consumer
+            wall = time.perf_counter() - start
+    return _result(received, finished, wall, sampler.peak, rtt, per_pty)
+
+
+def _result(received: List[int], finished: List[float], wall: float, threads: int, rtt: List[float], per_pty: int) -> dict:
+    total = sum(received)
+    rates = [throughput(per_pty, seconds) for seconds in finished if seconds > 0]
+    return {
+        "seconds": wall,
+        "bytes": total,
+        "mb_per_s": throughput(total, wall),
+        "per_pty_mb_per_s": summarize(rates),
+        "fairness": jain_index(rates),
+        "peak_threads": threads,
+        "echo_rtt": summarize(rtt),
+    }
+
+
+def run_benchmark(pty_counts: List[int], sandboxes: int, size: int, echo_samples: int = 50) -> dict:
+    rows = []
+    created = [Sandbox.create(timeout=3600) for _ in range(sandboxes)]
+    try:
+        ids = [sbx.sandbox_id for sbx in created]
+        for count in pty_counts:
+            for mode in ("threads", "mux"):
+                if mode == "threads":
+                    result = run_threaded(created, count, size, echo_samples)
+                else:
+                    result = asyncio.run(run_mux(ids, count, size, echo_samples))
+                print(
+                    f"  PTY={count:<4} {mode:<8} {result['seconds']:7.2f}s {result['mb_per_s']:8.2f} MB/s "
+                    f"公平性 {result['fairness']:.3f} 线程峰值 {result['peak_threads']:<4} "
+                    f"回显 p50={result['echo_rtt']['p50'] * 1000:7.2f}ms"
+                )
+                rows.append({"pty_count": count, "mode": mode, **result})
+    finally:
+        for sbx in created:
+            sbx.kill()
+
+    return {
+        "benchmark": "pty_mux",
+        "sandboxes": sandboxes,
+        "size": size,
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="多 PTY 复用基准测试")
+    parser.add_argument(
+        "--pty-counts",
+        type=lambda v: parse_list(v, int),
+        default=DEFAULT_PTY_COUNTS,
+        help="逗号分隔的 PTY 总数 (默认 10,50,100)"
+    )
+    parser.add_argument("--sandboxes", type=int, default=2, help="PTY 平均分布到的沙箱数 (默认 2)")
+    parser.add_argument(
+        "--size",
+        type=parse_size,
+        default=parse_size("256MB"),
+        help="每轮批量输出的总数据量，在各 PTY 之间平分 (默认 256MB)"
+    )
+    parser.add_argument("--echo-samples", type=int, default=50, help="批量输出期间的回显次数上限 (默认 50)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    print(f"每轮总输出 {format_size(args.size)}")
+    report = run_benchmark(args.pty_counts, args.sandboxes, args.size, args.echo_samples)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+PTY 录制开销基准 - 在 PTY 中 cat 大文件，对比不录制与开启 PtyRecorder 时的总耗时，目标开销 < 1%
+
+沙箱部分: 先在沙箱中生成 base64 文本文件，然后交替执行不录制 / 录制两种模式，
+每次新建 PTY 执行 `cat 文件; exit`，计时从发送命令到 PTY 退出。
+本地部分 (--local) 不需要沙箱: 测量调用方线程每次 output() 的耗时，以及写线程的写入 MB/s。
+
+用法:
+    python -m benchmarks.bench_pty_record --size 256MB --iterations 3
+    python -m benchmarks.bench_pty_record --local --size 256MB --chunk-size 16KB
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+from benchmarks.common import format_size, parse_size, summarize, throughput, write_report
+
+from ucloud_sandbox import PtySize, Sandbox
+
+from utils.pty_record import PtyRecorder
+
+
+SIZE = PtySize(rows=24, cols=80)
+REMOTE_PATH = "/tmp/bench_pty_record.txt"
+
+
+def run_cat(sbx: Sandbox, path: str, record_path: Optional[str]) -> dict:
+    """新建 PTY 执行 cat，record_path 不为空时录制全部输出"""
+    received = 0
+    recorder = PtyRecorder.for_size(record_path, SIZE) if record_path else None
+
+    def on_pty(data: bytes):
+        nonlocal received
+        received += len(data)
+        if recorder is not None:
+            recorder.output(data)
+
+    handle = sbx.pty.create(size=SIZE, timeout=0)
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    command = f"stty -echo; cat {path}; exit\n".encode()
+    sbx.pty.send_stdin(handle.pid, command)
+    if recorder is not None:
+        recorder.input(command)
+    try:
+        handle.wait(on_pty=on_pty)
+    except Exception:
+        # exit 的退出码不影响计时
+        pass
+    seconds = time.perf_counter() - start
+    close_seconds = 0.0
+    if recorder is not None:
+        close_start = time.perf_counter()
+        recorder.close()
+        close_seconds = time.perf_counter() - close_start
+    return {
+        "seconds": seconds,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "close_seconds": close_seconds,
+        "bytes": received,
+    }
+
+
+def run_sandbox(size: int, iterations: int) -> dict:
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        # base64 输出为可打印文本，与 cat 日志文件的场景一致
+        sbx.commands.run(
+            f"head -c {size * 3 // 4} /dev/urandom | base64 -w 76 > {REMOTE_PATH}",
+            timeout=600,
+        )
+        samples = {"off": [], "on": []}
+        cpu = {"off": [], "on": []}
+        close = []
+        received = 0
+        with tempfile.TemporaryDirectory() as tmp:
+            record_path = os.path.join(tmp, "bench.cast")
+            # 两种模式交替执行，减少沙箱负载波动的影响
+            for i in range(iterations):
+                for mode in ("off", "on"):
+                    result = run_cat(sbx, REMOTE_PATH, record_path if mode == "on" else None)
+                    samples[mode].append(result["seconds"])
+                    cpu[mode].append(result["cpu_seconds"])
+                    received = result["bytes"]
+                    if mode == "on":
+                        close.append(result["close_seconds"])
+                    print(
+                        f"  第 {i + 1} 轮 录制={mode:<3} {result['seconds']:7.2f}s "
+                        f"{throughput(result['bytes'], result['seconds']):8.2f} MB/s"
+                    )
+            record_size = os.path.getsize(record_path)
+    finally:
+        sbx.kill()
+
+    off, on = summarize(samples["off"]), summarize(samples["on"])
+    overhead = (on["p50"] - off["p50"]) / off["p50"] * 100
+    print(f"  录制开销 (p50): {overhead:+.2f}%  录像大小 {format_size(record_size)}")
+    return {
+        "size": size,
+        "bytes_received": received,
+        "record_size": record_size,
+        "latency": {"off": off, "on": on},
+        "cpu_seconds": {"off": summarize(cpu["off"]), "on": summarize(cpu["on"])},
+        "close_seconds": summarize(close),
+        "overhead_percent": overhead,
+    }
+
+
+def run_local(size: int, chunk_size: int) -> dict:
+    """调用方线程的单次 output() 耗时，以及写线程把 size 字节写完的吞吐"""
+    line = b"QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVphYmNkZWZnaGlqa2xtbm9wcXJzdHV2d3h5ejAxMjM0\r\n"
+    chunk = (line * (chunk_size // len(line) + 1))[:chunk_size]
+    count = max(size // chunk_size, 1)
+    calls = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.cast")
+        recorder = PtyRecorder(path, SIZE.cols, SIZE.rows)
+        start = time.perf_counter()
+        for _ in range(count):
+            call_start = time.perf_counter()
+            recorder.output(chunk)
+            calls.append(time.perf_counter() - call_start)
+        enqueue_seconds = time.perf_counter() - start
+        recorder.close()
+        total_seconds = time.perf_counter() - start
+        record_size = os.path.getsize(path)
+
+    latency = summarize(calls)
+    total = count * chunk_size
+    print(
+        f"  本地 output() p50={latency['p50'] * 1e6:.2f}µs p99={latency['p99'] * 1e6:.2f}µs "
+        f"写线程 {throughput(total, total_seconds):8.2f} MB/s"
+    )
+    return {
+        "size": total,
+        "chunk_size": chunk_size,
+        "calls": count,
+        "output_call": latency,
+        "enqueue_seconds": enqueue_seconds,
+        "write_seconds": total_seconds,
+        "write_mb_per_s": throughput(total, total_seconds),
+        "record_size": record_size,
+    }
+
+
+def run_benchmark(size: int, iterations: int = 3, local: bool = False, chunk_size: int = 16 * 1024) -> dict:
+    report = {"benchmark": "pty_record"}
+    if local:
+        report["local"] = run_local(size, chunk_size)
+    else:
+        report["sandbox"] = run_sandbox(size, iterations)
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="PTY 录制开销基准测试")
+    parser.add_argument("--size", type=parse_size, default=parse_size("256MB"), help="cat 的文件大小 (默认 256MB)")
+    parser.add_argument("--iterations", "-n", type=int, default=3, help="每种模式的重复次数 (默认 3)")
+    parser.add_argument("--local", action="store_true", help="只在本地测量录制器的调用耗时与写入吞吐")
+    parser.add_argument(
+        "--chunk-size",
+        type=parse_size,
+        default=parse_size("16KB"),
+        help="--local 时每次 output() 的数据大小 (默认 16KB)"
+    )
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.size, args.iterations, args.local, args.chunk_size)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+沙箱创建延迟基准测试 - 创建、首条命令、销毁耗时的百分位统计
+
+用法:
+    python -m benchmarks.bench_sandbox_create --iterations 20 --concurrency 1,4,8
+    python -m benchmarks.bench_sandbox_create --templates base --output create.json
+"""
+import argparse
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from benchmarks.common import parse_list, summarize, timer, write_report
+
+from ucloud_sandbox import Sandbox
+
+
+DEFAULT_TEMPLATES = ["base", "code-interpreter-v1", "desktop"]
+
+METRICS = ("create", "first_command", "kill", "total")
+
+
+def measure_once(template: str, timeout: int) -> Dict[str, float]:
+    """
+    完整走一遍 创建 -> 首条命令 -> 销毁，返回各阶段耗时 (秒)
+    """
+    samples: Dict[str, List[float]] = {}
+    start = time.perf_counter()
+
+    with timer(samples, "create"):
+        sbx = Sandbox.create(template=template, timeout=timeout)
+    try:
+        with timer(samples, "first_command"):
+            sbx.commands.run("true")
+    finally:
+        with timer(samples, "kill"):
+            sbx.kill()
+
+    samples["total"] = [time.perf_counter() - start]
+    return {name: values[0] for name, values in samples.items()}
+
+
+def run_round(template: str, iterations: int, concurrency: int, timeout: int) -> dict:
+    """以指定并发度执行 iterations 次测量，返回该轮统计结果"""
+    samples: Dict[str, List[float]] = {name: [] for name in METRICS}
+    errors: List[str] = []
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(measure_once, template, timeout) for _ in range(iterations)]
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            for name in METRICS:
+                samples[name].append(result[name])
+    wall_time = time.perf_counter() - wall_start
+
+    return {
+        "template": template,
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "wall_time": wall_time,
+        "creates_per_second": (iterations - len(errors)) / wall_time if wall_time else 0.0,
+        "metrics": {name: summarize(values) for name, values in samples.items()},
+    }
+
+
+def print_round(result: dict):
+    """打印一轮结果的简要摘要"""
+    create = result["metrics"]["create"]
+    first = result["metrics"]["first_command"]
+    print(
+        f"  {result['template']:<22} c={result['concurrency']:<3} "
+        f"create p50={create['p50']:.2f}s p99={create['p99']:.2f}s | "
+        f"first_cmd p50={first['p50']:.2f}s | "
+        f"errors={result['errors']}"
+    )
+
+
+def run_benchmark(
+    templates: List[str],
+    iterations: int,
+    concurrency_levels: List[int],
+    timeout: int = 60,
+) -> dict:
+    """对每个模板、每个并发度执行一轮测量"""
+    rounds = []
+    for template in templates:
+        for concurrency in concurrency_levels:
+            try:
+                result = run_round(template, iterations, concurrency, timeout)
+            except Exception as e:
+                print(f"❌ 模板 {template} (并发 {concurrency}) 测量失败: {e}")
+                traceback.print_exc()
+                continue
+            print_round(result)
+            rounds.append(result)
+    return {"benchmark": "sandbox_create", "rounds": rounds}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="沙箱创建延迟基准测试")
+    parser.add_argument(
+        "--templates",
+        type=parse_list,
+        default=DEFAULT_TEMPLATES,
+        help=f"逗号分隔的模板列表 (默认 {','.join(DEFAULT_TEMPLATES)})"
+    )
+    parser.add_argument(
+        "--iterations", "-n",
+        type=int,
+        default=10,
+        help="每轮创建次数 (默认 10)"
+    )
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=lambda v: parse_list(v, int),
+        default=[1],
+        help="逗号分隔的并发度列表，1 即顺序执行 (默认 1)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=60,
+        help="沙箱存活时间，单位秒 (默认 60)"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=str,
+        help="JSON 报告输出路径 (默认打印到标准输出)"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.templates, args.iterations, args.concurrency, args.timeout)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+持久 shell 会话基准测试 - 对比 commands.run 与 ShellSession.run 的单条命令延迟
+
+用法:
+    python -m benchmarks.bench_shell_session --commands 200
+"""
+import argparse
+import time
+from typing import List, Optional
+
+from benchmarks.common import summarize, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.shell_session import ShellSession
+
+
+# 代理常见的小命令
+WORKLOAD = [
+    "true",
+    "echo hello",
+    "pwd",
+    "ls /home/user",
+    "test -f /etc/hostname && cat /etc/hostname",
+]
+
+
+def measure(run, commands: int) -> List[float]:
+    samples = []
+    for i in range(commands):
+        cmd = WORKLOAD[i % len(WORKLOAD)]
+        start = time.perf_counter()
+        run(cmd)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_benchmark(commands: int, warmup: int = 5) -> dict:
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        measure(sbx.commands.run, warmup)
+        baseline = summarize(measure(sbx.commands.run, commands))
+        print(f"  commands.run      p50={baseline['p50'] * 1000:7.1f}ms p99={baseline['p99'] * 1000:7.1f}ms")
+
+        start = time.perf_counter()
+        with ShellSession(sbx) as session:
+            session_start = time.perf_counter() - start
+            measure(session.run, warmup)
+            session_latency = summarize(measure(session.run, commands))
+        print(
+            f"  ShellSession.run  p50={session_latency['p50'] * 1000:7.1f}ms "
+            f"p99={session_latency['p99'] * 1000:7.1f}ms (启动 {session_start * 1000:.1f}ms)"
+        )
+    finally:
+        sbx.kill()
+
+    return {
+        "benchmark": "shell_session",
+        "commands": commands,
+        "workload": WORKLOAD,
+        "commands_run": baseline,
+        "shell_session": session_latency,
+        "session_start_seconds": session_start,
+        "speedup_p50": baseline["p50"] / session_latency["p50"] if session_latency["p50"] else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="持久 shell 会话基准测试")
+    parser.add_argument("--commands", "-n", type=int, default=200, help="每种方式执行的命令数 (默认 200)")
+    parser.add_argument("--warmup", type=int, default=5, help="预热命令数 (默认 5)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.commands, args.warmup)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+目录增量同步基准测试 - 对比全量上传与增量同步的传输字节数和耗时
+
+用法:
+    python -m benchmarks.bench_sync --files 2000 --file-size 8KB --change-ratio 0.05
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+from typing import List, Optional
+
+from benchmarks.common import format_size, parse_size, summarize, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.sync import sync_dir
+
+
+def make_tree(root: str, count: int, file_size: int):
+    for i in range(count):
+        path = os.path.join(root, f"pkg_{i % 32}", f"module_{i}.py")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(os.urandom(file_size))
+
+
+def mutate_tree(root: str, ratio: float, file_size: int, rng: random.Random) -> int:
+    """随机修改 ratio 比例的文件，返回修改的文件数"""
+    paths = sorted(
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(root)
+        for name in names
+    )
+    changed = rng.sample(paths, max(1, int(len(paths) * ratio)))
+    for path in changed:
+        with open(path, "wb") as f:
+            f.write(os.urandom(file_size))
+    return len(changed)
+
+
+def run_benchmark(
+    files: int,
+    file_size: int,
+    change_ratio: float,
+    iterations: int = 3,
+    seed: int = 0,
+) -> dict:
+    rng = random.Random(seed)
+    local_dir = tempfile.mkdtemp()
+    sandbox_dir = "/home/user/sync_bench"
+    full_samples: List[float] = []
+    delta_samples: List[float] = []
+    delta_results = []
+
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        make_tree(local_dir, files, file_size)
+        for _ in range(iterations):
+            full = sync_dir(sbx, local_dir, sandbox_dir, full=True)
+            full_samples.append(full["seconds"])
+
+            mutate_tree(local_dir, change_ratio, file_size, rng)
+            delta = sync_dir(sbx, local_dir, sandbox_dir)
+            delta_samples.append(delta["seconds"])
+            delta_results.append(delta)
+            print(
+                f"  全量 {full['seconds']:.2f}s ({format_size(full['bytes_uploaded'])}) | "
+                f"增量 {delta['seconds']:.2f}s ({delta['uploaded']} 文件, "
+                f"节省 {delta['bytes_saved'] / max(delta['bytes_total'], 1):.1%})"
+            )
+    finally:
+        sbx.kill()
+        shutil.rmtree(local_dir)
+
+    full_summary = summarize(full_samples)
+    delta_summary = summarize(delta_samples)
+    return {
+        "benchmark": "sync",
+        "files": files,
+        "file_size": file_size,
+        "change_ratio": change_ratio,
+        "full_upload": full_summary,
+        "delta_sync": delta_summary,
+        "speedup_p50": full_summary["p50"] / delta_summary["p50"] if delta_summary["p50"] else 0.0,
+        "delta_runs": delta_results,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="目录增量同步基准测试")
+    parser.add_argument("--files", type=int, default=1000, help="文件数 (默认 1000)")
+    parser.add_argument("--file-size", type=parse_size, default=parse_size("8KB"), help="单个文件大小 (默认 8KB)")
+    parser.add_argument("--change-ratio", type=float, default=0.05, help="每轮修改的文件比例 (默认 0.05)")
+    parser.add_argument("--iterations", "-n", type=int, default=3, help="重复次数 (默认 3)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.files, args.file_size, args.change_ratio, args.iterations)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+目录打包传输基准测试 - files.write_files 与 tar 流上传在不同文件数下的交叉点
+
+用法:
+    python -m benchmarks.bench_tar_transfer --counts 10,100,1000,10000 --file-size 1KB
+    python -m benchmarks.bench_tar_transfer --compressions none,gzip,zstd
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from typing import List, Optional
+
+from benchmarks.common import format_size, parse_list, parse_size, summarize, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.tar_transfer import download_tree, upload_tree
+
+
+DEFAULT_COUNTS = [10, 100, 1000, 10000]
+
+
+def make_tree(root: str, count: int, file_size: int):
+    """生成类源码的小文件 (可压缩文本)"""
+    line = b"def handler(event, context):  # generated for tar benchmark\n"
+    body = (line * (file_size // len(line) + 1))[:file_size]
+    for i in range(count):
+        path = os.path.join(root, f"pkg_{i % 64}", f"file_{i}.py")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+
+
+def upload_write_files(sbx: Sandbox, local_dir: str, sandbox_dir: str, batch: int) -> float:
+    """基线: 与 test_write_files_batch 相同的 files.write_files 调用，按 batch 分组"""
+    entries = []
+    for root, _, names in os.walk(local_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                entries.append({"path": f"{sandbox_dir}/{rel}", "data": f.read()})
+
+    start = time.perf_counter()
+    for i in range(0, len(entries), batch):
+        sbx.files.write_files(entries[i:i + batch])
+    return time.perf_counter() - start
+
+
+def run_benchmark(
+    counts: List[int],
+    file_size: int,
+    compressions: List[Optional[str]],
+    iterations: int = 3,
+    batch: int = 1000,
+) -> dict:
+    rows = []
+    crossover = {}
+
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        for count in counts:
+            local_dir = tempfile.mkdtemp()
+            download_root = tempfile.mkdtemp()
+            make_tree(local_dir, count, file_size)
+            timings = {}
+
+            cases = [("write_files", lambda i: upload_write_files(sbx, local_dir, f"/home/user/wf_{i}", batch))]
+            for compression in compressions:
+                label = f"tar_{compression or 'none'}"
+                cases.append((
+                    label,
+                    lambda i, c=compression, l=label: upload_tree(
+                        sbx, local_dir, f"/home/user/{l}_{i}", c
+                    )["seconds"],
+                ))
+                cases.append((
+                    f"{label}_download",
+                    lambda i, c=compression, l=label: download_tree(
+                        sbx, "/home/user/wf_0", os.path.join(download_root, f"{l}_{i}"), c
+                    )["seconds"],
+                ))
+
+            for method, run in cases:
+                samples = []
+                try:
+                    for i in range(iterations):
+                        samples.append(run(i))
+                except Exception as e:
+                    print(f"❌ {method} 在 {count} 个文件下失败: {e}")
+                    traceback.print_exc()
+                    continue
+                timings[method] = summarize(samples)
+                print(f"  {count:>6} 文件 {method:<22} p50={timings[method]['p50']:.2f}s")
+                rows.append({"files": count, "method": method, "latency": timings[method]})
+
+            for compression in compressions:
+                label = f"tar_{compression or 'none'}"
+                if label in timings and "write_files" in timings and label not in crossover:
+                    if timings[label]["p50"] < timings["write_files"]["p50"]:
+                        crossover[label] = count
+
+            sbx.commands.run("rm -rf /home/user/wf_* /home/user/tar_*")
+            shutil.rmtree(local_dir)
+            shutil.rmtree(download_root)
+    finally:
+        sbx.kill()
+
+    return {
+        "benchmark": "tar_transfer",
+        "file_size": file_size,
+        "write_files_batch": batch,
+        "results": rows,
+        # tar 上传首次快于 write_files 时的文件数
+        "crossover_files": crossover,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="目录打包传输基准测试")
+    parser.add_argument(
+        "--counts",
+        type=lambda v: parse_list(v, int),
+        default=DEFAULT_COUNTS,
+        help=f"逗号分隔的文件数列表 (默认 {','.join(map(str, DEFAULT_COUNTS))})"
+    )
+    parser.add_argument("--file-size", type=parse_size, default=parse_size("1KB"), help="单个文件大小 (默认 1KB)")
+    parser.add_argument(
+        "--compressions",
+        type=lambda v: [None if c == "none" else c for c in parse_list(v)],
+        default=[None, "gzip"],
+        help="逗号分隔的压缩方式: none,gzip,zstd (默认 none,gzip)"
+    )
+    parser.add_argument("--batch", type=int, default=1000, help="write_files 每次调用的文件数 (默认 1000)")
+    parser.add_argument("--iterations", "-n", type=int, default=3, help="重复次数 (默认 3)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.counts, args.file_size, args.compressions, args.iterations, args.batch)
+    print(f"交叉点: {report['crossover_files']} (文件大小 {format_size(args.file_size)})")
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
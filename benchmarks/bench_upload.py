@@ -0,0 +1,163 @@
+"""
+大文件上传基准测试 - 对比 files.write 与分块并行上传
+
+files.write 的基线与 tests/test_filesystem_complete.py 中的 test_write_file_stream 一致:
+以文件流整体写入。
+
+用法:
+    python -m benchmarks.bench_upload --sizes 64MB,512MB,2GB --workers 1,4,8
+"""
+import argparse
+import os
+import tempfile
+import time
+import traceback
+from typing import List, Optional
+
+from benchmarks.common import (
+    format_size,
+    parse_list,
+    parse_size,
+    summarize,
+    throughput,
+    write_report,
+)
+
+from ucloud_sandbox import Sandbox
+
+from utils.upload import DEFAULT_PART_SIZE, upload_file
+
+
+DEFAULT_SIZES = ["64MB", "512MB", "2GB"]
+
+
+def make_local_file(size: int, directory: str) -> str:
+    """分块写入随机内容，避免一次性占用 size 大小的内存"""
+    path = os.path.join(directory, f"upload_{size}.bin")
+    block = 16 * 1024 * 1024
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            n = min(block, remaining)
+            f.write(os.urandom(n))
+            remaining -= n
+    return path
+
+
+def bench_plain_write(sbx: Sandbox, local_path: str, iterations: int) -> List[float]:
+    """基线: 打开本地文件，以单个流调用 files.write"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        with open(local_path, "rb") as f:
+            sbx.files.write("/home/user/upload_plain.bin", f)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_chunked(sbx: Sandbox, local_path: str, iterations: int, workers: int, part_size: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        upload_file(
+            sbx,
+            local_path,
+            "/home/user/upload_chunked.bin",
+            part_size=part_size,
+            max_workers=workers,
+        )
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_benchmark(
+    sizes: List[int],
+    workers_levels: List[int],
+    iterations: int = 3,
+    part_size: int = DEFAULT_PART_SIZE,
+) -> dict:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            local_path = make_local_file(size, tmp_dir)
+            sbx = Sandbox.create(timeout=1800)
+            try:
+                cases = [("files.write", 1, lambda: bench_plain_write(sbx, local_path, iterations))]
+                for workers in workers_levels:
+                    cases.append((
+                        "chunked",
+                        workers,
+                        lambda w=workers: bench_chunked(sbx, local_path, iterations, w, part_size),
+                    ))
+
+                for method, workers, run in cases:
+                    try:
+                        samples = run()
+                    except Exception as e:
+                        print(f"❌ {method} (workers={workers}) 在 {format_size(size)} 下失败: {e}")
+                        traceback.print_exc()
+                        continue
+                    row = {
+                        "method": method,
+                        "workers": workers,
+                        "size": size,
+                        "size_label": format_size(size),
+                        "latency": summarize(samples),
+                        "mb_per_s": summarize([throughput(size, s) for s in samples]),
+                    }
+                    print(
+                        f"  {method:<12} w={workers:<3} {row['size_label']:>6} "
+                        f"p50={row['latency']['p50']:.2f}s {row['mb_per_s']['p50']:.2f} MB/s"
+                    )
+                    rows.append(row)
+            finally:
+                sbx.kill()
+                os.remove(local_path)
+
+    return {
+        "benchmark": "upload",
+        "iterations": iterations,
+        "part_size": part_size,
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="大文件上传基准测试")
+    parser.add_argument(
+        "--sizes",
+        type=lambda v: parse_list(v, parse_size),
+        default=[parse_size(s) for s in DEFAULT_SIZES],
+        help=f"逗号分隔的文件大小 (默认 {','.join(DEFAULT_SIZES)})"
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=lambda v: parse_list(v, int),
+        default=[4],
+        help="逗号分隔的分块并发数列表 (默认 4)"
+    )
+    parser.add_argument(
+        "--part-size",
+        type=parse_size,
+        default=DEFAULT_PART_SIZE,
+        help=f"分块大小 (默认 {format_size(DEFAULT_PART_SIZE)})"
+    )
+    parser.add_argument(
+        "--iterations", "-n",
+        type=int,
+        default=3,
+        help="每种方式的重复次数 (默认 3)"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=str,
+        help="JSON 报告输出路径 (默认打印到标准输出)"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.sizes, args.workers, args.iterations, args.part_size)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
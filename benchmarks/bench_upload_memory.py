@@ -0,0 +1,176 @@
+"""
+上传峰值内存基准测试 - 对比不同上传方式的峰值 RSS
+
+每种方式在独立子进程中运行，峰值 RSS 互不干扰:
+    bytes    读取为 bytes 后 files.write (现有做法)
+    bytesio  读取为 io.BytesIO 后 files.write (test_write_file_stream 的做法)
+    file     直接传入打开的文件对象
+    mmap     utils.upload.upload_mmap，内存映射按块读取
+    chunked  utils.upload.upload_file(use_mmap=True)，分块并行 + 内存映射
+
+用法:
+    python -m benchmarks.bench_upload_memory --size 1GB
+    python -m benchmarks.bench_upload_memory --size 512MB --modes bytes,mmap
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from benchmarks.common import format_size, parse_list, parse_size, throughput, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.upload import upload_file, upload_mmap
+
+
+MODES = ["bytes", "bytesio", "file", "mmap", "chunked"]
+
+REMOTE_PATH = "/home/user/upload_memory.bin"
+
+
+def read_status_kb(field: str) -> Optional[int]:
+    """读取 /proc/self/status 中的内存字段 (KB)，非 Linux 返回 None"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_kb() -> int:
+    """进程生命周期内的峰值 RSS (KB)"""
+    peak = read_status_kb("VmHWM")
+    if peak is not None:
+        return peak
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 的 ru_maxrss 单位为字节
+    return maxrss // 1024 if sys.platform == "darwin" else maxrss
+
+
+def current_rss_kb() -> int:
+    rss = read_status_kb("VmRSS")
+    return rss if rss is not None else peak_rss_kb()
+
+
+def upload_once(mode: str, sandbox_id: str, local_path: str, queue):
+    """子进程入口: 连接沙箱，按指定方式上传一次并回报内存数据"""
+    sbx = Sandbox.connect(sandbox_id)
+    baseline = current_rss_kb()
+    start = time.perf_counter()
+
+    if mode == "bytes":
+        with open(local_path, "rb") as f:
+            sbx.files.write(REMOTE_PATH, f.read())
+    elif mode == "bytesio":
+        with open(local_path, "rb") as f:
+            sbx.files.write(REMOTE_PATH, io.BytesIO(f.read()))
+    elif mode == "file":
+        with open(local_path, "rb") as f:
+            sbx.files.write(REMOTE_PATH, f)
+    elif mode == "mmap":
+        upload_mmap(sbx, local_path, REMOTE_PATH)
+    elif mode == "chunked":
+        upload_file(sbx, local_path, REMOTE_PATH, use_mmap=True)
+    else:
+        raise ValueError(f"未知上传方式: {mode}")
+
+    seconds = time.perf_counter() - start
+    queue.put({
+        "baseline_rss_kb": baseline,
+        "peak_rss_kb": peak_rss_kb(),
+        "seconds": seconds,
+    })
+
+
+def measure(mode: str, sandbox_id: str, local_path: str) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=upload_once, args=(mode, sandbox_id, local_path, queue))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"子进程退出码 {process.exitcode}")
+    return queue.get()
+
+
+def run_benchmark(size: int, modes: List[str]) -> dict:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        local_path = os.path.join(tmp_dir, "payload.bin")
+        with open(local_path, "wb") as f:
+            remaining = size
+            while remaining > 0:
+                n = min(16 * 1024 * 1024, remaining)
+                f.write(os.urandom(n))
+                remaining -= n
+
+        sbx = Sandbox.create(timeout=1800)
+        try:
+            for mode in modes:
+                try:
+                    result = measure(mode, sbx.sandbox_id, local_path)
+                except Exception as e:
+                    print(f"❌ 上传方式 {mode} 失败: {e}")
+                    continue
+                growth_mb = (result["peak_rss_kb"] - result["baseline_rss_kb"]) / 1024
+                row = {
+                    "mode": mode,
+                    "size": size,
+                    "size_label": format_size(size),
+                    "seconds": result["seconds"],
+                    "mb_per_s": throughput(size, result["seconds"]),
+                    "baseline_rss_mb": result["baseline_rss_kb"] / 1024,
+                    "peak_rss_mb": result["peak_rss_kb"] / 1024,
+                    "peak_growth_mb": growth_mb,
+                }
+                print(
+                    f"  {mode:<8} {row['size_label']:>6} peak RSS +{growth_mb:8.1f}MB "
+                    f"{row['mb_per_s']:8.2f} MB/s"
+                )
+                rows.append(row)
+        finally:
+            sbx.kill()
+
+    return {"benchmark": "upload_memory", "results": rows}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="上传峰值内存基准测试")
+    parser.add_argument(
+        "--size",
+        type=parse_size,
+        default=parse_size("512MB"),
+        help="上传文件大小 (默认 512MB)"
+    )
+    parser.add_argument(
+        "--modes",
+        type=parse_list,
+        default=MODES,
+        help=f"逗号分隔的上传方式 (默认 {','.join(MODES)})"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=str,
+        help="JSON 报告输出路径 (默认打印到标准输出)"
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"未知上传方式: {', '.join(sorted(unknown))}")
+
+    report = run_benchmark(args.size, args.modes)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+VT 屏幕模型基准测试 - 增量解析的 MB/s，以及每次读取屏幕时增量模型与重新解析全部输出的耗时对比
+
+本地部分不需要沙箱: 对普通文本、彩色日志、TUI 刷屏、中英文混合四类终端输出测量解析吞吐。
+加 --sandbox 时额外在沙箱 PTY 中执行命令，用捕获到的真实输出做同样的测量。
+
+用法:
+    python -m benchmarks.bench_vt_screen --size 8MB --chunk-sizes 4KB,64KB
+    python -m benchmarks.bench_vt_screen --size 4MB --sandbox --command 'ls -laR --color=always /usr'
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.common import format_size, parse_list, parse_size, summarize, throughput, write_report
+
+from ucloud_sandbox import PtySize, Sandbox
+
+from utils.pty_expect import PtyDriver
+from utils.vt_screen import Screen
+
+
+ROWS, COLS = 24, 80
+DEFAULT_CHUNK_SIZES = [4 * 1024, 64 * 1024]
+DEFAULT_COMMAND = "ls -laR --color=always /usr"
+# 重新解析的做法耗时与已收到的输出量成正比，读取对比只用负载的前一部分
+DEFAULT_READ_SIZE = 1024 * 1024
+
+
+def make_plain(size: int) -> bytes:
+    """ls -l 风格的普通文本"""
+    rng = random.Random(0)
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        line = f"-rw-r--r-- 1 user user {rng.randrange(100000):>6} Jan  1 12:00 file_{i}.txt\r\n"
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return "".join(lines).encode()[:size]
+
+
+def make_color(size: int) -> bytes:
+    """带 SGR 颜色的日志"""
+    rng = random.Random(0)
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        level = rng.choice(["\x1b[1;34mINFO\x1b[0m", "\x1b[1;33mWARN\x1b[0m", "\x1b[1;31mERROR\x1b[0m"])
+        line = f"\x1b[32m2024-01-01 12:00:{i % 60:02d}\x1b[0m {level} request {i} done in \x1b[33m{rng.randrange(999)}ms\x1b[0m\r\n"
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return "".join(lines).encode()[:size]
+
+
+def make_tui(size: int) -> bytes:
+    """top / htop 风格的整屏刷新: 光标定位、清行、反色"""
+    rng = random.Random(0)
+    frames = []
+    total = 0
+    while total < size:
+        parts = ["\x1b[H"]
+        for row in range(1, ROWS + 1):
+            parts.append(
+                f"\x1b[{row};1H\x1b[K\x1b[7m{rng.randrange(99999):>5}\x1b[0m "
+                f"cpu {rng.randrange(100):>3}% mem {rng.randrange(64):>2}G \x1b[36m/usr/bin/proc_{row}\x1b[0m"
+            )
+        frame = "".join(parts)
+        frames.append(frame)
+        total += len(frame)
+    return "".join(frames).encode()[:size]
+
+
+def make_cjk(size: int) -> bytes:
+    """中英文混合输出"""
+    line = "构建步骤 [3/7] 正在编译 module_名称.py ... 完成 (耗时 1.2 秒)\r\n".encode()
+    return (line * (size // len(line) + 1))[:size]
+
+
+PAYLOADS = {
+    "plain": make_plain,
+    "color": make_color,
+    "tui": make_tui,
+    "cjk": make_cjk,
+}
+
+
+def capture_output(command: str, size: int) -> bytes:
+    """在沙箱 PTY 中执行命令，捕获最多 size 字节的原始输出"""
+    chunks = []
+    sbx = Sandbox.create(timeout=600)
+    try:
+        with PtyDriver(sbx, size=PtySize(rows=ROWS, cols=COLS), on_output=chunks.append, timeout=300) as pty:
+            pty.setup_prompt()
+            chunks.clear()
+            pty.run(f"{command} 2>&1 | head -c {size}")
+    finally:
+        sbx.kill()
+    return b"".join(chunks)
+
+
+def bench_incremental(data: bytes, chunk_size: int) -> dict:
+    """按块 feed 的解析吞吐"""
+    screen = Screen(ROWS, COLS)
+    start = time.perf_counter()
+    for offset in range(0, len(data), chunk_size):
+        screen.feed(data[offset:offset + chunk_size])
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "mb_per_s": throughput(len(data), seconds)}
+
+
+def bench_reads(data: bytes, chunk_size: int, reads: int) -> dict:
+    """
+    每收到若干块读取一次屏幕: 增量模型只读当前网格的变化行，
+    重新解析的做法每次都用新 Screen 解析到目前为止的全部输出
+    """
+    step = max(len(data) // reads, chunk_size)
+    incremental = []
+    reparse = []
+    screen = Screen(ROWS, COLS)
+    fed = 0
+    for end in range(step, len(data) + 1, step):
+        start = time.perf_counter()
+        for offset in range(fed, end, chunk_size):
+            screen.feed(data[offset:min(offset + chunk_size, end)])
+        for row in screen.take_dirty():
+            screen.line(row)
+        incremental.append(time.perf_counter() - start)
+        fed = end
+
+        start = time.perf_counter()
+        fresh = Screen(ROWS, COLS)
+        fresh.feed(data[:end])
+        fresh.display
+        reparse.append(time.perf_counter() - start)
+    return {"incremental": summarize(incremental), "reparse": summarize(reparse)}
+
+
+def run_benchmark(
+    size: int,
+    chunk_sizes: List[int],
+    payloads: List[str],
+    reads: int = 20,
+    read_size: int = DEFAULT_READ_SIZE,
+    sandbox: bool = False,
+    command: str = DEFAULT_COMMAND,
+) -> dict:
+    inputs: Dict[str, bytes] = {name: PAYLOADS[name](size) for name in payloads}
+    if sandbox:
+        print(f"在沙箱中捕获输出: {command}")
+        inputs["sandbox"] = capture_output(command, size)
+
+    rows = []
+    for name, data in inputs.items():
+        for chunk_size in chunk_sizes:
+            result = bench_incremental(data, chunk_size)
+            print(
+                f"  {name:<8} {format_size(len(data)):>8} 块 {format_size(chunk_size):>6} "
+                f"{result['mb_per_s']:8.2f} MB/s"
+            )
+            rows.append({"payload": name, "size": len(data), "chunk_size": chunk_size, **result})
+
+        read_latency = bench_reads(data[:read_size], chunk_sizes[0], reads)
+        print(
+            f"  {name:<8} 读取屏幕 p50: 增量 {read_latency['incremental']['p50'] * 1000:8.2f}ms "
+            f"重新解析 {read_latency['reparse']['p50'] * 1000:8.2f}ms"
+        )
+        rows.append({
+            "payload": name,
+            "size": min(len(data), read_size),
+            "reads": reads,
+            "read_latency": read_latency,
+        })
+
+    return {
+        "benchmark": "vt_screen",
+        "screen": {"rows": ROWS, "cols": COLS},
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="VT 屏幕模型解析吞吐基准测试")
+    parser.add_argument("--size", type=parse_size, default=parse_size("8MB"), help="每类负载的大小 (默认 8MB)")
+    parser.add_argument(
+        "--chunk-sizes",
+        type=lambda v: parse_list(v, parse_size),
+        default=DEFAULT_CHUNK_SIZES,
+        help="逗号分隔的 feed 块大小 (默认 4KB,64KB)"
+    )
+    parser.add_argument(
+        "--payloads",
+        type=parse_list,
+        default=list(PAYLOADS),
+        help=f"逗号分隔的负载类型 (默认 {','.join(PAYLOADS)})"
+    )
+    parser.add_argument("--reads", type=int, default=20, help="读取屏幕的次数 (默认 20)")
+    parser.add_argument(
+        "--read-size",
+        type=parse_size,
+        default=DEFAULT_READ_SIZE,
+        help="读取对比使用的输出量 (默认 1MB)"
+    )
+    parser.add_argument("--sandbox", action="store_true", help="额外测量沙箱 PTY 中真实命令的输出")
+    parser.add_argument("--command", type=str, default=DEFAULT_COMMAND, help=f"--sandbox 时执行的命令 (默认 {DEFAULT_COMMAND!r})")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        args.size, args.chunk_sizes, args.payloads, args.reads, args.read_size, args.sandbox, args.command
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+目录监听基准测试 - 单个事件的端到端延迟，以及突发写入下的最大持续事件速率和丢弃数
+
+延迟: 本地调用 files.write 到收到对应事件的耗时 (含写入本身的往返)。
+速率: 沙箱内一条命令连续创建 N 个文件，统计收到的原始事件数、合并数、丢弃数和事件/秒。
+
+用法:
+    python -m benchmarks.bench_watch --latency-samples 50 --bursts 1000,10000
+    python -m benchmarks.bench_watch --capacity 1000 --window 0.05
+"""
+import argparse
+import time
+from typing import List, Optional
+
+from benchmarks.common import parse_list, summarize, write_report
+
+from ucloud_sandbox import Sandbox
+
+from utils.watcher import DirWatcher
+
+
+WATCH_DIR = "/home/user/watch_bench"
+DEFAULT_BURSTS = [1000, 10000]
+
+
+def bench_latency(sbx: Sandbox, samples: int) -> dict:
+    latencies = []
+    with DirWatcher(sbx, WATCH_DIR, window=0) as watcher:
+        for i in range(samples):
+            name = f"latency_{i}.txt"
+            start = time.perf_counter()
+            sbx.files.write(f"{WATCH_DIR}/{name}", "x")
+            deadline = start + 10
+            while time.perf_counter() < deadline:
+                batch = watcher.next_batch(timeout=deadline - time.perf_counter())
+                if batch is None:
+                    break
+                matched = [e for e in batch if e.name.endswith(name)]
+                if matched:
+                    latencies.append(matched[0].first_seen - start)
+                    break
+    return {
+        "samples": samples,
+        "received": len(latencies),
+        "latency": summarize(latencies),
+    }
+
+
+def bench_burst(sbx: Sandbox, files: int, window: float, capacity: int) -> dict:
+    sbx.commands.run(f"rm -rf {WATCH_DIR} && mkdir -p {WATCH_DIR}")
+    with DirWatcher(sbx, WATCH_DIR, window=window, capacity=capacity) as watcher:
+        start = time.perf_counter()
+        sbx.commands.run(
+            f"cd {WATCH_DIR} && for i in $(seq 1 {files}); do echo $i > f_$i; done"
+        )
+        produced = time.perf_counter() - start
+
+        batches = 0
+        delivered = 0
+        dropped = 0
+        first_seen = None
+        last_seen = None
+        # 生产结束后 2 秒内没有新批次即认为事件已全部到达
+        while True:
+            batch = watcher.next_batch(timeout=2)
+            if batch is None:
+                break
+            batches += 1
+            delivered += len(batch)
+            dropped += batch.dropped
+            for event in batch:
+                first_seen = event.first_seen if first_seen is None else min(first_seen, event.first_seen)
+                last_seen = event.last_seen if last_seen is None else max(last_seen, event.last_seen)
+        stats = watcher.buffer.stats()
+
+    span = (last_seen - first_seen) if first_seen is not None else 0.0
+    return {
+        "files": files,
+        "produce_seconds": produced,
+        "raw_events": stats["received"],
+        "coalesced": stats["coalesced"],
+        "delivered": delivered,
+        "dropped": dropped,
+        "batches": batches,
+        "events_per_second": stats["received"] / span if span > 0 else 0.0,
+        # 最后一个事件到达时间相对于生产命令结束时间的滞后
+        "lag_seconds": (last_seen - start - produced) if last_seen is not None else None,
+    }
+
+
+def run_benchmark(
+    latency_samples: int,
+    bursts: List[int],
+    window: float = 0.1,
+    capacity: int = 100000,
+) -> dict:
+    sbx = Sandbox.create(timeout=1800)
+    try:
+        sbx.files.make_dir(WATCH_DIR)
+        latency = bench_latency(sbx, latency_samples)
+        print(
+            f"  延迟: p50={latency['latency']['p50'] * 1000:.1f}ms "
+            f"p99={latency['latency']['p99'] * 1000:.1f}ms ({latency['received']}/{latency_samples})"
+        )
+
+        burst_rows = []
+        for files in bursts:
+            row = bench_burst(sbx, files, window, capacity)
+            print(
+                f"  突发 {files:>6} 文件: 原始事件 {row['raw_events']} 合并 {row['coalesced']} "
+                f"丢弃 {row['dropped']} 速率 {row['events_per_second']:.0f} 事件/秒"
+            )
+            burst_rows.append(row)
+    finally:
+        sbx.kill()
+
+    return {
+        "benchmark": "watch",
+        "window": window,
+        "capacity": capacity,
+        "latency": latency,
+        "bursts": burst_rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="目录监听基准测试")
+    parser.add_argument("--latency-samples", type=int, default=50, help="延迟采样次数 (默认 50)")
+    parser.add_argument(
+        "--bursts",
+        type=lambda v: parse_list(v, int),
+        default=DEFAULT_BURSTS,
+        help=f"逗号分隔的突发文件数 (默认 {','.join(map(str, DEFAULT_BURSTS))})"
+    )
+    parser.add_argument("--window", type=float, default=0.1, help="批次时间窗口 (秒，默认 0.1)")
+    parser.add_argument("--capacity", type=int, default=100000, help="缓冲区容量 (默认 100000)")
+    parser.add_argument("--output", "-o", type=str, help="JSON 报告输出路径 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.latency_samples, args.bursts, args.window, args.capacity)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+基准测试公共工具 - 计时、百分位统计、JSON 报告输出
+"""
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from utils.stats import PERCENTILES, percentile  # noqa: E402
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    统计一组耗时样本
+
+    Returns:
+        dict: count / mean / min / p50 / p90 / p99 / max
+    """
+    values = sorted(samples)
+    summary = {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "min": values[0] if values else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = percentile(values, pct)
+    summary["max"] = values[-1] if values else 0.0
+    return summary
+
+
+@contextmanager
+def timer(samples: Dict[str, List[float]], name: str):
+    """记录代码块耗时 (秒) 到 samples[name]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def environment() -> dict:
+    """报告中附带的运行环境信息"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "domain": os.environ.get("AGENTBOX_DOMAIN", ""),
+    }
+
+
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    """解析 1KB / 64MB / 1GB 形式的大小"""
+    text = value.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    """把字节数格式化为 1KB / 64MB / 1GB 形式"""
+    for unit in ("GB", "MB", "KB"):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def throughput(size: int, seconds: float) -> float:
+    """计算吞吐量 (MB/s)"""
+    return size / SIZE_UNITS["MB"] / seconds if seconds > 0 else 0.0
+
+
+def parse_list(value: str, cast=str) -> list:
+    """解析逗号分隔的命令行参数"""
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def write_report(report: dict, output: Optional[str] = None):
+    """输出 JSON 报告，output 为空时打印到标准输出"""
+    report = {"environment": environment(), **report}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+        print(f"报告已写入: {output}")
+    else:
+        print(text)
@@ -15,7 +15,12 @@ load_dotenv(env_path, override=True)
 os.environ["E2B_ENV_PATH"] = str(env_path)
 
 import argparse
+import contextlib
+import io
+import json
+import time
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 # 测试模块映射
 TEST_MODULES = {
@@ -28,6 +33,26 @@ TEST_MODULES = {
     "template_build": "tests.test_template_build",
     "uhub_registry": "tests.test_uhub_registry",
     "exceptions": "tests.test_exceptions",
+    "code_interpreter_context": "tests.test_code_interpreter_context",
+    "desktop_interaction": "tests.test_desktop_interaction",
+    "sandbox_pool": "tests.test_sandbox_pool",
+    "upload": "tests.test_upload",
+    "download": "tests.test_download",
+    "sync": "tests.test_sync",
+    "tar_transfer": "tests.test_tar_transfer",
+    "compression": "tests.test_compression",
+    "read_cache": "tests.test_read_cache",
+    "batch_fs": "tests.test_batch_fs",
+    "listing": "tests.test_listing",
+    "watcher": "tests.test_watcher",
+    "shell_session": "tests.test_shell_session",
+    "command_batch": "tests.test_command_batch",
+    "output_capture": "tests.test_output_capture",
+    "fanout": "tests.test_fanout",
+    "pty_expect": "tests.test_pty_expect",
+    "vt_screen": "tests.test_vt_screen",
+    "pty_record": "tests.test_pty_record",
+    "pty_mux": "tests.test_pty_mux",
 }
 
 # 新 SDK 核心测试组
@@ -41,6 +66,12 @@ CORE_TESTS = [
     "exceptions",
 ]
 
+# 历史耗时记录文件，用于并行调度
+DURATIONS_FILE = Path(__file__).parent / ".test_durations.json"
+
+# 没有历史记录的测试模块的默认耗时估计 (秒)
+DEFAULT_TEST_COST = 60.0
+
 
 def run_test(test_name: str) -> bool:
     """运行单个测试模块"""
@@ -68,26 +99,185 @@ def run_test(test_name: str) -> bool:
         return False
 
 
-def run_all_tests() -> dict:
-    """运行所有测试"""
-    results = {}
+def run_test_timed(test_name: str) -> tuple:
+    """运行单个测试模块并记录耗时
+
+    Returns:
+        tuple: (success, durations) - 是否通过和本次耗时记录
+            durations 格式: {"modules": {模块: 秒}, "tests": {"模块::测试": 秒}}
+    """
+    start = time.perf_counter()
+    success = run_test(test_name)
+    elapsed = time.perf_counter() - start
     
-    for test_name in TEST_MODULES:
-        results[test_name] = run_test(test_name)
+    # run_tests_safely 会把每个测试函数的耗时写入 tests.conftest.TEST_DURATIONS
+    conftest = sys.modules.get("tests.conftest")
+    test_durations = getattr(conftest, "TEST_DURATIONS", {})
     
-    return results
+    durations = {
+        "modules": {test_name: elapsed},
+        "tests": {
+            f"{test_name}::{name}": seconds
+            for name, seconds in test_durations.items()
+        },
+    }
+    test_durations.clear()
+    return success, durations
 
 
-def run_core_tests() -> dict:
-    """运行核心测试"""
+def run_test_captured(test_name: str) -> tuple:
+    """在子进程中运行单个测试模块，捕获其全部输出
+
+    Returns:
+        tuple: (success, output, durations) - 是否通过、捕获的 stdout/stderr 内容和耗时记录
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        success, durations = run_test_timed(test_name)
+    return success, buffer.getvalue(), durations
+
+
+def load_durations(path: Path = DURATIONS_FILE) -> dict:
+    """读取历史耗时记录，文件不存在或损坏时返回空记录"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = {}
+    
+    return {
+        "modules": dict(history.get("modules", {})),
+        "tests": dict(history.get("tests", {})),
+    }
+
+
+def save_durations(durations: dict, path: Path = DURATIONS_FILE):
+    """将本次耗时合并进历史记录文件"""
+    history = load_durations(path)
+    history["modules"].update(durations.get("modules", {}))
+    history["tests"].update(durations.get("tests", {}))
+    
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2, ensure_ascii=False, sort_keys=True)
+    except OSError as e:
+        print(f"⚠ 无法保存耗时记录 {path}: {e}")
+
+
+def estimate_cost(test_name: str, history: dict, default_cost: float = DEFAULT_TEST_COST) -> float:
+    """根据历史记录估计测试模块耗时
+
+    优先使用模块的整体耗时，其次是各测试函数耗时之和，都没有时使用默认值。
+    """
+    if test_name in history["modules"]:
+        return history["modules"][test_name]
+    
+    prefix = f"{test_name}::"
+    test_costs = [v for k, v in history["tests"].items() if k.startswith(prefix)]
+    if test_costs:
+        return sum(test_costs)
+    
+    return default_cost
+
+
+def plan_lpt(test_names: list, costs: dict, jobs: int) -> list:
+    """最长处理时间优先 (LPT) 调度
+
+    按耗时从大到小依次分配给当前负载最小的 worker。
+    进程池中空闲 worker 按提交顺序取任务，因此按返回的顺序提交即可得到同样的分配。
+
+    Returns:
+        list: 每个 worker 的 (预计总耗时, [测试模块]) 列表
+    """
+    workers = [(0.0, []) for _ in range(max(1, min(jobs, len(test_names))))]
+    
+    for test_name in sorted(test_names, key=lambda name: costs[name], reverse=True):
+        index = min(range(len(workers)), key=lambda i: workers[i][0])
+        load, assigned = workers[index]
+        workers[index] = (load + costs[test_name], assigned + [test_name])
+    
+    return workers
+
+
+def run_tests_parallel(
+    test_names: list,
+    jobs: int,
+    history: dict,
+    default_cost: float = DEFAULT_TEST_COST,
+) -> tuple:
+    """使用进程池并行运行测试模块
+
+    按历史耗时做 LPT 调度提交，输出在子进程中捕获，
+    再按 test_names 的顺序回放，因此日志与顺序执行时保持一致。
+    """
+    costs = {name: estimate_cost(name, history, default_cost) for name in test_names}
+    plan = plan_lpt(test_names, costs, jobs)
+    submit_order = sorted(test_names, key=lambda name: costs[name], reverse=True)
+    
+    print(f"并行运行 {len(test_names)} 个测试模块 (jobs={jobs})")
+    for i, (load, assigned) in enumerate(plan):
+        print(f"  worker {i}: 预计 {load:.1f}s - {', '.join(assigned)}")
+    print(f"预计总耗时: {max(load for load, _ in plan):.1f}s")
+    
     results = {}
+    durations = {"modules": {}, "tests": {}}
     
-    for test_name in CORE_TESTS:
-        results[test_name] = run_test(test_name)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            test_name: executor.submit(run_test_captured, test_name)
+            for test_name in submit_order
+        }
+        
+        for test_name in test_names:
+            try:
+                success, output, module_durations = futures[test_name].result()
+                durations["modules"].update(module_durations["modules"])
+                durations["tests"].update(module_durations["tests"])
+            except Exception as e:
+                success, output = False, f"\n❌ 测试 {test_name} 失败: {e}\n"
+            sys.stdout.write(output)
+            sys.stdout.flush()
+            results[test_name] = success
     
+    return results, durations
+
+
+def run_tests(
+    test_names: list,
+    jobs: int = 1,
+    durations_file: Path = DURATIONS_FILE,
+    default_cost: float = DEFAULT_TEST_COST,
+) -> dict:
+    """运行一组测试模块，jobs > 1 时使用进程池并行执行
+
+    每次运行的耗时会合并进 durations_file，供下次调度使用。
+    """
+    if jobs > 1:
+        history = load_durations(durations_file)
+        results, durations = run_tests_parallel(test_names, jobs, history, default_cost)
+    else:
+        results = {}
+        durations = {"modules": {}, "tests": {}}
+        
+        for test_name in test_names:
+            results[test_name], module_durations = run_test_timed(test_name)
+            durations["modules"].update(module_durations["modules"])
+            durations["tests"].update(module_durations["tests"])
+    
+    save_durations(durations, durations_file)
     return results
 
 
+def run_all_tests(jobs: int = 1, **kwargs) -> dict:
+    """运行所有测试"""
+    return run_tests(list(TEST_MODULES), jobs, **kwargs)
+
+
+def run_core_tests(jobs: int = 1, **kwargs) -> dict:
+    """运行核心测试"""
+    return run_tests(CORE_TESTS, jobs, **kwargs)
+
+
 def print_summary(results: dict):
     """打印测试摘要"""
     print("\n" + "=" * 60)
@@ -128,9 +318,35 @@ def main():
         action="store_true",
         help="运行所有测试"
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="并行运行的测试模块数 (默认 1，即顺序执行)"
+    )
+    parser.add_argument(
+        "--durations-file",
+        type=Path,
+        default=DURATIONS_FILE,
+        help=f"历史耗时记录文件 (默认 {DURATIONS_FILE.name})"
+    )
+    parser.add_argument(
+        "--default-cost",
+        type=float,
+        default=DEFAULT_TEST_COST,
+        help=f"无历史记录的测试模块的默认耗时估计，单位秒 (默认 {DEFAULT_TEST_COST:.0f})"
+    )
     
     args = parser.parse_args()
     
+    if args.jobs < 1:
+        parser.error("--jobs 必须大于等于 1")
+    
+    run_options = {
+        "durations_file": args.durations_file,
+        "default_cost": args.default_cost,
+    }
+    
     if args.list:
         print("可用测试:")
         print("\n核心测试 (ucloud-agentbox SDK):")
@@ -141,22 +357,23 @@ def main():
         return
     
     if args.test:
-        success = run_test(args.test)
+        results = run_tests([args.test], **run_options)
+        success = results[args.test]
         sys.exit(0 if success else 1)
     elif args.core:
-        results = run_core_tests()
+        results = run_core_tests(args.jobs, **run_options)
         print_summary(results)
         failed = sum(1 for v in results.values() if not v)
         sys.exit(0 if failed == 0 else 1)
     elif args.all:
-        results = run_all_tests()
+        results = run_all_tests(args.jobs, **run_options)
         print_summary(results)
         failed = sum(1 for v in results.values() if not v)
         sys.exit(0 if failed == 0 else 1)
     else:
         # 默认运行核心测试
         print("运行核心测试 (使用 --all 运行所有测试)")
-        results = run_core_tests()
+        results = run_core_tests(args.jobs, **run_options)
         print_summary(results)
         failed = sum(1 for v in results.values() if not v)
         sys.exit(0 if failed == 0 else 1)
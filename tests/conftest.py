@@ -1,8 +1,11 @@
 """
 pytest 配置和共享 fixtures
 """
+import asyncio
+import functools
 import os
 import sys
+import time
 from pathlib import Path
 from typing import Generator
 
@@ -16,6 +19,8 @@ load_dotenv(env_path, override=True)
 # 导入 SDK
 from ucloud_sandbox import Sandbox, AsyncSandbox
 
+from utils.sandbox_pool import SandboxPool
+
 
 @pytest.fixture(scope="session")
 def api_key() -> str:
@@ -59,6 +64,28 @@ async def async_sandbox() -> AsyncSandbox:
         pass
 
 
+@pytest.fixture(scope="session")
+def sandbox_pool() -> Generator[SandboxPool, None, None]:
+    """
+    会话级沙箱预热池
+
+    池大小由环境变量 SANDBOX_POOL_SIZE 控制 (默认 2)，
+    会话结束时打印命中率和等待耗时，便于按 CI worker 调整池大小。
+    """
+    size = int(os.environ.get("SANDBOX_POOL_SIZE", "2"))
+    pool = SandboxPool(size=size)
+    yield pool
+    pool.close()
+    print(f"\n沙箱池统计: {pool.stats.as_dict()}")
+
+
+@pytest.fixture
+def pooled_sandbox(sandbox_pool: SandboxPool) -> Generator[Sandbox, None, None]:
+    """从预热池租借一个默认模板沙箱，测试结束后清理并归还"""
+    with sandbox_pool.lease() as sbx:
+        yield sbx
+
+
 def pytest_configure(config):
     """pytest 配置钩子"""
     config.addinivalue_line(
@@ -69,6 +96,18 @@ def pytest_configure(config):
     )
 
 
+def run_async(test_func):
+    """把异步测试包装为同步函数，供 run_tests_safely 调用"""
+    @functools.wraps(test_func)
+    def wrapper():
+        return asyncio.run(test_func())
+    return wrapper
+
+
+# 每个测试函数的耗时 (秒)，由 run_tests_safely 记录，run_tests.py 读取后写入历史记录
+TEST_DURATIONS = {}
+
+
 def run_tests_safely(tests: list, module_name: str = ""):
     """
     安全地运行测试列表，单个测试失败不会终止其他测试
@@ -87,6 +126,7 @@ def run_tests_safely(tests: list, module_name: str = ""):
     
     for test_func in tests:
         test_name = test_func.__name__
+        start = time.perf_counter()
         try:
             test_func()
             passed.append(test_name)
@@ -95,6 +135,8 @@ def run_tests_safely(tests: list, module_name: str = ""):
             print(f"\n❌ 测试 {test_name} 失败: {e}")
             traceback.print_exc()
             print()  # 空行分隔
+        finally:
+            TEST_DURATIONS[test_name] = time.perf_counter() - start
     
     # 打印总结
     print("\n" + "=" * 60)
@@ -289,7 +289,9 @@ async def test_async_concurrent_operations():
 
 def run_all():
     """运行所有异步测试"""
+    import time
     import traceback
+    from tests.conftest import TEST_DURATIONS
     
     async def run_tests():
         tests = [
@@ -310,6 +312,7 @@ def run_all():
         
         for test_func in tests:
             test_name = test_func.__name__
+            start = time.perf_counter()
             try:
                 await test_func()
                 passed.append(test_name)
@@ -318,6 +321,8 @@ def run_all():
                 print(f"\n❌ 测试 {test_name} 失败: {e}")
                 traceback.print_exc()
                 print()  # 空行分隔
+            finally:
+                TEST_DURATIONS[test_name] = time.perf_counter() - start
         
         # 打印总结
         print("\n" + "=" * 60)
@@ -0,0 +1,98 @@
+"""
+批量元数据操作测试 - exists_many / get_info_many / remove_many / make_dirs
+"""
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox, FileType
+
+from utils.batch_fs import PathError, exists_many, get_info_many, make_dirs, remove_many
+
+
+def test_make_dirs_and_exists_many():
+    """测试批量创建目录并一次判断所有层级存在"""
+    print("=" * 50)
+    print("测试: 批量创建目录与存在性检查")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        created = make_dirs(sbx, ["/home/user/nested/level1/level2/level3", "/home/user/other dir", "/home/user"])
+        print(f"创建结果: {created}")
+        assert created["/home/user/nested/level1/level2/level3"] is True
+        assert created["/home/user/other dir"] is True
+        assert created["/home/user"] is False
+
+        paths = [
+            "/home/user/nested",
+            "/home/user/nested/level1",
+            "/home/user/nested/level1/level2",
+            "/home/user/nested/level1/level2/level3",
+            "/home/user/other dir",
+            "/home/user/missing",
+        ]
+        exists = exists_many(sbx, paths)
+        print(f"存在性: {exists}")
+        assert all(exists[p] for p in paths[:5])
+        assert exists["/home/user/missing"] is False
+
+        print("✓ 批量创建目录与存在性检查测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def test_get_info_and_remove_many():
+    """测试批量获取信息与批量删除，单个路径的错误不影响其他路径"""
+    print("\n" + "=" * 50)
+    print("测试: 批量获取信息与删除")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        sbx.files.write("/home/user/a.txt", "hello")
+        sbx.files.make_dir("/home/user/dir_b")
+        sbx.commands.run("ln -s a.txt /home/user/link_c")
+
+        infos = get_info_many(sbx, ["/home/user/a.txt", "/home/user/dir_b", "/home/user/link_c", "/home/user/missing"])
+        print(f"信息: {infos}")
+        assert infos["/home/user/a.txt"].type == FileType.FILE
+        assert infos["/home/user/a.txt"].size == 5
+        assert infos["/home/user/a.txt"].permissions == sbx.files.get_info("/home/user/a.txt").permissions
+        assert infos["/home/user/dir_b"].type == FileType.DIR
+        assert infos["/home/user/link_c"].type == FileType.SYMLINK
+        assert infos["/home/user/link_c"].symlink_target == "a.txt"
+        assert isinstance(infos["/home/user/missing"], PathError)
+
+        removed = remove_many(sbx, ["/home/user/a.txt", "/home/user/dir_b", "/home/user/missing"])
+        print(f"删除结果: {removed}")
+        assert removed["/home/user/a.txt"] is True
+        assert removed["/home/user/dir_b"] is True
+        assert isinstance(removed["/home/user/missing"], PathError)
+
+        exists = exists_many(sbx, ["/home/user/a.txt", "/home/user/dir_b"])
+        assert not any(exists.values())
+
+        print("✓ 批量获取信息与删除测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def run_all():
+    """运行所有批量元数据操作测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_make_dirs_and_exists_many,
+        test_get_info_and_remove_many,
+    ]
+    run_tests_safely(tests, "batch_fs")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,91 @@
+"""
+批量命令执行测试 - 顺序/并行执行、每条命令独立结果
+"""
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import AsyncSandbox, Sandbox
+
+from utils.command_batch import run_batch, run_batch_async
+
+
+def test_run_batch_results():
+    """测试每条命令的退出码、stdout、stderr 分别返回"""
+    print("=" * 50)
+    print("测试: 批量命令执行结果")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        results = run_batch(sbx, [
+            "echo 'Hello World'",
+            "echo warning >&2; exit 3",
+            "cd /tmp && pwd",
+            "pwd",
+            "python3 --version",
+            "sleep 10",
+        ], cwd="/home/user", command_timeout=2)
+
+        for result in results:
+            print(f"  {result}")
+        assert results[0].stdout == "Hello World\n"
+        assert results[1].exit_code == 3
+        assert results[1].stderr == "warning\n"
+        assert results[2].stdout == "/tmp\n"
+        # 每条命令在独立子 shell 中运行，cd 不影响后续命令
+        assert results[3].stdout == "/home/user\n"
+        assert results[5].exit_code == 124
+        assert all(r.duration >= 0 for r in results)
+
+        print("✓ 批量命令执行结果测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+async def test_run_batch_parallel():
+    """测试并行度限制与异步版本"""
+    print("\n" + "=" * 50)
+    print("测试: 批量命令并行执行")
+    print("=" * 50)
+
+    sbx = await AsyncSandbox.create(timeout=60)
+    try:
+        commands = [f"sleep 1; echo {i}" for i in range(4)]
+
+        start = time.perf_counter()
+        results = await run_batch_async(sbx, commands, parallelism=4)
+        parallel = time.perf_counter() - start
+        assert [r.stdout for r in results] == [f"{i}\n" for i in range(4)]
+
+        start = time.perf_counter()
+        await run_batch_async(sbx, commands, parallelism=1)
+        sequential = time.perf_counter() - start
+
+        print(f"并行: {parallel:.2f}s, 顺序: {sequential:.2f}s")
+        assert sequential - parallel > 2
+
+        print("✓ 批量命令并行执行测试通过")
+        return True
+    finally:
+        await sbx.kill()
+
+
+def run_all():
+    """运行所有批量命令测试"""
+    from tests.conftest import run_async, run_tests_safely
+
+    tests = [
+        test_run_batch_results,
+        run_async(test_run_batch_parallel),
+    ]
+    run_tests_safely(tests, "command_batch")
+
+
+if __name__ == "__main__":
+    run_all()
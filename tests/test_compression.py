@@ -0,0 +1,102 @@
+"""
+传输压缩测试 - 自适应压缩上传、下载
+"""
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.compression import read_compressed, write_compressed
+
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+def test_write_compressed():
+    """测试文本自动压缩上传、已压缩格式跳过压缩"""
+    print("=" * 50)
+    print("测试: 自适应压缩上传")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=120)
+    try:
+        text = "".join(f"line {i}: the quick brown fox jumps over the lazy dog\n" for i in range(20000))
+        stats = write_compressed(sbx, "/home/user/text.log", text)
+        print(f"文本上传: {stats}")
+        # gzip 走 SDK 原生传输，不经过沙箱内命令；高度可压缩的文本使用级别 9
+        assert stats["codec"] == "gzip" and stats["wire_bytes"] is None
+        assert stats["level"] == 9
+        assert sbx.files.read("/home/user/text.log") == text
+
+        png = PNG_HEADER + bytes(range(256)) * 256
+        stats = write_compressed(sbx, "/home/user/image.png", png)
+        print(f"PNG 上传: {stats}")
+        assert stats["codec"] is None
+        assert sbx.files.read("/home/user/image.png", format="bytes") == png
+
+        stats = write_compressed(sbx, "/home/user/text_xz.log", text, codec="xz", level=1)
+        assert stats["codec"] == "xz"
+        assert stats["wire_bytes"] < stats["raw_bytes"] / 5
+        assert sbx.files.read("/home/user/text_xz.log") == text
+
+        print("✓ 压缩上传测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def test_read_compressed():
+    """测试沙箱内压缩后下载"""
+    print("\n" + "=" * 50)
+    print("测试: 自适应压缩下载")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=120)
+    try:
+        sbx.commands.run("seq 1 200000 > /home/user/numbers.txt")
+        expected = "".join(f"{i}\n" for i in range(1, 200001))
+
+        content, stats = read_compressed(sbx, "/home/user/numbers.txt", format="text")
+        print(f"文本下载: {stats}")
+        assert content == expected
+        assert stats["codec"] == "gzip"
+        # 传输字节数为 HTTP 响应实际接收的字节数
+        assert 0 < stats["wire_bytes"] < stats["raw_bytes"]
+
+        content, stats = read_compressed(sbx, "/home/user/numbers.txt", format="text", prefer=("xz", "gzip"))
+        print(f"xz 文本下载: {stats}")
+        assert content == expected
+        assert stats["codec"] == "xz"
+        assert stats["wire_bytes"] < stats["raw_bytes"]
+
+        # 先在沙箱内采样，不可压缩的数据不请求 gzip 或 xz，直接读取
+        sbx.commands.run("head -c 1048576 /dev/urandom > /home/user/random.bin")
+        for prefer in (("gzip",), ("xz",)):
+            content, stats = read_compressed(sbx, "/home/user/random.bin", prefer=prefer)
+            print(f"随机数据下载 (prefer={prefer}): {stats}")
+            assert stats["codec"] is None
+            assert len(content) == 1048576
+
+        print("✓ 压缩下载测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def run_all():
+    """运行所有传输压缩测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_write_compressed,
+        test_read_compressed,
+    ]
+    run_tests_safely(tests, "compression")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,91 @@
+"""
+大文件下载测试 - 流式下载、并行范围下载
+"""
+import os
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.download import download_file
+
+
+def test_stream_download():
+    """测试小文件流式下载到预分配文件"""
+    print("=" * 50)
+    print("测试: 流式下载")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=120)
+    fd, local_path = tempfile.mkstemp(suffix=".bin")
+    os.close(fd)
+    try:
+        content = os.urandom(256 * 1024)
+        sbx.files.write("/home/user/download_small.bin", content)
+
+        result = download_file(sbx, "/home/user/download_small.bin", local_path, verify=True)
+
+        print(f"下载统计: {result}")
+        assert result["parallel"] == False
+        with open(local_path, "rb") as f:
+            assert f.read() == content
+
+        print("✓ 流式下载测试通过")
+        return True
+    finally:
+        sbx.kill()
+        os.remove(local_path)
+
+
+def test_parallel_range_download():
+    """测试按字节范围并行下载"""
+    print("\n" + "=" * 50)
+    print("测试: 并行范围下载")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=120)
+    fd, local_path = tempfile.mkstemp(suffix=".bin")
+    os.close(fd)
+    try:
+        # 在沙箱内生成 10MB + 1 字节的随机文件
+        sbx.commands.run("head -c 10485761 /dev/urandom > /home/user/download_large.bin")
+
+        result = download_file(
+            sbx,
+            "/home/user/download_large.bin",
+            local_path,
+            range_size=1024 * 1024,
+            parallel_threshold=1024 * 1024,
+            verify=True,
+        )
+
+        print(f"下载统计: {result}")
+        assert result["parallel"] == True
+        assert result["ranges"] == 11
+        assert os.path.getsize(local_path) == 10485761
+
+        print("✓ 并行范围下载测试通过")
+        return True
+    finally:
+        sbx.kill()
+        os.remove(local_path)
+
+
+def run_all():
+    """运行所有下载测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_stream_download,
+        test_parallel_range_download,
+    ]
+    run_tests_safely(tests, "download")
+
+
+if __name__ == "__main__":
+    run_all()
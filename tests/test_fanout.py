@@ -0,0 +1,215 @@
+"""
+多沙箱命令分发测试 - 注入假 connect / list_sandboxes 的单元测试 (并发限制/超时/失败分组/列出条件)，
+真实沙箱上的 metadata 筛选
+"""
+import asyncio
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import AsyncSandbox, SandboxNotFoundException, SandboxState
+
+from utils.fanout import fan_out, fan_out_iter
+
+
+class FakeCommandResult:
+    def __init__(self, exit_code: int, stdout: str, stderr: str):
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+class FakeCluster:
+    """
+    进程内假沙箱集合，作为注入 fan_out 的 connect / list_sandboxes 使用，不经过 SDK 的 HTTP 代码
+
+    命令按 sandbox_id 的行为模拟: 以 slow 结尾的沙箱超时，以 fail 结尾的沙箱退出码 2，
+    以 gone 结尾的沙箱连接时抛出 SandboxNotFoundException，其余沙箱稍作等待后成功
+    """
+
+    def __init__(self, sandboxes: list):
+        self.sandboxes = sandboxes
+        self.queries = []
+        self.list_kwargs = []
+        self.running = 0
+        self.max_running = 0
+
+    async def connect(self, sandbox_id: str, **kwargs):
+        if sandbox_id.endswith("gone"):
+            raise SandboxNotFoundException(f"sandbox {sandbox_id} not found")
+        return FakeSandbox(self, sandbox_id)
+
+    def list(self, query=None, **kwargs):
+        self.queries.append(query)
+        self.list_kwargs.append(kwargs)
+        items = [
+            FakeSandboxInfo(s["sandbox_id"], s["metadata"], s["state"]) for s in self.sandboxes
+            if all(s["metadata"].get(k) == v for k, v in (query.metadata or {}).items())
+            and (not query.state or s["state"] in query.state)
+        ]
+        return FakePaginator(items)
+
+
+class FakeCommands:
+    def __init__(self, cluster: FakeCluster, sandbox_id: str):
+        self._cluster = cluster
+        self._sandbox_id = sandbox_id
+
+    async def run(self, cmd: str, timeout: float = 60):
+        cluster = self._cluster
+        cluster.running += 1
+        cluster.max_running = max(cluster.max_running, cluster.running)
+        try:
+            if self._sandbox_id.endswith("slow"):
+                await asyncio.sleep(2)
+                return FakeCommandResult(0, "", "")
+            await asyncio.sleep(0.05)
+            if self._sandbox_id.endswith("fail"):
+                return FakeCommandResult(2, "", "health check failed\n")
+            return FakeCommandResult(0, f"{self._sandbox_id}\n", "")
+        finally:
+            cluster.running -= 1
+
+
+class FakeSandbox:
+    def __init__(self, cluster: FakeCluster, sandbox_id: str):
+        self.sandbox_id = sandbox_id
+        self.commands = FakeCommands(cluster, sandbox_id)
+
+
+class FakeSandboxInfo:
+    def __init__(self, sandbox_id: str, metadata: dict, state: SandboxState):
+        self.sandbox_id = sandbox_id
+        self.metadata = metadata
+        self.state = state
+
+
+class FakePaginator:
+    """按每页 2 个返回，覆盖分页逻辑"""
+
+    def __init__(self, items: list):
+        self._items = items
+        self.has_next = True
+
+    async def next_items(self):
+        page, self._items = self._items[:2], self._items[2:]
+        self.has_next = bool(self._items)
+        return page
+
+
+async def test_fanout_injected():
+    """测试并发上限、超时、失败分组、按完成顺序返回和列出条件 (单元测试，注入假 connect / list_sandboxes)"""
+    print("=" * 50)
+    print("测试: 注入假沙箱的命令分发")
+    print("=" * 50)
+
+    def sandbox(sandbox_id, role="web", state=SandboxState.RUNNING):
+        return {"sandbox_id": sandbox_id, "metadata": {"role": role}, "state": state}
+
+    sandboxes = [sandbox(f"sbx-{i}") for i in range(20)]
+    sandboxes += [
+        sandbox("sbx-a-fail"),
+        sandbox("sbx-b-fail"),
+        sandbox("sbx-c-slow"),
+        sandbox("sbx-d-gone"),
+        sandbox("sbx-db", role="db"),
+        sandbox("sbx-paused", state=SandboxState.PAUSED),
+    ]
+    cluster = FakeCluster(sandboxes)
+
+    streamed = []
+    report = await fan_out(
+        "hostname",
+        metadata={"role": "web"},
+        concurrency=4,
+        timeout=0.5,
+        connect=cluster.connect,
+        list_sandboxes=cluster.list,
+        on_result=streamed.append,
+        domain="sandbox.local",
+        on_resume="restore",
+    )
+    print(f"汇总: total={report['total']} succeeded={report['succeeded']} failed={report['failed']}")
+    print(f"延迟: {report['latency']}")
+    for key, group in report["failure_groups"].items():
+        print(f"  {group['count']} x {key}")
+
+    # metadata 和状态作为 query 交给 list，已暂停的沙箱不会被连接 (连接会恢复它)
+    query = cluster.queries[0]
+    assert query.metadata == {"role": "web"} and query.state == [SandboxState.RUNNING]
+    # 连接参数中的 ApiParams 同样传给 list，其余参数只传给 connect
+    assert cluster.list_kwargs[0] == {"domain": "sandbox.local"}
+    assert report["total"] == 24
+    assert report["succeeded"] == 20
+    assert not {"sbx-db", "sbx-paused"} & {r.sandbox_id for r in streamed}
+    assert cluster.max_running <= 4
+    groups = report["failure_groups"]
+    assert groups["exit 2: health check failed"]["count"] == 2
+    assert any(key.startswith("TimeoutError") for key in groups)
+    assert any(key.startswith("SandboxNotFoundException") for key in groups)
+    # 超时的沙箱最后完成
+    assert streamed[-1].sandbox_id == "sbx-c-slow"
+    assert report["latency"]["p50"] <= report["latency"]["p99"]
+
+    # 提前停止迭代会取消剩余执行
+    results = fan_out_iter("hostname", [s["sandbox_id"] for s in sandboxes], concurrency=2, connect=cluster.connect)
+    async for result in results:
+        assert result.sandbox_id
+        break
+    await results.aclose()
+    assert cluster.running == 0
+
+    print("✓ 注入假沙箱命令分发测试通过")
+    return True
+
+
+async def test_fanout_sandboxes():
+    """测试在真实沙箱上按 metadata 筛选目标并分发命令"""
+    print("\n" + "=" * 50)
+    print("测试: 真实沙箱命令分发")
+    print("=" * 50)
+
+    marker = f"fanout-{int(time.time() * 1000)}"
+    sandboxes = await asyncio.gather(*[
+        AsyncSandbox.create(timeout=120, metadata={"fanout_test": marker}) for _ in range(3)
+    ])
+    try:
+        report = await fan_out(
+            "cat /etc/hostname >/dev/null && echo ok",
+            metadata={"fanout_test": marker},
+            concurrency=2,
+            timeout=30,
+        )
+        print(f"汇总: total={report['total']} succeeded={report['succeeded']} latency={report['latency']}")
+        assert report["total"] == 3
+        assert report["succeeded"] == 3
+        assert sorted(r["sandbox_id"] for r in report["results"]) == sorted(s.sandbox_id for s in sandboxes)
+
+        ids = [s.sandbox_id for s in sandboxes]
+        report = await fan_out("exit 7", sandbox_ids=ids, timeout=30)
+        assert report["failed"] == 3
+        assert report["failure_groups"]["exit 7: "]["count"] == 3
+
+        print("✓ 真实沙箱命令分发测试通过")
+        return True
+    finally:
+        await asyncio.gather(*[s.kill() for s in sandboxes], return_exceptions=True)
+
+
+def run_all():
+    """运行所有命令分发测试"""
+    from tests.conftest import run_async, run_tests_safely
+
+    tests = [
+        run_async(test_fanout_injected),
+        run_async(test_fanout_sandboxes),
+    ]
+    run_tests_safely(tests, "fanout")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,105 @@
+"""
+流式递归列目录测试 - 分页、沙箱内过滤
+"""
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import EntryInfo, Sandbox, FileType
+
+from utils.listing import iter_entries, list_recursive
+
+
+def test_iter_entries_pages():
+    """测试大目录树分页流式返回"""
+    print("=" * 50)
+    print("测试: 流式递归列目录")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=120)
+    try:
+        sbx.commands.run(
+            "mkdir -p /home/user/tree && cd /home/user/tree && "
+            "for d in $(seq 1 10); do mkdir -p dir_$d; "
+            "for f in $(seq 1 50); do echo $f > dir_$d/file_$f.txt; done; done"
+        )
+
+        pages = list(iter_entries(sbx, "/home/user/tree", page_size=100, type="file"))
+        sizes = [len(page) for page in pages]
+        print(f"分页大小: {sizes}")
+        assert sum(sizes) == 500
+        assert max(sizes) <= 100
+        assert all(entry.type == FileType.FILE for page in pages for entry in page)
+
+        # 提前停止迭代不需要等待整个遍历
+        first = next(iter_entries(sbx, "/", page_size=10))
+        assert len(first) == 10
+
+        print("✓ 流式递归列目录测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def test_list_filters():
+    """测试 glob、类型、大小、修改时间与排除目录过滤"""
+    print("\n" + "=" * 50)
+    print("测试: 沙箱内过滤")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=120)
+    try:
+        sbx.commands.run(
+            "mkdir -p /home/user/proj/src /home/user/proj/node_modules/pkg && "
+            "echo 'print(1)' > /home/user/proj/src/main.py && "
+            "head -c 5000 /dev/zero > /home/user/proj/src/big.py && "
+            "echo 'x' > /home/user/proj/src/notes.md && "
+            "echo 'y' > /home/user/proj/node_modules/pkg/index.py && "
+            "touch -d '2020-01-01' /home/user/proj/src/notes.md && "
+            "ln -s main.py /home/user/proj/src/link.py"
+        )
+
+        py = list_recursive(sbx, "/home/user/proj", pattern="*.py", exclude=["node_modules"])
+        assert sorted(e.name for e in py) == ["big.py", "link.py", "main.py"]
+        assert all(isinstance(e, EntryInfo) for e in py)
+        link = next(e for e in py if e.name == "link.py")
+        assert link.type == FileType.SYMLINK
+        assert link.symlink_target == "main.py"
+
+        links = list_recursive(sbx, "/home/user/proj", type="symlink")
+        assert [e.name for e in links] == ["link.py"]
+
+        big = list_recursive(sbx, "/home/user/proj", type="file", min_size=1000)
+        assert [e.name for e in big] == ["big.py"]
+        assert big[0].size == 5000
+        assert big[0].permissions == "rw-r--r--"
+
+        dirs = list_recursive(sbx, "/home/user/proj", type="dir", depth=1)
+        assert sorted(e.name for e in dirs) == ["node_modules", "src"]
+
+        old = list_recursive(sbx, "/home/user/proj", type="file", modified_before=time.time() - 86400)
+        assert [e.name for e in old] == ["notes.md"]
+
+        print("✓ 沙箱内过滤测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def run_all():
+    """运行所有流式列目录测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_iter_entries_pages,
+        test_list_filters,
+    ]
+    run_tests_safely(tests, "listing")
+
+
+if __name__ == "__main__":
+    run_all()
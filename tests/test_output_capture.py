@@ -0,0 +1,137 @@
+"""
+有界输出捕获测试 - 头尾保留、真实字节数、落盘、回调
+"""
+import os
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.output_capture import TRUNCATION_MARKER, OutputCapture, run_bounded
+from utils.shell_session import ShellCommandError
+
+
+def test_capture_window():
+    """测试总量在 head + tail 与 head + 2 * tail 之间时也标记截断 (本地，不需要沙箱)"""
+    print("=" * 50)
+    print("测试: 头尾窗口边界")
+    print("=" * 50)
+
+    capture = OutputCapture(head_bytes=4, tail_bytes=4)
+    capture.write(b"0123456789")
+    print(f"结果: {capture.summary()}")
+    assert capture.head == b"0123" and capture.tail == b"6789"
+    assert capture.truncated
+    assert capture.summary()["kept_bytes"] == 8
+    assert capture.text() == "0123" + TRUNCATION_MARKER.format(omitted=2) + "6789"
+
+    # 逐字节写入跨过裁剪阈值
+    capture = OutputCapture(head_bytes=4, tail_bytes=4)
+    for i in range(8):
+        capture.write(str(i).encode())
+        assert not capture.truncated
+    for i in range(8, 13):
+        capture.write(str(i % 10).encode())
+        assert capture.truncated and capture.kept_bytes == 8
+    assert capture.text() == "0123" + TRUNCATION_MARKER.format(omitted=5) + "9012"
+
+    print("✓ 头尾窗口边界测试通过")
+    return True
+
+
+def test_head_tail_capture():
+    """测试大量输出只保留头尾，并记录真实字节数"""
+    print("\n" + "=" * 50)
+    print("测试: 头尾有界捕获")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=120)
+    try:
+        chunks = []
+        result = run_bounded(
+            sbx,
+            "seq 1 1000000; echo done >&2",
+            stdout=OutputCapture(head_bytes=1024, tail_bytes=1024),
+            on_stdout=chunks.append,
+        )
+        print(f"结果: {result.summary()}")
+
+        expected_bytes = len("".join(f"{i}\n" for i in range(1, 1000001)))
+        assert result.exit_code == 0
+        assert result.stdout.total_bytes == expected_bytes
+        assert result.stdout.truncated
+        assert result.stdout.head.startswith(b"1\n2\n3\n")
+        assert result.stdout.tail.endswith(b"999999\n1000000\n")
+        assert "省略" in result.stdout.text()
+        assert result.stderr.text() == "done\n"
+        # 回调仍然收到完整输出
+        assert len("".join(chunks)) == expected_bytes
+
+        print("✓ 头尾有界捕获测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def test_spill_and_exit_code():
+    """测试超过阈值后完整输出落盘，以及非 0 退出码"""
+    print("\n" + "=" * 50)
+    print("测试: 输出落盘与退出码")
+    print("=" * 50)
+
+    spill_dir = tempfile.mkdtemp()
+    sbx = Sandbox.create(timeout=120)
+    try:
+        spill_path = os.path.join(spill_dir, "build.log")
+        result = run_bounded(
+            sbx,
+            "for i in $(seq 1 20000); do echo \"compiling module $i\"; done",
+            stdout=OutputCapture(head_bytes=256, tail_bytes=256, spill_path=spill_path, spill_threshold=4096),
+        )
+        assert result.stdout.spilled
+        assert os.path.getsize(spill_path) == result.stdout.total_bytes
+        with open(spill_path) as f:
+            lines = f.read().splitlines()
+        assert lines[0] == "compiling module 1"
+        assert lines[-1] == "compiling module 20000"
+
+        small = run_bounded(sbx, "echo hi", stdout=OutputCapture(spill_path=os.path.join(spill_dir, "small.log")))
+        assert not small.stdout.spilled
+        assert small.stdout.text() == "hi\n"
+
+        try:
+            run_bounded(sbx, "echo failing >&2; exit 5")
+            assert False, "应该抛出 ShellCommandError"
+        except ShellCommandError as e:
+            assert e.exit_code == 5
+            assert e.stderr == "failing\n"
+        assert run_bounded(sbx, "exit 5", check=False).exit_code == 5
+
+        print("✓ 输出落盘与退出码测试通过")
+        return True
+    finally:
+        sbx.kill()
+        for name in os.listdir(spill_dir):
+            os.remove(os.path.join(spill_dir, name))
+        os.rmdir(spill_dir)
+
+
+def run_all():
+    """运行所有有界输出捕获测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_capture_window,
+        test_head_tail_capture,
+        test_spill_and_exit_code,
+    ]
+    run_tests_safely(tests, "output_capture")
+
+
+if __name__ == "__main__":
+    run_all()
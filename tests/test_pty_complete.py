@@ -2,7 +2,6 @@
 PTY 伪终端测试
 """
 import os
-import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -12,6 +11,8 @@ load_dotenv(env_path, override=True)
 
 from ucloud_sandbox import Sandbox, PtySize
 
+from utils.pty_expect import PtyDriver
+
 
 def test_pty_create():
     """测试创建 PTY"""
@@ -48,11 +49,13 @@ def test_pty_send_stdin():
         # 创建 PTY
         size = PtySize(rows=24, cols=80)
         handle = sbx.pty.create(size=size)
+        pty = PtyDriver(sbx, handle=handle)
         
         # 发送命令
         sbx.pty.send_stdin(handle.pid, b"echo 'Hello PTY'\n")
         
-        time.sleep(0.5)
+        # 等待命令输出 (回显的命令行中 Hello PTY 前是引号，不会误匹配)
+        pty.expect(r"[\r\n]Hello PTY\r\n")
         
         print(f"已发送命令到 PTY {handle.pid}")
         
@@ -132,18 +135,15 @@ def test_pty_interactive():
         # 创建 PTY
         size = PtySize(rows=24, cols=80)
         handle = sbx.pty.create(size=size)
+        pty = PtyDriver(sbx, handle=handle)
+        pty.setup_prompt()
         
-        # 发送一系列命令
-        commands = [
-            b"cd /home/user\n",
-            b"pwd\n",
-            b"ls -la\n",
-            b"exit\n",
-        ]
-        
-        for cmd in commands:
-            sbx.pty.send_stdin(handle.pid, cmd)
-            time.sleep(0.3)
+        # 发送一系列命令，每条命令等到提示符出现再发送下一条
+        pty.run("cd /home/user")
+        assert pty.run("pwd") == "/home/user\n"
+        assert pty.run("ls -la").startswith("total")
+        pty.sendline("exit")
+        assert pty.wait_closed()
         
         print("已执行交互式命令序列")
         
@@ -171,11 +171,12 @@ def test_pty_with_envs():
         size = PtySize(rows=24, cols=80)
         envs = {"MY_VAR": "my_value"}
         handle = sbx.pty.create(size=size, envs=envs)
+        pty = PtyDriver(sbx, handle=handle)
         
         # 发送命令验证环境变量
         sbx.pty.send_stdin(handle.pid, b"echo $MY_VAR\n")
         
-        time.sleep(0.5)
+        pty.expect(r"[\r\n]my_value\r\n")
         
         print(f"PTY {handle.pid} 创建时带有环境变量")
         
@@ -202,8 +203,10 @@ def test_pty_with_cwd():
         # 创建带工作目录的 PTY
         size = PtySize(rows=24, cols=80)
         handle = sbx.pty.create(size=size, cwd="/home/user/pty_cwd")
+        pty = PtyDriver(sbx, handle=handle)
+        pty.setup_prompt()
         
-        time.sleep(0.3)
+        assert pty.run("pwd") == "/home/user/pty_cwd\n"
         
         print(f"PTY {handle.pid} 工作目录: /home/user/pty_cwd")
         
@@ -0,0 +1,114 @@
+"""
+expect 风格 PTY 驱动测试 - 模式等待、超时、提示符检测
+"""
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.pty_expect import ExpectTimeout, PtyClosedError, PtyDriver
+
+
+def test_expect_patterns():
+    """测试模式匹配立即返回、多模式匹配、超时和进程退出"""
+    print("=" * 50)
+    print("测试: PTY 模式等待")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        with PtyDriver(sbx) as pty:
+            # 默认提示符检测
+            pty.expect_prompt()
+
+            start = time.perf_counter()
+            pty.sendline("sleep 1; echo done-$((6 * 7))")
+            pty.expect(r"done-(\d+)")
+            elapsed = time.perf_counter() - start
+            print(f"匹配耗时: {elapsed:.2f}s, 分组: {pty.match.group(1)}")
+            assert pty.match.group(1) == "42"
+            assert 1 <= elapsed < 3
+
+            pty.sendline("echo second")
+            pty.expect([r"first", r"[\r\n]second\r\n"])
+            assert pty.match_index == 1
+
+            try:
+                pty.expect(r"never-printed", timeout=0.5)
+                assert False, "应当超时"
+            except ExpectTimeout as e:
+                print(f"超时: {str(e)[:60]}...")
+
+            pty.sendline("exit")
+            try:
+                pty.expect(r"never-printed")
+                assert False, "PTY 退出后应当抛出 PtyClosedError"
+            except PtyClosedError:
+                pass
+            assert pty.closed
+
+        print("✓ PTY 模式等待测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def test_prompt_and_run():
+    """测试唯一提示符、run 的输出、交互式程序和 Ctrl-C"""
+    print("\n" + "=" * 50)
+    print("测试: PTY 提示符检测")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        with PtyDriver(sbx, cwd="/home/user", envs={"MODE": "expect"}) as pty:
+            pty.setup_prompt()
+            assert pty.run("echo $MODE; pwd") == "expect\n/home/user\n"
+            # 命令之间保留 shell 状态
+            pty.run("cd /tmp && export STEP=2")
+            assert pty.run("echo $PWD-$STEP") == "/tmp-2\n"
+
+            # 提示符不会误匹配命令输出中类似提示符的文本
+            assert pty.run("printf 'a $ \\nb # \\n'") == "a $ \nb # \n"
+
+            pty.sendline("python3 -q")
+            pty.expect(r">>> ")
+            pty.sendline("print(6 * 7)")
+            pty.expect(r">>> ")
+            assert "42" in pty.before
+            pty.sendline("exit()")
+            pty.expect_prompt()
+
+            pty.sendline("sleep 30")
+            pty.sendcontrol("c")
+            start = time.perf_counter()
+            pty.expect_prompt(timeout=5)
+            assert time.perf_counter() - start < 5
+
+            pty.setup_prompt(echo=True)
+            assert pty.run("echo echoed") == "echoed\n"
+
+        print("✓ PTY 提示符检测测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def run_all():
+    """运行所有 PTY 驱动测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_expect_patterns,
+        test_prompt_and_run,
+    ]
+    run_tests_safely(tests, "pty_expect")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,245 @@
+"""
+多 PTY 复用测试 - 本地假 PTY 上的背压、公平轮询与退出通知，真实沙箱上多沙箱多 PTY 的单事件循环驱动
+"""
+import asyncio
+import threading
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import AsyncSandbox
+
+from utils.pty_mux import PtyManager
+
+
+CHUNK = 16 * 1024
+
+
+class FakeExit(Exception):
+    def __init__(self, exit_code: int):
+        super().__init__(f"exit {exit_code}")
+        self.exit_code = exit_code
+
+
+class FakeResult:
+    def __init__(self, exit_code: int):
+        self.exit_code = exit_code
+
+
+class FakeHandle:
+    """
+    与 SDK 的 AsyncCommandHandle 一致: 事件任务逐块调用 on_data，回调返回协程时等待它完成后才读取下一块
+
+    输入 "flood N" 输出 N 个 16KB 块，"exit" 退出，其余输入原样回显
+    """
+
+    def __init__(self, pid: int, on_data):
+        self.pid = pid
+        self.produced = 0
+        self._on_data = on_data
+        self._inputs: asyncio.Queue = asyncio.Queue()
+        self._exit_code = None
+        self._wait = asyncio.create_task(self._handle_events())
+
+    async def _emit(self, data: bytes):
+        self.produced += len(data)
+        result = self._on_data(data)
+        if asyncio.iscoroutine(result):
+            await result
+
+    async def _handle_events(self):
+        while True:
+            data = await self._inputs.get()
+            if data is None:
+                self._exit_code = -1
+                return
+            if data == b"exit\n":
+                self._exit_code = 0
+                return
+            if data.startswith(b"flood "):
+                for i in range(int(data.split()[1])):
+                    await self._emit(bytes([97 + i % 26]) * CHUNK)
+            else:
+                await self._emit(data)
+
+    async def wait(self):
+        await self._wait
+        if self._exit_code != 0:
+            raise FakeExit(self._exit_code)
+        return FakeResult(self._exit_code)
+
+    async def disconnect(self):
+        self._wait.cancel()
+
+
+class FakePty:
+    def __init__(self):
+        self.handles = {}
+        self._next_pid = 100
+
+    async def create(self, size, on_data, **kwargs):
+        self._next_pid += 1
+        handle = FakeHandle(self._next_pid, on_data)
+        self.handles[handle.pid] = handle
+        return handle
+
+    async def send_stdin(self, pid: int, data: bytes):
+        self.handles[pid]._inputs.put_nowait(data)
+
+    async def resize(self, pid: int, size):
+        pass
+
+    async def kill(self, pid: int) -> bool:
+        self.handles[pid]._inputs.put_nowait(None)
+        return True
+
+
+class FakeAsyncSandbox:
+    def __init__(self, sandbox_id: str):
+        self.sandbox_id = sandbox_id
+        self.pty = FakePty()
+
+
+async def test_pty_manager_fake():
+    """测试有界缓冲与背压、输出多的 PTY 不饿死其他 PTY、退出通知，且不创建线程 (本地假 PTY)"""
+    print("=" * 50)
+    print("测试: 本地假 PTY 上的多 PTY 复用")
+    print("=" * 50)
+
+    threads = threading.active_count()
+    sandboxes = [FakeAsyncSandbox("sbx-a"), FakeAsyncSandbox("sbx-b")]
+    async with PtyManager(max_buffer=4 * CHUNK, quantum=CHUNK) as manager:
+        flood = await manager.create(sandboxes[0], key="flood")
+        quiet = [await manager.create(sbx) for sbx in sandboxes for _ in range(3)]
+        assert len(manager.ptys) == 7
+        assert quiet[0].key == "sbx-a:102" and quiet[-1].key == "sbx-b:103"
+
+        # 背压: 没有读取时生产者在缓冲区满后挂起
+        await flood.send("flood 100")
+        await asyncio.sleep(0.1)
+        handle = sandboxes[0].pty.handles[flood.pid]
+        print(f"  未读取时: 已产生 {handle.produced} 字节, 缓冲 {flood.buffered} 字节, 暂停 {flood.pauses} 次")
+        assert flood.buffered == 4 * CHUNK
+        assert handle.produced <= 5 * CHUNK
+        assert flood.pauses == 1
+
+        # 公平: 其他 PTY 的输出不需要等 flood 的积压读完
+        for i, pty in enumerate(quiet):
+            await pty.send(f"hello {i}\n")
+        await asyncio.sleep(0)
+        order = []
+        flood_bytes = 0
+        received = {pty.key: b"" for pty in quiet}
+        while any(not data for data in received.values()):
+            pty, data = await manager.next(timeout=5)
+            order.append(pty.key)
+            if pty is flood:
+                flood_bytes += len(data)
+            else:
+                received[pty.key] += data
+        print(f"  读取顺序: {order}")
+        assert len(order) <= 2 * len(quiet)
+        assert [received[pty.key] for pty in quiet] == [f"hello {i}\n".encode() for i in range(len(quiet))]
+
+        # 读完 flood 的全部输出，缓冲区始终不超过上限
+        for pty in quiet:
+            await pty.send("exit\n")
+        await flood.send("exit\n")
+        exited = []
+        async for pty, data in manager:
+            if not data:
+                exited.append((pty.key, pty.exit_code))
+            elif pty is flood:
+                flood_bytes += len(data)
+                assert len(data) <= CHUNK
+        print(f"  退出: {exited}")
+        stats = manager.stats()
+        print(f"  统计: {stats}")
+        assert stats["exited"] == 7 and stats["pauses"] >= 1
+        assert flood_bytes == 100 * CHUNK
+        assert flood.max_buffered <= 4 * CHUNK
+        assert sorted(exited) == sorted((pty.key, 0) for pty in [flood] + quiet)
+        assert not manager.ptys
+        assert threading.active_count() == threads
+
+    # 逐个 PTY 读取
+    async with PtyManager() as manager:
+        pty = await manager.create(sandboxes[1])
+        await pty.send("one\n")
+        assert await pty.read() == b"one\n"
+        await pty.send("exit\n")
+        assert await pty.wait() == 0
+        assert await pty.read() == b""
+
+        # close 结束仍在运行的 PTY
+        running = await manager.create(sandboxes[1])
+    assert running.closed and running.exit_code == -1
+
+    print("✓ 本地假 PTY 多 PTY 复用测试通过")
+    return True
+
+
+async def test_pty_manager_sandboxes():
+    """测试一个事件循环驱动两个沙箱各 10 个 PTY，以及慢消费者下的有界缓冲"""
+    print("\n" + "=" * 50)
+    print("测试: 真实沙箱多 PTY 复用")
+    print("=" * 50)
+
+    sandboxes = await asyncio.gather(*[AsyncSandbox.create(timeout=120) for _ in range(2)])
+    try:
+        async with PtyManager(max_buffer=256 * 1024) as manager:
+            ptys = await asyncio.gather(*[
+                manager.create(sbx, key=f"{n}-{i}") for n, sbx in enumerate(sandboxes) for i in range(10)
+            ])
+            for pty in ptys:
+                await pty.sendline(f"echo __OUT_''{pty.key}__; exit")
+
+            output = {pty.key: b"" for pty in ptys}
+            exit_codes = {}
+            async for pty, data in manager:
+                if data:
+                    output[pty.key] += data
+                else:
+                    exit_codes[pty.key] = pty.exit_code
+            assert exit_codes == {pty.key: 0 for pty in ptys}
+            for key, data in output.items():
+                assert f"__OUT_{key}__".encode() in data, key
+            print(f"  {len(ptys)} 个 PTY 均已输出并退出")
+
+            # 慢消费者: 读取很慢时缓冲区不超过上限，输出一个不少
+            size = 8 * 1024 * 1024
+            pty = await manager.create(sandboxes[0])
+            await pty.sendline(f"stty raw -echo; yes | head -c {size}; exit")
+            # 先以每 10ms 读 4KB 的速度读 100 次，远低于输出速度
+            for _ in range(100):
+                assert await pty.read(4096)
+                await asyncio.sleep(0.01)
+            async for data in pty:
+                pass
+            print(f"  慢消费者: 收到 {pty.bytes_received} 字节, 最大缓冲 {pty.max_buffered}, 暂停 {pty.pauses} 次")
+            assert pty.bytes_received >= size
+            assert pty.pauses > 0
+            assert pty.max_buffered < 256 * 1024 + 128 * 1024
+
+        print("✓ 真实沙箱多 PTY 复用测试通过")
+        return True
+    finally:
+        await asyncio.gather(*[s.kill() for s in sandboxes], return_exceptions=True)
+
+
+def run_all():
+    """运行所有多 PTY 复用测试"""
+    from tests.conftest import run_async, run_tests_safely
+
+    tests = [
+        run_async(test_pty_manager_fake),
+        run_async(test_pty_manager_sandboxes),
+    ]
+    run_tests_safely(tests, "pty_mux")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,133 @@
+"""
+PTY 录制与回放测试 - asciicast 文件格式、按倍速回放到屏幕模型、用回放沙箱离线驱动 PtyDriver
+"""
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import PtySize, Sandbox
+
+from utils.pty_expect import PtyDriver
+from utils.pty_record import INPUT, OUTPUT, RESIZE, PtyRecorder, ReplaySandbox, load_recording, replay
+from utils.vt_screen import Screen
+
+
+PROMPT_MARKER = "__PTY_TEST__"
+
+
+def test_record_and_replay_local():
+    """测试录制文件可被解析，切断的多字节字符被正确合并，回放到屏幕模型和回放沙箱"""
+    print("=" * 50)
+    print("测试: 录制与回放 (本地)")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("session.cast", "session.cast.gz"):
+            path = os.path.join(tmp, name)
+            text = "中文输出\r\n".encode()
+            with PtyRecorder(path, 80, 24, title="demo", env={"TERM": "xterm"}) as recorder:
+                recorder.input(f"PS1='{PROMPT_MARKER}> '\n")
+                recorder.output(f"{PROMPT_MARKER}> ".encode())
+                recorder.input(b"echo hi\n")
+                time.sleep(0.05)
+                # 多字节字符被切断在两次输出之间
+                recorder.output(text[:4])
+                recorder.output(text[4:])
+                recorder.resize(PtySize(rows=30, cols=100))
+                recorder.output(f"\x1b[H\x1b[2Jdone\r\n{PROMPT_MARKER}> ".encode())
+
+            recording = load_recording(path)
+            print(f"  {name}: {len(recording.events)} 个事件, 时长 {recording.duration:.3f}s")
+            assert recording.header["title"] == "demo"
+            assert (recording.width, recording.height) == (80, 24)
+            assert [kind for _, kind, _ in recording.events] == [INPUT, OUTPUT, INPUT, OUTPUT, RESIZE, OUTPUT]
+            assert recording.events[3][2] == "中文输出\r\n"
+            assert recording.events[4][2] == "100x30"
+            assert recording.duration >= 0.05
+            if name.endswith(".cast"):
+                with open(path, encoding="utf-8") as f:
+                    assert json.loads(f.readline())["version"] == 2
+
+            screen = Screen(24, 80)
+            replay(recording, screen)
+            assert len(screen.display) == 30 and screen.cols == 100
+            assert screen.display[0] == "done"
+
+            # 回放沙箱: 每次 send_stdin 之后才回放对应输入之后的输出
+            sbx = ReplaySandbox(recording, speed=1)
+            with PtyDriver(sbx, timeout=5) as pty:
+                pty.sendline(f"PS1='{PROMPT_MARKER}> '")
+                pty.expect_exact(f"{PROMPT_MARKER}> ")
+                start = time.perf_counter()
+                pty.sendline("echo hi")
+                pty.expect_exact(f"done\r\n{PROMPT_MARKER}> ")
+                assert "中文输出" in pty.before
+                assert time.perf_counter() - start >= 0.04
+            assert sbx.pty.sent == [f"PS1='{PROMPT_MARKER}> '\n".encode(), b"echo hi\n"]
+
+    print("✓ 录制与回放 (本地) 测试通过")
+    return True
+
+
+def test_record_sandbox_session():
+    """测试录制真实 PTY 会话 (含调整大小)，再离线回放同一组命令得到相同输出"""
+    print("\n" + "=" * 50)
+    print("测试: 录制沙箱 PTY 会话")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "session.cast.gz")
+            size = PtySize(rows=24, cols=80)
+            commands = ["echo 中文; seq 1 3", "stty size"]
+            outputs = []
+            with PtyRecorder.for_size(path, size) as recorder:
+                with PtyDriver(sbx, size=size, on_output=recorder.output, on_input=recorder.input) as pty:
+                    pty.setup_prompt(marker=PROMPT_MARKER)
+                    outputs.append(pty.run(commands[0]))
+                    new_size = PtySize(rows=40, cols=120)
+                    sbx.pty.resize(pty.pid, new_size)
+                    recorder.resize(new_size)
+                    outputs.append(pty.run(commands[1]))
+            print(f"  录制输出: {outputs}")
+            assert outputs == ["中文\n1\n2\n3\n", "40 120\n"]
+
+            recording = load_recording(path)
+            print(f"  {len(recording.events)} 个事件, {os.path.getsize(path)} 字节")
+            screen = Screen(24, 80)
+            replay(recording, screen)
+            assert len(screen.display) == 40
+            assert any(line.endswith("40 120") for line in screen.display)
+
+            replay_sbx = ReplaySandbox(recording)
+            with PtyDriver(replay_sbx) as pty:
+                pty.setup_prompt(marker=PROMPT_MARKER)
+                assert [pty.run(cmd) for cmd in commands] == outputs
+
+        print("✓ 录制沙箱 PTY 会话测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def run_all():
+    """运行所有 PTY 录制与回放测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_record_and_replay_local,
+        test_record_sandbox_session,
+    ]
+    run_tests_safely(tests, "pty_record")
+
+
+if __name__ == "__main__":
+    run_all()
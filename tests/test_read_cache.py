@@ -0,0 +1,177 @@
+"""
+读取缓存测试 - 跨沙箱命中、校验模式、LRU 淘汰、索引写回
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.read_cache import HASH, STAT, TRUST, ReadCache
+
+
+def test_cache_across_sandboxes():
+    """测试同一模板的多个沙箱读取相同文件时命中缓存"""
+    print("=" * 50)
+    print("测试: 跨沙箱读取缓存")
+    print("=" * 50)
+
+    cache_dir = tempfile.mkdtemp()
+    sandboxes = [Sandbox.create(timeout=120) for _ in range(2)]
+    try:
+        content = "reference fixture\n" * 1000
+        for sbx in sandboxes:
+            sbx.files.write("/home/user/fixture.txt", content)
+
+        for validation in (TRUST, STAT, HASH):
+            cache = ReadCache(f"{cache_dir}/{validation}", validation=validation)
+            for sbx in sandboxes:
+                assert cache.read(sbx, "/home/user/fixture.txt") == content
+            stats = cache.stats.as_dict()
+            print(f"{validation}: {stats}")
+            assert stats["hits"] == 1
+            assert stats["misses"] == 1
+            assert stats["validations"] == (0 if validation == TRUST else 2)
+
+        print("✓ 跨沙箱读取缓存测试通过")
+        return True
+    finally:
+        for sbx in sandboxes:
+            sbx.kill()
+        shutil.rmtree(cache_dir)
+
+
+def test_cache_validation_and_eviction():
+    """测试 STAT 模式发现文件变化，以及超过大小上限时的 LRU 淘汰"""
+    print("\n" + "=" * 50)
+    print("测试: 缓存校验与淘汰")
+    print("=" * 50)
+
+    cache_dir = tempfile.mkdtemp()
+    sbx = Sandbox.create(timeout=120)
+    try:
+        cache = ReadCache(cache_dir, max_bytes=3000, validation=STAT)
+
+        sbx.files.write("/home/user/config.json", '{"version": 1}')
+        assert cache.read(sbx, "/home/user/config.json") == '{"version": 1}'
+        sbx.files.write("/home/user/config.json", '{"version": 22}')
+        assert cache.read(sbx, "/home/user/config.json") == '{"version": 22}'
+        assert cache.stats.stale == 1
+
+        for name in ("a", "b", "c"):
+            sbx.files.write(f"/home/user/{name}.bin", name.encode() * 1000)
+            cache.read(sbx, f"/home/user/{name}.bin", format="bytes")
+        stats = cache.stats.as_dict()
+        print(f"缓存统计: {stats}, 当前大小 {cache.total_bytes}")
+        assert cache.total_bytes <= 3000
+        assert stats["evictions"] >= 1
+
+        # 写回索引并重新加载后仍可命中最近使用的文件
+        cache.close()
+        reloaded = ReadCache(cache_dir, max_bytes=3000, validation=STAT)
+        assert reloaded.read(sbx, "/home/user/c.bin", format="bytes") == b"c" * 1000
+        assert reloaded.stats.hits == 1
+
+        print("✓ 缓存校验与淘汰测试通过")
+        return True
+    finally:
+        sbx.kill()
+        shutil.rmtree(cache_dir)
+
+
+class _FakeFiles:
+    def read(self, path, format="bytes"):
+        return path.encode() * 100
+
+
+class _FakeSandbox:
+    """只提供 ReadCache 在 TRUST 模式下用到的接口的假沙箱"""
+
+    sandbox_id = "sbx-fake"
+    files = _FakeFiles()
+
+    def get_info(self):
+        class Info:
+            template_id = "tpl-fake"
+        return Info()
+
+
+def test_index_save():
+    """测试多线程同时写回索引不冲突、未命中不逐次重写索引，以及未写回的内容在重新加载时计入大小 (本地)"""
+    print("\n" + "=" * 50)
+    print("测试: 索引写回")
+    print("=" * 50)
+
+    cache_dir = tempfile.mkdtemp()
+    sbx = _FakeSandbox()
+    try:
+        # save_interval=0: 每次未命中都写回，多个线程并发写同一个索引
+        cache = ReadCache(cache_dir, validation=TRUST, save_interval=0)
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(20):
+                    cache.read(sbx, f"/data/{n}/{i}", format="bytes")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, errors
+        with open(os.path.join(cache_dir, "index.json")) as f:
+            assert len(json.load(f)["entries"]) == 160
+        assert not [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
+
+        # 默认间隔内的未命中只标记索引已修改，close 时才写回
+        saves = []
+        cache = ReadCache(cache_dir, validation=TRUST)
+        cache.save = lambda: (saves.append(1), ReadCache.save(cache))
+        for i in range(10):
+            cache.read(sbx, f"/more/{i}", format="bytes")
+        print(f"10 次未命中后的写回次数: {len(saves)}")
+        assert len(saves) == 0
+        cache.close()
+        assert len(saves) == 1
+
+        # 未写回索引就退出: 内容文件在重新加载时计入总大小，超过上限时照常淘汰
+        cache = ReadCache(cache_dir, validation=TRUST, save_interval=3600)
+        cache.read(sbx, "/unsaved", format="bytes")
+        size = len(b"/unsaved" * 100)
+        reloaded = ReadCache(cache_dir, max_bytes=cache.total_bytes, validation=TRUST)
+        assert reloaded.total_bytes == cache.total_bytes
+        assert reloaded.stats.evictions == 0
+        smaller = ReadCache(cache_dir, max_bytes=cache.total_bytes - size, validation=TRUST)
+        assert smaller.total_bytes <= cache.total_bytes - size
+
+        print("✓ 索引写回测试通过")
+        return True
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def run_all():
+    """运行所有读取缓存测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_cache_across_sandboxes,
+        test_cache_validation_and_eviction,
+        test_index_save,
+    ]
+    run_tests_safely(tests, "read_cache")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,200 @@
+"""
+沙箱预热池测试 - 租借、清理复用、销毁补充、统计信息
+"""
+import asyncio
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from utils.sandbox_pool import AsyncSandboxPool, SandboxPool, DISCARD
+
+
+def wait_for_idle(pool: SandboxPool, count: int, timeout: float = 120):
+    """等待池中空闲沙箱达到指定数量"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if pool._queue(None).qsize() >= count:
+            return
+        time.sleep(0.5)
+    raise TimeoutError(f"等待 {count} 个空闲沙箱超时")
+
+
+def test_pool_lease_hit():
+    """测试预热后租借命中"""
+    print("=" * 50)
+    print("测试: 预热后租借命中")
+    print("=" * 50)
+
+    with SandboxPool(size=1, timeout=60) as pool:
+        wait_for_idle(pool, 1)
+
+        with pool.lease() as sbx:
+            result = sbx.commands.run("echo 'pooled'")
+            assert "pooled" in result.stdout
+            print(f"租借沙箱: {sbx.sandbox_id}")
+
+        stats = pool.stats.as_dict()
+        print(f"统计信息: {stats}")
+        assert stats["hits"] == 1
+        assert stats["misses"] == 0
+
+        print("✓ 租借命中测试通过")
+        return True
+
+
+def test_pool_reset_on_release():
+    """测试归还后清理新增文件并复用，预热时已有的文件被修改时销毁"""
+    print("\n" + "=" * 50)
+    print("测试: 归还后清理复用")
+    print("=" * 50)
+
+    with SandboxPool(size=1, timeout=60) as pool:
+        wait_for_idle(pool, 1)
+
+        with pool.lease() as sbx:
+            first_id = sbx.sandbox_id
+            sbx.files.write("/home/user/pool_scratch.txt", "leftover")
+            sbx.commands.run("sleep 60", background=True)
+
+        wait_for_idle(pool, 1)
+
+        with pool.lease() as sbx:
+            assert sbx.sandbox_id == first_id
+            assert sbx.files.exists("/home/user/pool_scratch.txt") == False
+            running = [p.cmd for p in sbx.commands.list()]
+            print(f"清理后进程: {running}")
+            assert "sleep" not in " ".join(running)
+            # 修改预热时已存在的文件: 删除新增文件无法恢复，归还后销毁
+            sbx.commands.run("echo 'export LEAKED=1' >> /home/user/.bashrc")
+
+        wait_for_idle(pool, 1)
+
+        with pool.lease() as sbx:
+            assert sbx.sandbox_id != first_id
+            assert "LEAKED" not in sbx.files.read("/home/user/.bashrc")
+            assert pool.stats.as_dict()["discarded"] == 1
+
+        print(f"统计信息: {pool.stats.as_dict()}")
+        print("✓ 清理复用测试通过")
+        return True
+
+
+def test_pool_discard_on_release():
+    """测试 DISCARD 策略销毁后补充"""
+    print("\n" + "=" * 50)
+    print("测试: 销毁后补充")
+    print("=" * 50)
+
+    with SandboxPool(size=1, timeout=60, on_release=DISCARD) as pool:
+        wait_for_idle(pool, 1)
+
+        with pool.lease() as sbx:
+            first_id = sbx.sandbox_id
+
+        wait_for_idle(pool, 1)
+
+        with pool.lease() as sbx:
+            assert sbx.sandbox_id != first_id
+
+        # 销毁在后台进行，关闭池会等待后台任务完成
+        pool.close()
+        stats = pool.stats.as_dict()
+        print(f"统计信息: {stats}")
+        assert stats["discarded"] >= 1
+
+        print("✓ 销毁补充测试通过")
+        return True
+
+
+def test_pool_miss_when_empty():
+    """测试池空时同步创建并记录等待耗时"""
+    print("\n" + "=" * 50)
+    print("测试: 池空时未命中")
+    print("=" * 50)
+
+    with SandboxPool(size=0, timeout=60) as pool:
+        with pool.lease() as sbx:
+            assert sbx.sandbox_id is not None
+
+        stats = pool.stats.as_dict()
+        print(f"统计信息: {stats}")
+        assert stats["misses"] == 1
+        assert stats["wait_max"] > 0
+
+        print("✓ 未命中测试通过")
+        return True
+
+
+async def test_async_pool_prewarm():
+    """测试异步池并发预热与租借"""
+    print("\n" + "=" * 50)
+    print("测试: 异步池并发预热")
+    print("=" * 50)
+
+    async with AsyncSandboxPool(size=3, max_concurrent_creates=2, timeout=60) as pool:
+        await pool.prewarm()
+        assert len(pool._idle[None]) == 3
+        print(f"预热完成，空闲沙箱数: {len(pool._idle[None])}")
+
+        async def task(i):
+            async with pool.lease() as sbx:
+                result = await sbx.commands.run(f"echo task-{i}")
+                assert f"task-{i}" in result.stdout
+
+        await asyncio.gather(*(task(i) for i in range(3)))
+
+        stats = pool.stats.as_dict()
+        print(f"统计信息: {stats}")
+        assert stats["hits"] == 3
+
+        print("✓ 异步池并发预热测试通过")
+        return True
+
+
+async def test_async_pool_high_water_mark():
+    """测试异步池高水位限制"""
+    print("\n" + "=" * 50)
+    print("测试: 异步池高水位限制")
+    print("=" * 50)
+
+    async with AsyncSandboxPool(size=0, max_size=1, timeout=60) as pool:
+        async def task():
+            async with pool.lease() as sbx:
+                await sbx.commands.run("true")
+
+        # 两个并发租借都未命中，归还后只保留 max_size 个空闲沙箱
+        await asyncio.gather(task(), task())
+        while pool._tasks:
+            await asyncio.gather(*list(pool._tasks))
+
+        assert len(pool._idle[None]) == 1
+        stats = pool.stats.as_dict()
+        print(f"统计信息: {stats}")
+        assert stats["misses"] == 2
+        assert stats["discarded"] == 1
+
+        print("✓ 异步池高水位测试通过")
+        return True
+
+
+def run_all():
+    """运行所有沙箱池测试"""
+    from tests.conftest import run_async, run_tests_safely
+
+    tests = [
+        test_pool_lease_hit,
+        test_pool_reset_on_release,
+        test_pool_discard_on_release,
+        test_pool_miss_when_empty,
+        run_async(test_async_pool_prewarm),
+        run_async(test_async_pool_high_water_mark),
+    ]
+    run_tests_safely(tests, "sandbox_pool")
+
+
+if __name__ == "__main__":
+    run_all()
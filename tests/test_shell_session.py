@@ -0,0 +1,119 @@
+"""
+持久 shell 会话测试 - 状态保留、输出分离、错误恢复、长时间存活
+"""
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.shell_session import SessionClosedError, ShellCommandError, ShellSession
+
+
+def test_session_keeps_state():
+    """测试多条命令复用同一进程，并保留 cwd 与环境变量"""
+    print("=" * 50)
+    print("测试: 会话状态保留")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        with ShellSession(sbx) as session:
+            session.run("mkdir -p /home/user/work && cd /home/user/work && export MODE=test")
+            result = session.run("pwd; echo $MODE; echo $$")
+            lines = result.stdout.splitlines()
+            print(f"输出: {lines}")
+            assert lines[0] == "/home/user/work"
+            assert lines[1] == "test"
+            # 同一个 shell 进程
+            assert session.run("echo $$").stdout.strip() == lines[2]
+
+            # 只对单条命令生效的环境变量
+            assert session.run("echo $ONCE", envs={"ONCE": "x y"}).stdout == "x y\n"
+            assert session.run("echo $ONCE").stdout == "\n"
+            assert session.commands_run == 5
+
+        print("✓ 会话状态保留测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def test_session_output_and_errors():
+    """测试 stdout/stderr 分离、退出码，以及语法错误后会话仍可用"""
+    print("\n" + "=" * 50)
+    print("测试: 会话输出与错误处理")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        with ShellSession(sbx) as session:
+            result = session.run("echo out; echo err >&2; printf no-newline")
+            assert result.stdout == "out\nno-newline"
+            assert result.stderr == "err\n"
+            assert result.exit_code == 0
+
+            result = session.run("exit_code() { return 7; }; exit_code", check=False)
+            assert result.exit_code == 7
+
+            try:
+                session.run("ls /nonexistent")
+                assert False, "应该抛出 ShellCommandError"
+            except ShellCommandError as e:
+                print(f"命令失败: exit_code={e.exit_code}, stderr={e.stderr.strip()}")
+                assert e.exit_code != 0
+
+            # 语法错误和读取 stdin 的命令都不影响后续命令
+            assert session.run("echo 'unbalanced", check=False).exit_code != 0
+            assert session.run("cat; echo done").stdout == "done\n"
+
+            try:
+                session.run("exit 3")
+                assert False, "应该抛出 SessionClosedError"
+            except SessionClosedError:
+                assert session.closed
+
+        print("✓ 会话输出与错误处理测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def test_session_outlives_default_timeout():
+    """测试两条命令间隔超过 SDK 默认的 60 秒超时，会话仍然可用"""
+    print("\n" + "=" * 50)
+    print("测试: 会话长时间存活")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=180)
+    try:
+        with ShellSession(sbx) as session:
+            pid = session.run("echo $$").stdout.strip()
+            time.sleep(70)
+            assert not session.closed
+            assert session.run("echo $$").stdout.strip() == pid
+
+        print("✓ 会话长时间存活测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def run_all():
+    """运行所有 shell 会话测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_session_keeps_state,
+        test_session_output_and_errors,
+        test_session_outlives_default_timeout,
+    ]
+    run_tests_safely(tests, "shell_session")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,122 @@
+"""
+目录增量同步测试 - 首次同步、增量上传、删除多余文件
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.sync import sync_dir
+
+
+def make_tree(root: str, count: int):
+    """创建 count 个文件的两级目录树"""
+    for i in range(count):
+        path = os.path.join(root, f"dir_{i % 4}", f"file_{i}.txt")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"content {i}\n" * 100)
+
+
+def test_initial_sync():
+    """测试首次同步上传全部文件"""
+    print("=" * 50)
+    print("测试: 首次同步")
+    print("=" * 50)
+
+    local_dir = tempfile.mkdtemp()
+    sbx = Sandbox.create(timeout=120)
+    try:
+        make_tree(local_dir, 20)
+
+        result = sync_dir(sbx, local_dir, "/home/user/project")
+
+        print(f"同步统计: {result}")
+        assert result["uploaded"] == 20
+        assert result["bytes_saved"] == 0
+
+        content = sbx.files.read("/home/user/project/dir_3/file_7.txt")
+        assert content == "content 7\n" * 100
+
+        print("✓ 首次同步测试通过")
+        return True
+    finally:
+        sbx.kill()
+        shutil.rmtree(local_dir)
+
+
+def test_delta_sync():
+    """测试增量同步只上传变更文件并删除多余文件"""
+    print("\n" + "=" * 50)
+    print("测试: 增量同步")
+    print("=" * 50)
+
+    local_dir = tempfile.mkdtemp()
+    sbx = Sandbox.create(timeout=120)
+    try:
+        make_tree(local_dir, 20)
+        # sha256sum 会转义含反斜杠或换行的文件名
+        for name in ("back\\slash.txt", "new\nline.txt"):
+            with open(os.path.join(local_dir, name), "w") as f:
+                f.write(name)
+        os.makedirs(os.path.join(local_dir, "nested", "deep"))
+        with open(os.path.join(local_dir, "nested", "deep", "only.txt"), "w") as f:
+            f.write("only\n")
+        sync_dir(sbx, local_dir, "/home/user/project")
+        # 沙箱中原有的空目录与同步无关，不应被删除
+        sbx.files.make_dir("/home/user/project/keep_empty")
+
+        # 修改一个、新增一个、删除两个 (其中一个删除后上级目录变空)
+        with open(os.path.join(local_dir, "dir_0", "file_0.txt"), "w") as f:
+            f.write("changed\n")
+        with open(os.path.join(local_dir, "new.txt"), "w") as f:
+            f.write("new\n")
+        os.remove(os.path.join(local_dir, "dir_1", "file_1.txt"))
+        shutil.rmtree(os.path.join(local_dir, "nested"))
+
+        result = sync_dir(sbx, local_dir, "/home/user/project")
+
+        print(f"同步统计: {result}")
+        assert result["uploaded"] == 2
+        assert result["unchanged"] == 20
+        assert result["deleted"] == 2
+        assert result["bytes_saved"] > 0
+
+        assert sbx.files.read("/home/user/project/dir_0/file_0.txt") == "changed\n"
+        assert sbx.files.exists("/home/user/project/new.txt") == True
+        assert sbx.files.exists("/home/user/project/dir_1/file_1.txt") == False
+        assert sbx.files.exists("/home/user/project/nested") == False
+        assert sbx.files.exists("/home/user/project/keep_empty") == True
+
+        # 再次同步应没有任何变更
+        result = sync_dir(sbx, local_dir, "/home/user/project")
+        assert result["uploaded"] == 0
+        assert result["deleted"] == 0
+
+        print("✓ 增量同步测试通过")
+        return True
+    finally:
+        sbx.kill()
+        shutil.rmtree(local_dir)
+
+
+def run_all():
+    """运行所有目录同步测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_initial_sync,
+        test_delta_sync,
+    ]
+    run_tests_safely(tests, "sync")
+
+
+if __name__ == "__main__":
+    run_all()
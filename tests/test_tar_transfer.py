@@ -0,0 +1,96 @@
+"""
+目录打包传输测试 - tar 流上传、下载
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.tar_transfer import download_tree, upload_tree
+
+
+def make_tree(root: str, count: int):
+    for i in range(count):
+        path = os.path.join(root, f"dir_{i % 5}", f"file_{i}.txt")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"file {i}\n")
+
+
+def test_upload_tree():
+    """测试 tar 流上传目录树"""
+    print("=" * 50)
+    print("测试: tar 流上传目录树")
+    print("=" * 50)
+
+    local_dir = tempfile.mkdtemp()
+    sbx = Sandbox.create(timeout=120)
+    try:
+        make_tree(local_dir, 200)
+
+        for compression in (None, "gzip"):
+            target = f"/home/user/tree_{compression or 'none'}"
+            result = upload_tree(sbx, local_dir, target, compression=compression)
+            print(f"压缩 {compression}: {result}")
+            assert result["files"] == 200
+
+            count = sbx.commands.run(f"find {target} -type f | wc -l")
+            assert count.stdout.strip() == "200"
+            assert sbx.files.read(f"{target}/dir_2/file_42.txt") == "file 42\n"
+
+        print("✓ tar 流上传测试通过")
+        return True
+    finally:
+        sbx.kill()
+        shutil.rmtree(local_dir)
+
+
+def test_download_tree():
+    """测试 tar 流下载目录树"""
+    print("\n" + "=" * 50)
+    print("测试: tar 流下载目录树")
+    print("=" * 50)
+
+    local_dir = tempfile.mkdtemp()
+    sbx = Sandbox.create(timeout=120)
+    try:
+        sbx.commands.run(
+            "mkdir -p /home/user/remote_tree/sub && "
+            "for i in $(seq 1 100); do echo \"line $i\" > /home/user/remote_tree/sub/f_$i.txt; done"
+        )
+
+        result = download_tree(sbx, "/home/user/remote_tree", local_dir, compression="gzip")
+        print(f"下载统计: {result}")
+
+        files = os.listdir(os.path.join(local_dir, "sub"))
+        assert len(files) == 100
+        with open(os.path.join(local_dir, "sub", "f_7.txt")) as f:
+            assert f.read() == "line 7\n"
+
+        print("✓ tar 流下载测试通过")
+        return True
+    finally:
+        sbx.kill()
+        shutil.rmtree(local_dir)
+
+
+def run_all():
+    """运行所有打包传输测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_upload_tree,
+        test_download_tree,
+    ]
+    run_tests_safely(tests, "tar_transfer")
+
+
+if __name__ == "__main__":
+    run_all()
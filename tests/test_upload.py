@@ -0,0 +1,122 @@
+"""
+大文件上传测试 - 内存映射上传、分块并行上传、断点续传
+"""
+import os
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import Sandbox
+
+from utils.upload import upload_file, upload_mmap, part_name
+
+
+def make_local_file(size: int) -> str:
+    """创建指定大小的随机内容临时文件"""
+    fd, path = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def test_mmap_upload():
+    """测试内存映射上传"""
+    print("=" * 50)
+    print("测试: 内存映射上传")
+    print("=" * 50)
+
+    local_path = make_local_file(3 * 1024 * 1024 + 7)
+    sbx = Sandbox.create(timeout=120)
+    try:
+        result = upload_mmap(sbx, local_path, "/home/user/mmap.bin")
+        assert result.path == "/home/user/mmap.bin"
+
+        content = sbx.files.read("/home/user/mmap.bin", format="bytes")
+        with open(local_path, "rb") as f:
+            assert content == f.read()
+
+        print(f"上传文件: {result.path} ({len(content)} bytes)")
+        print("✓ 内存映射上传测试通过")
+        return True
+    finally:
+        sbx.kill()
+        os.remove(local_path)
+
+
+def test_chunked_upload():
+    """测试分块并行上传"""
+    print("\n" + "=" * 50)
+    print("测试: 分块并行上传")
+    print("=" * 50)
+
+    local_path = make_local_file(5 * 1024 * 1024 + 123)
+    sbx = Sandbox.create(timeout=120)
+    try:
+        result = upload_file(sbx, local_path, "/home/user/chunked.bin", part_size=1024 * 1024)
+
+        print(f"上传统计: {result}")
+        assert result["parts"] == 6
+        assert result["uploaded_parts"] == 6
+
+        info = sbx.files.get_info("/home/user/chunked.bin")
+        assert info.size == os.path.getsize(local_path)
+        assert sbx.files.exists("/home/user/chunked.bin.parts") == False
+
+        # 分块同样可以走内存映射
+        result = upload_file(sbx, local_path, "/home/user/chunked_mmap.bin", part_size=1024 * 1024, use_mmap=True)
+        assert result["size"] == info.size
+
+        print("✓ 分块并行上传测试通过")
+        return True
+    finally:
+        sbx.kill()
+        os.remove(local_path)
+
+
+def test_chunked_upload_resume():
+    """测试断点续传只补传缺失的分块"""
+    print("\n" + "=" * 50)
+    print("测试: 断点续传")
+    print("=" * 50)
+
+    local_path = make_local_file(4 * 1024 * 1024)
+    remote_path = "/home/user/resume.bin"
+    sbx = Sandbox.create(timeout=120)
+    try:
+        upload_file(sbx, local_path, remote_path, part_size=1024 * 1024, keep_parts=True)
+
+        # 模拟一个分块丢失、一个分块损坏
+        sbx.files.remove(f"{remote_path}.parts/{part_name(1)}")
+        sbx.files.write(f"{remote_path}.parts/{part_name(2)}", b"corrupted")
+
+        result = upload_file(sbx, local_path, remote_path, part_size=1024 * 1024)
+
+        print(f"续传统计: {result}")
+        assert result["uploaded_parts"] == 2
+        assert result["skipped_parts"] == 2
+
+        print("✓ 断点续传测试通过")
+        return True
+    finally:
+        sbx.kill()
+        os.remove(local_path)
+
+
+def run_all():
+    """运行所有上传测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_mmap_upload,
+        test_chunked_upload,
+        test_chunked_upload_resume,
+    ]
+    run_tests_safely(tests, "upload")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,116 @@
+"""
+VT 屏幕模型测试 - 控制序列解析、跨块切断、变化行记录，真实 PTY 输出与调整大小
+"""
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import PtySize, Sandbox
+
+from utils.pty_expect import PtyDriver
+from utils.vt_screen import BOLD, Screen
+
+
+def test_screen_parsing():
+    """测试光标移动、擦除、颜色、自动换行、宽字符、备用屏幕，以及逐字节输入与整块输入结果一致"""
+    print("=" * 50)
+    print("测试: VT 屏幕解析")
+    print("=" * 50)
+
+    output = (
+        "\x1b]0;demo\x07"
+        "hello\r\nworld\r\n"
+        "\x1b[1;31mred\x1b[0m plain\r\n"
+        "0123456789abcdef\r\n"
+        "中文宽字符\r\n"
+        "\x1b[2;3HX"
+        "\x1b[1;1H\x1b[K\x1b[38;5;200mtop\x1b[0m"
+    ).encode()
+
+    whole = Screen(8, 10)
+    whole.feed(output)
+    split = Screen(8, 10)
+    for i in range(len(output)):
+        split.feed(output[i:i + 1])
+
+    print("\n".join(whole.display))
+    assert whole.display == split.display
+    assert whole.display[:7] == ["top", "woXld", "red plain", "0123456789", "abcdef", "中文宽字符", ""]
+    assert whole.title == "demo"
+    assert whole.cell(2, 0).fg == 1 and whole.cell(2, 0).flags & BOLD
+    assert whole.cell(2, 4).fg is None
+    assert whole.cell(0, 0).fg == 200
+    assert whole.bytes_fed == len(output)
+
+    # 只有被修改的行标记为变化
+    whole.take_dirty()
+    whole.feed(b"\x1b[6;1H\x1b[2K")
+    assert whole.take_dirty() == [5]
+    assert whole.take_dirty() == []
+
+    # 备用屏幕退出后恢复主屏幕内容
+    whole.feed(b"\x1b[?1049h\x1b[Hfullscreen")
+    assert whole.display[0] == "fullscreen"
+    whole.feed(b"\x1b[?1049l")
+    assert whole.display[0] == "top"
+
+    # 滚出顶部的行进入 history
+    whole.feed(b"\x1b[8;1H" + b"\r\n" * 3)
+    assert list(whole.history) == ["top", "woXld", "red plain"]
+
+    print("✓ VT 屏幕解析测试通过")
+    return True
+
+
+def test_screen_with_pty():
+    """测试用真实 PTY 输出驱动屏幕模型，并与 pty.resize 同步大小"""
+    print("\n" + "=" * 50)
+    print("测试: PTY 输出驱动屏幕模型")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=60)
+    try:
+        size = PtySize(rows=24, cols=80)
+        screen = Screen.from_size(size)
+        with PtyDriver(sbx, size=size, on_output=screen.feed) as pty:
+            pty.setup_prompt()
+            pty.run("clear; printf '\\033[5;10HX\\033[10;1H'; seq 1 3")
+            print("\n".join(line for line in screen.display if line))
+            assert screen.line(4) == " " * 9 + "X"
+            assert screen.display[9:12] == ["1", "2", "3"]
+
+            new_size = PtySize(rows=40, cols=120)
+            sbx.pty.resize(pty.pid, new_size)
+            screen.resize(new_size)
+            assert len(screen.display) == 40
+            assert pty.run("stty size") == "40 120\n"
+
+            # 长行按新的列数自动换行
+            screen.take_dirty()
+            pty.run("clear; printf '%0150d\\n' 0")
+            assert screen.line(0) == "0" * 120
+            assert screen.line(1) == "0" * 30
+            assert 0 in screen.take_dirty()
+
+        print("✓ PTY 输出驱动屏幕模型测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+def run_all():
+    """运行所有 VT 屏幕模型测试"""
+    from tests.conftest import run_tests_safely
+
+    tests = [
+        test_screen_parsing,
+        test_screen_with_pty,
+    ]
+    run_tests_safely(tests, "vt_screen")
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,149 @@
+"""
+目录监听测试 - 时间窗口批次、修改事件合并、缓冲区溢出、异步迭代、监听流异常结束
+"""
+import asyncio
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载项目根目录的 .env 文件
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path, override=True)
+
+from ucloud_sandbox import AsyncSandbox, Sandbox
+
+from utils.watcher import AsyncDirWatcher, DirWatcher
+
+
+def test_watch_batches_and_overflow():
+    """测试批次投递、重复修改合并，以及缓冲区满时的溢出信号"""
+    print("=" * 50)
+    print("测试: 目录监听批次与溢出")
+    print("=" * 50)
+
+    sbx = Sandbox.create(timeout=120)
+    try:
+        sbx.files.make_dir("/home/user/watched")
+
+        with DirWatcher(sbx, "/home/user/watched", window=0.5) as watcher:
+            sbx.commands.run("for i in $(seq 1 50); do echo $i >> /home/user/watched/build.log; done")
+            batch = watcher.next_batch(timeout=10)
+            print(f"批次: {batch}, 缓冲区统计: {watcher.buffer.stats()}")
+            assert batch is not None and not batch.overflow
+            events = [e for e in batch if e.name.endswith("build.log")]
+            # 50 次写入最多只合并为少量事件
+            assert 1 <= len(events) < 10
+            assert sum(e.count for e in events) >= 2
+            assert watcher.buffer.stats()["coalesced"] > 0
+
+        with DirWatcher(sbx, "/home/user/watched", window=1.0, capacity=10) as watcher:
+            sbx.commands.run("for i in $(seq 1 100); do touch /home/user/watched/f_$i; done")
+            batch = watcher.next_batch(timeout=10)
+            print(f"小缓冲区批次: {batch}")
+            assert batch is not None
+            assert len(batch) <= 10
+            assert batch.overflow
+
+        print("✓ 目录监听批次与溢出测试通过")
+        return True
+    finally:
+        sbx.kill()
+
+
+async def test_async_watch_iterator():
+    """测试异步迭代器按批次返回事件"""
+    print("\n" + "=" * 50)
+    print("测试: 异步目录监听")
+    print("=" * 50)
+
+    sbx = await AsyncSandbox.create(timeout=120)
+    try:
+        await sbx.files.make_dir("/home/user/async_watched")
+        watcher = await AsyncDirWatcher.start(sbx, "/home/user/async_watched", window=0.3)
+
+        await sbx.files.write("/home/user/async_watched/a.txt", "a")
+        await sbx.files.write("/home/user/async_watched/b.txt", "b")
+
+        names = set()
+        async for batch in watcher:
+            names.update(e.name for e in batch)
+            if {"a.txt", "b.txt"} <= {n.rsplit("/", 1)[-1] for n in names}:
+                break
+        await watcher.stop()
+        print(f"收到事件路径: {sorted(names)}")
+
+        print("✓ 异步目录监听测试通过")
+        return True
+    finally:
+        await sbx.kill()
+
+
+class _FakeWatchFiles:
+    """记录 watch_dir 参数，由测试手动触发 on_exit 的假 files 对象"""
+
+    def __init__(self):
+        self.kwargs = None
+
+    async def watch_dir(self, path, on_event, on_exit=None, **kwargs):
+        self.on_event = on_event
+        self.on_exit = on_exit
+        self.kwargs = kwargs
+        return self
+
+    async def stop(self):
+        await self.on_exit(None)
+
+
+async def test_async_watch_exit_error():
+    """测试监听流因错误结束时迭代先取完缓冲事件再抛出错误，且默认不限时"""
+    print("\n" + "=" * 50)
+    print("测试: 异步监听流异常结束")
+    print("=" * 50)
+
+    class FakeSandbox:
+        files = _FakeWatchFiles()
+
+    class FakeEvent:
+        name = "a.txt"
+        type = "write"
+
+    exits = []
+    watcher = await AsyncDirWatcher.start(FakeSandbox, "/watched", window=0.01, on_exit=exits.append)
+    assert FakeSandbox.files.kwargs["timeout"] == 0
+
+    FakeSandbox.files.on_event(FakeEvent())
+    await FakeSandbox.files.on_exit(RuntimeError("stream closed"))
+    batches = []
+    try:
+        async for batch in watcher:
+            batches.append(batch)
+        raise AssertionError("监听流异常结束后迭代应抛出错误")
+    except RuntimeError as e:
+        print(f"缓冲批次: {batches}, 错误: {e}")
+    assert len(batches) == 1 and [e.name for e in batches[0]] == ["a.txt"]
+    assert len(exits) == 1 and isinstance(exits[0], RuntimeError)
+
+    # 正常 stop 后迭代直接结束
+    watcher = await AsyncDirWatcher.start(FakeSandbox, "/watched", window=0.01)
+    waiter = asyncio.ensure_future(watcher.next_batch())
+    await asyncio.sleep(0.05)
+    await watcher.stop()
+    assert await asyncio.wait_for(waiter, 1) is None
+
+    print("✓ 异步监听流异常结束测试通过")
+    return True
+
+
+def run_all():
+    """运行所有目录监听测试"""
+    from tests.conftest import run_async, run_tests_safely
+
+    tests = [
+        test_watch_batches_and_overflow,
+        run_async(test_async_watch_iterator),
+        run_async(test_async_watch_exit_error),
+    ]
+    run_tests_safely(tests, "watcher")
+
+
+if __name__ == "__main__":
+    run_all()
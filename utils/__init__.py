@@ -0,0 +1 @@
+# AgentBox SDK 工具模块
@@ -0,0 +1,157 @@
+"""
+批量元数据操作 - 一次 shell 调用完成多个路径的 exists / get_info / remove / make_dir
+
+每个路径单独调用 files.exists 等接口都是一次网络往返，几十个路径的预检耗时线性叠加。
+这里把所有路径交给一条命令逐个处理，单个路径失败时记录错误而不是抛出。
+"""
+import shlex
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Union
+
+from ucloud_sandbox import FileType, Sandbox
+
+
+# 单条命令包含的最大路径数，避免超过 ARG_MAX
+PATHS_PER_COMMAND = 500
+
+
+class PathError(Exception):
+    """单个路径的操作失败，作为结果值返回而不是抛出"""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}")
+        self.path = path
+        self.message = message
+
+
+class PathInfo:
+    """get_info_many 的结果，字段与 files.get_info 返回的 EntryInfo 一致"""
+
+    def __init__(self, path: str, type: FileType, size: int, mode: int, permissions: str,
+                 owner: str, group: str, modified_time: datetime, symlink_target: Optional[str] = None):
+        self.name = path.rstrip("/").rsplit("/", 1)[-1] or "/"
+        self.path = path
+        self.type = type
+        self.size = size
+        self.mode = mode
+        self.permissions = permissions
+        self.owner = owner
+        self.group = group
+        self.modified_time = modified_time
+        self.symlink_target = symlink_target
+
+    def __repr__(self):
+        return f"PathInfo(path={self.path!r}, type={self.type}, size={self.size})"
+
+
+def _run_per_path(sbx: Sandbox, paths: List[str], body: str) -> Dict[str, tuple]:
+    """
+    在一条命令中对每个路径 ("$p") 执行 body
+
+    Returns:
+        dict: {路径: (退出码, 合并后的 stdout/stderr 单行输出)}
+    """
+    results = {}
+    for start in range(0, len(paths), PATHS_PER_COMMAND):
+        chunk = paths[start:start + PATHS_PER_COMMAND]
+        quoted = " ".join(shlex.quote(p) for p in chunk)
+        result = sbx.commands.run(
+            f"set -- {quoted}; i=0; "
+            f"for p in \"$@\"; do "
+            f"out=$( {{ {body}; }} 2>&1 ); rc=$?; "
+            f"printf '%s\\t%s\\t%s\\n' \"$i\" \"$rc\" \"$(printf '%s' \"$out\" | tr '\\n\\t' '  ')\"; "
+            f"i=$((i + 1)); "
+            f"done"
+        )
+        for line in result.stdout.splitlines():
+            index, rc, out = line.split("\t", 2)
+            results[chunk[int(index)]] = (int(rc), out)
+    return results
+
+
+def _dedupe(paths) -> List[str]:
+    return list(dict.fromkeys(paths))
+
+
+def exists_many(sbx: Sandbox, paths) -> Dict[str, bool]:
+    """批量判断路径是否存在"""
+    results = _run_per_path(sbx, _dedupe(paths), '[ -e "$p" ] || [ -L "$p" ]')
+    return {path: rc == 0 for path, (rc, _) in results.items()}
+
+
+# stat %F 输出的类型名，其余类型 (设备、管道、套接字) 按普通文件处理
+_STAT_TYPES = {
+    "directory": FileType.DIR,
+    "symbolic link": FileType.SYMLINK,
+}
+
+
+def get_info_many(sbx: Sandbox, paths) -> Dict[str, Union[PathInfo, PathError]]:
+    """
+    批量获取路径信息
+
+    Returns:
+        dict: {路径: PathInfo}，不存在或无权限的路径值为 PathError
+    """
+    results = _run_per_path(
+        sbx,
+        _dedupe(paths),
+        "stat -c '%F|%s|%a|%A|%U|%G|%Y' -- \"$p\" && "
+        "if [ -L \"$p\" ]; then printf '|%s' \"$(readlink -- \"$p\")\"; fi",
+    )
+    infos = {}
+    for path, (rc, out) in results.items():
+        if rc != 0:
+            infos[path] = PathError(path, out.strip())
+            continue
+        kind, size, mode, permissions, owner, group, mtime, *target = out.strip().split("|", 7)
+        infos[path] = PathInfo(
+            path=path,
+            type=_STAT_TYPES.get(kind, FileType.FILE),
+            size=int(size),
+            mode=int(mode, 8),
+            # %A 的首字符是类型，EntryInfo.permissions 只有 rwxr-xr-x 九位
+            permissions=permissions[1:],
+            owner=owner,
+            group=group,
+            modified_time=datetime.fromtimestamp(int(mtime), tz=timezone.utc),
+            symlink_target=target[0] if target else None,
+        )
+    return infos
+
+
+def remove_many(sbx: Sandbox, paths) -> Dict[str, Union[bool, PathError]]:
+    """
+    批量删除文件或目录 (目录递归删除)
+
+    Returns:
+        dict: {路径: True}，不存在或删除失败的路径值为 PathError
+    """
+    results = _run_per_path(
+        sbx,
+        _dedupe(paths),
+        "if [ -e \"$p\" ] || [ -L \"$p\" ]; then rm -rf -- \"$p\"; "
+        "else echo 'No such file or directory'; false; fi",
+    )
+    return {
+        path: True if rc == 0 else PathError(path, out.strip())
+        for path, (rc, out) in results.items()
+    }
+
+
+def make_dirs(sbx: Sandbox, paths) -> Dict[str, Union[bool, PathError]]:
+    """
+    批量创建目录 (含所有上级目录)
+
+    Returns:
+        dict: {路径: 是否新建}，已存在时为 False (与 files.make_dir 一致)，失败时为 PathError
+    """
+    results = _run_per_path(
+        sbx,
+        _dedupe(paths),
+        "if [ -d \"$p\" ]; then echo exists; else mkdir -p -- \"$p\"; fi",
+    )
+    return {
+        path: (out.strip() != "exists") if rc == 0 else PathError(path, out.strip())
+        for path, (rc, out) in results.items()
+    }
@@ -0,0 +1,144 @@
+"""
+批量命令执行 - 一次 commands.run 往返执行 N 条相互独立的命令，分别返回每条命令的结果
+
+每条命令在独立子 shell 中运行，stdout / stderr 写入沙箱内的临时文件，全部结束后
+以 base64 编码一次性返回，本地解析为每条命令的 CommandOutput。
+"""
+import base64
+import shlex
+from typing import Dict, List, Optional, Sequence
+
+from ucloud_sandbox import AsyncSandbox, Sandbox
+
+from utils.shell_session import CommandOutput
+
+
+# 在子 shell 中执行一条命令并记录退出码和起止时间 (纳秒)
+_RUN_FUNCTION = (
+    '__batch_run() { '
+    '__s=$(date +%s%N); '
+    '( eval "$2" ) < /dev/null > "$__batch_dir/$1.out" 2> "$__batch_dir/$1.err"; '
+    '__rc=$?; '
+    'echo "$__rc $__s $(date +%s%N)" > "$__batch_dir/$1.meta"; '
+    '}'
+)
+
+
+def batch_script(commands: Sequence[str], parallelism: int = 1, command_timeout: Optional[float] = None) -> str:
+    """
+    生成批量执行脚本
+
+    Args:
+        commands: 命令列表
+        parallelism: 同时运行的命令数上限，1 表示依次执行
+        command_timeout: 单条命令的超时时间 (秒)，超时的命令退出码为 124
+    """
+    if parallelism < 1:
+        raise ValueError(f"parallelism 必须大于 0: {parallelism}")
+
+    lines = ["__batch_dir=$(mktemp -d)", _RUN_FUNCTION, "__batch_jobs=0"]
+    for i, cmd in enumerate(commands):
+        if command_timeout is not None:
+            cmd = f"timeout {command_timeout:g} bash -c {shlex.quote(cmd)}"
+        call = f"__batch_run {i} {shlex.quote(cmd)}"
+        if parallelism == 1:
+            lines.append(call)
+        else:
+            lines.append(
+                f"{call} & __batch_jobs=$((__batch_jobs + 1)); "
+                f"if [ $__batch_jobs -ge {parallelism} ]; then wait -n; __batch_jobs=$((__batch_jobs - 1)); fi"
+            )
+    lines.append("wait")
+    # 每条命令输出一行: 序号 退出码 开始 结束 x<stdout base64> x<stderr base64>
+    lines.append(
+        f"for __i in $(seq 0 {len(commands) - 1}); do "
+        f"printf '%s %s x%s x%s\\n' \"$__i\" \"$(cat \"$__batch_dir/$__i.meta\")\" "
+        f"\"$(base64 -w0 < \"$__batch_dir/$__i.out\")\" \"$(base64 -w0 < \"$__batch_dir/$__i.err\")\"; "
+        f"done"
+    )
+    lines.append('rm -rf "$__batch_dir"')
+    return "\n".join(lines)
+
+
+def parse_batch_output(stdout: str, count: int) -> List[CommandOutput]:
+    """解析 batch_script 的输出，按命令顺序返回结果"""
+    results: Dict[int, CommandOutput] = {}
+    for line in stdout.splitlines():
+        fields = line.split(" ")
+        if len(fields) != 6:
+            continue
+        index, rc, start, end, out, err = fields
+        results[int(index)] = CommandOutput(
+            stdout=base64.b64decode(out[1:]).decode("utf-8", errors="replace"),
+            stderr=base64.b64decode(err[1:]).decode("utf-8", errors="replace"),
+            exit_code=int(rc),
+            duration=(int(end) - int(start)) / 1e9,
+        )
+    missing = [i for i in range(count) if i not in results]
+    if missing:
+        raise RuntimeError(f"批量执行结果缺少命令: {missing}")
+    return [results[i] for i in range(count)]
+
+
+def _run_kwargs(cwd: Optional[str], envs: Optional[Dict[str, str]], timeout: Optional[float]) -> dict:
+    kwargs = {}
+    if cwd is not None:
+        kwargs["cwd"] = cwd
+    if envs:
+        kwargs["envs"] = envs
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    return kwargs
+
+
+def run_batch(
+    sbx: Sandbox,
+    commands: Sequence[str],
+    parallelism: int = 1,
+    command_timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+    envs: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> List[CommandOutput]:
+    """
+    一次往返执行多条命令
+
+    单条命令失败不会影响其他命令，也不会抛出异常，调用方按 exit_code 判断。
+
+    Args:
+        sbx: 目标沙箱
+        commands: 命令列表，每条命令在独立子 shell 中运行 (cd / export 不会影响其他命令)
+        parallelism: 同时运行的命令数上限，1 表示按顺序依次执行
+        command_timeout: 单条命令的超时时间 (秒)
+        cwd / envs: 所有命令共用的工作目录和环境变量
+        timeout: 整个批次的超时时间 (秒)，透传给 commands.run
+
+    Returns:
+        list: 与 commands 顺序一致的 CommandOutput 列表
+    """
+    if not commands:
+        return []
+    result = sbx.commands.run(
+        batch_script(commands, parallelism, command_timeout),
+        **_run_kwargs(cwd, envs, timeout),
+    )
+    return parse_batch_output(result.stdout, len(commands))
+
+
+async def run_batch_async(
+    sbx: AsyncSandbox,
+    commands: Sequence[str],
+    parallelism: int = 1,
+    command_timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+    envs: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> List[CommandOutput]:
+    """run_batch 的异步版本"""
+    if not commands:
+        return []
+    result = await sbx.commands.run(
+        batch_script(commands, parallelism, command_timeout),
+        **_run_kwargs(cwd, envs, timeout),
+    )
+    return parse_batch_output(result.stdout, len(commands))
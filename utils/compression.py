@@ -0,0 +1,339 @@
+"""
+传输压缩 - 上传前压缩、沙箱内解压 (下载方向相反)，按采样估计的可压缩性自适应选择算法和级别
+
+gzip 走 SDK 原生的 files.write(gzip=True) / files.read(gzip=True)，以 Content-Encoding 在同一个请求中
+压缩传输，不增加往返；SDK 对 bytes 以级别 9 整体压缩、对文件对象以级别 6 流式压缩，自适应级别只在这两者间选择。
+zstd / xz 没有原生支持，需要临时文件加一次 commands.run 在沙箱内解压或压缩，
+比直接传输多一到两次往返，只在数据不小于 PIPELINE_MIN_SIZE 时自动选用，节省的传输时间才足以抵消。
+"""
+import gzip
+import io
+import lzma
+import posixpath
+import shlex
+import time
+import uuid
+import zlib
+from typing import Optional, Tuple, Union
+
+from ucloud_sandbox import Sandbox
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# 常见已压缩格式的文件头，命中时直接跳过压缩
+COMPRESSED_MAGICS = (
+    b"\x89PNG\r\n\x1a\n",   # PNG (截图)
+    b"\xff\xd8\xff",        # JPEG
+    b"GIF87a",
+    b"GIF89a",
+    b"PK\x03\x04",          # ZIP / JAR / DOCX / WHL
+    b"\x1f\x8b",            # gzip
+    b"\x28\xb5\x2f\xfd",    # zstd
+    b"\xfd7zXZ\x00",        # xz
+    b"BZh",                 # bzip2
+    b"7z\xbc\xaf\x27\x1c",  # 7z
+    b"RIFF",                # WEBP / WAV / AVI
+    b"%PDF",
+)
+
+# 常见已压缩格式的扩展名，下载时命中即直接读取，省去一次采样命令
+COMPRESSED_EXTENSIONS = frozenset((
+    ".png", ".jpg", ".jpeg", ".gif", ".webp",
+    ".zip", ".jar", ".whl", ".docx", ".xlsx",
+    ".gz", ".tgz", ".zst", ".xz", ".bz2", ".7z",
+    ".pdf", ".mp3", ".mp4",
+))
+
+SAMPLE_SIZE = 16 * 1024
+SAMPLE_COUNT = 4
+
+# 采样压缩比 (压缩后 / 原始) 高于该值时不压缩
+SKIP_RATIO = 0.9
+# 采样压缩比低于该值时认为高度可压缩，使用更高的压缩级别
+HIGH_COMPRESSIBILITY_RATIO = 0.5
+# 小于该大小的数据不值得压缩
+MIN_SIZE = 4 * 1024
+# 自动选择需要沙箱内命令的算法 (zstd / xz) 的最小大小，更小的数据省下的传输时间抵不上多出的往返
+PIPELINE_MIN_SIZE = 1024 * 1024
+
+
+class Codec:
+    """压缩算法: 本地压缩/解压函数及沙箱内对应的命令"""
+
+    def __init__(self, name: str, suffix: str, default_level: int, high_level: int,
+                 decompress_cmd: Optional[str] = None, compress_cmd: Optional[str] = None):
+        self.name = name
+        self.suffix = suffix
+        self.default_level = default_level
+        self.high_level = high_level
+        # 沙箱内命令，{src} / {dst} / {level} 为占位符；None 表示由 SDK 原生传输
+        self.decompress_cmd = decompress_cmd
+        self.compress_cmd = compress_cmd
+
+    @property
+    def available(self) -> bool:
+        return self.name != "zstd" or zstandard is not None
+
+    @property
+    def native(self) -> bool:
+        """SDK 原生支持的传输编码，不需要临时文件和沙箱内命令"""
+        return self.decompress_cmd is None
+
+    def compress(self, data: bytes, level: int) -> bytes:
+        if self.name == "gzip":
+            return gzip.compress(data, compresslevel=level)
+        if self.name == "xz":
+            return lzma.compress(data, preset=level)
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        if self.name == "gzip":
+            return gzip.decompress(data)
+        if self.name == "xz":
+            return lzma.decompress(data)
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+CODECS = {
+    "zstd": Codec("zstd", ".zst", 1, 3, "zstd -q -dc {src} > {dst}", "zstd -q -{level} -c {src} > {dst}"),
+    # SDK 原生 gzip 只有两种级别: 文件对象流式压缩 (zlib 默认 6) 和 bytes 整体压缩 (gzip.compress 默认 9)
+    "gzip": Codec("gzip", ".gz", 6, 9),
+    "xz": Codec("xz", ".xz", 0, 6, "xz -dc {src} > {dst}", "xz -{level} -c {src} > {dst}"),
+}
+
+# 自动选择时的优先顺序。gzip 由 SDK 原生传输；zstd / xz 要求沙箱内有对应命令，
+# 模板内装有 zstd 时可传 prefer=("zstd", "gzip")，大数据换取更快的压缩，小数据仍用 gzip
+AUTO_PREFERENCE = ("gzip",)
+
+
+def is_compressed_format(data: bytes) -> bool:
+    """根据文件头判断是否为已压缩格式"""
+    return any(data.startswith(magic) for magic in COMPRESSED_MAGICS)
+
+
+def has_compressed_extension(path: str) -> bool:
+    """根据扩展名判断是否为已压缩格式"""
+    return posixpath.splitext(path)[1].lower() in COMPRESSED_EXTENSIONS
+
+
+def estimate_ratio(data: bytes, sample_size: int = SAMPLE_SIZE, samples: int = SAMPLE_COUNT) -> float:
+    """
+    在数据中均匀取若干段样本，用 zlib 最快级别估计压缩比 (压缩后 / 原始)
+
+    只压缩最多 sample_size * samples 字节，耗时与数据总大小无关。
+    """
+    if not data:
+        return 1.0
+    if len(data) <= sample_size * samples:
+        sample = data
+    else:
+        step = (len(data) - sample_size) // (samples - 1)
+        sample = b"".join(data[i * step:i * step + sample_size] for i in range(samples))
+    return len(zlib.compress(sample, 1)) / len(sample)
+
+
+def choose_codec(
+    data: bytes,
+    prefer=AUTO_PREFERENCE,
+) -> Tuple[Optional[Codec], int, float]:
+    """
+    根据数据内容选择压缩算法和级别
+
+    Returns:
+        tuple: (codec, level, estimated_ratio)，codec 为 None 表示不压缩
+    """
+    if len(data) < MIN_SIZE or is_compressed_format(data):
+        return None, 0, 1.0
+    ratio = estimate_ratio(data)
+    if ratio > SKIP_RATIO:
+        return None, 0, ratio
+    codec = _first_available(prefer, pipeline=len(data) >= PIPELINE_MIN_SIZE)
+    if codec is None:
+        return None, 0, ratio
+    return codec, _auto_level(codec, ratio), ratio
+
+
+def _first_available(prefer, pipeline: bool = True) -> Optional[Codec]:
+    """prefer 中第一个可用的算法，pipeline 为 False 时只考虑 SDK 原生传输的算法"""
+    return next(
+        (CODECS[name] for name in prefer if CODECS[name].available and (pipeline or CODECS[name].native)),
+        None,
+    )
+
+
+def _auto_level(codec: Codec, ratio: float) -> int:
+    return codec.high_level if ratio < HIGH_COMPRESSIBILITY_RATIO else codec.default_level
+
+
+def _resolve(codec: Optional[str], level: Optional[int], data: bytes, prefer) -> Tuple[Optional[Codec], int, float]:
+    if codec == "auto":
+        return choose_codec(data, prefer)
+    if codec is None:
+        return None, 0, 1.0
+    if codec not in CODECS:
+        raise ValueError(f"不支持的压缩算法: {codec!r}，可选 {list(CODECS)}")
+    selected = CODECS[codec]
+    if not selected.available:
+        raise ImportError("zstd 压缩需要安装 zstandard: pip install zstandard")
+    if selected.native and level is not None:
+        # 只能在 SDK 提供的两种级别间选择，不低于 high_level 的请求使用 high_level
+        level = selected.high_level if level >= selected.high_level else selected.default_level
+    return selected, level if level is not None else selected.default_level, 1.0
+
+
+def write_compressed(
+    sbx: Sandbox,
+    path: str,
+    data: Union[str, bytes],
+    codec: Optional[str] = "auto",
+    level: Optional[int] = None,
+    prefer=AUTO_PREFERENCE,
+) -> dict:
+    """
+    压缩后上传并在沙箱内解压到 path
+
+    Args:
+        sbx: 目标沙箱
+        path: 沙箱中的目标路径
+        data: 文本或二进制内容
+        codec: "auto" 按采样自动选择；"zstd" / "gzip" / "xz" 指定算法；None 不压缩
+        level: 压缩级别，None 使用算法默认值 (auto 时按可压缩性选择)；gzip 只有 6 和 9 两种
+        prefer: auto 模式下候选算法的优先顺序
+
+    Returns:
+        dict: 传输统计 (codec, level, raw_bytes, wire_bytes, ratio, compress_seconds, seconds)；
+              gzip 在 SDK 内边压缩边上传，实际传输字节数不可见，wire_bytes / ratio 为 None，
+              compress_seconds 计入 seconds
+    """
+    start = time.perf_counter()
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    selected, level, _ = _resolve(codec, level, raw, prefer)
+
+    payload = raw
+    compress_seconds = 0.0
+    if selected is None:
+        sbx.files.write(path, raw)
+    elif selected.native:
+        # 以 BytesIO 传入时 SDK 按块流式压缩 (级别 6)；以 bytes 传入时整体 gzip.compress (级别 9)，
+        # 更慢但对高度可压缩的数据更小。envd 低于 0.5.7 时 SDK 退回不压缩上传
+        body = raw if level >= selected.high_level else io.BytesIO(raw)
+        sbx.files.write(path, body, gzip=True)
+        payload = None
+    else:
+        compress_start = time.perf_counter()
+        payload = selected.compress(raw, level)
+        compress_seconds = time.perf_counter() - compress_start
+        tmp = f"/tmp/upload_{uuid.uuid4().hex}{selected.suffix}"
+        sbx.files.write(tmp, payload)
+        decompress = selected.decompress_cmd.format(src=tmp, dst=shlex.quote(path))
+        sbx.commands.run(f"{decompress}; status=$?; rm -f {tmp}; exit $status")
+
+    return {
+        "codec": selected.name if selected else None,
+        "level": level,
+        "raw_bytes": len(raw),
+        "wire_bytes": len(payload) if payload is not None else None,
+        "ratio": (len(payload) / len(raw) if raw else 1.0) if payload is not None else None,
+        "compress_seconds": compress_seconds,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def probe_remote(sbx: Sandbox, path: str) -> Tuple[int, bytes, float]:
+    """
+    一条命令获取沙箱文件的大小、文件头和采样压缩比
+
+    Returns:
+        tuple: (size, head_bytes, estimated_ratio)
+    """
+    quoted = shlex.quote(path)
+    result = sbx.commands.run(
+        f"wc -c < {quoted}; "
+        f"head -c 16 {quoted} | od -An -tx1 | tr -d ' \\n'; echo; "
+        f"head -c {SAMPLE_SIZE * SAMPLE_COUNT} {quoted} | gzip -1 -c | wc -c"
+    )
+    size_line, head_line, compressed_line = result.stdout.strip().splitlines()[:3]
+    size = int(size_line)
+    head = bytes.fromhex(head_line.strip())
+    sample = min(size, SAMPLE_SIZE * SAMPLE_COUNT)
+    ratio = int(compressed_line) / sample if sample else 1.0
+    return size, head, ratio
+
+
+def read_compressed(
+    sbx: Sandbox,
+    path: str,
+    codec: Optional[str] = "auto",
+    level: Optional[int] = None,
+    format: str = "bytes",
+    prefer=AUTO_PREFERENCE,
+) -> Tuple[Union[str, bytes], dict]:
+    """
+    在沙箱内压缩后下载并在本地解压
+
+    auto 模式先按扩展名跳过已压缩格式，否则用 probe_remote 在沙箱内采样 (一次命令)，
+    对过小、已压缩格式或不可压缩的数据直接读取，不让沙箱对其做无用的压缩；
+    小于 PIPELINE_MIN_SIZE 的数据只考虑 gzip。gzip 是在读取请求上加 Accept-Encoding，
+    级别由沙箱决定 (level 为 None)，传输字节数取自 HTTP 响应实际接收的字节数。
+
+    Args:
+        sbx: 源沙箱
+        path: 沙箱中的文件路径
+        codec / level / prefer: 含义同 write_compressed
+        format: "bytes" 返回 bytes，"text" 返回 UTF-8 解码后的字符串
+
+    Returns:
+        tuple: (内容, 传输统计)
+    """
+    if format not in ("bytes", "text"):
+        raise ValueError(f"format 必须是 'bytes' 或 'text': {format!r}")
+    start = time.perf_counter()
+
+    wire_bytes = None
+    if codec == "auto":
+        selected = None
+        level = None
+        if _first_available(prefer) is not None and not has_compressed_extension(path):
+            size, head, ratio = probe_remote(sbx, path)
+            if size >= MIN_SIZE and not is_compressed_format(head) and ratio <= SKIP_RATIO:
+                selected = _first_available(prefer, pipeline=size >= PIPELINE_MIN_SIZE)
+            if selected is not None and not selected.native:
+                level = _auto_level(selected, ratio)
+    else:
+        selected, level, _ = _resolve(codec, level, b"", prefer)
+        if selected is not None and selected.native:
+            level = None
+
+    if selected is None:
+        raw = sbx.files.read(path, format="bytes")
+        wire_bytes = len(raw)
+    elif selected.native:
+        # 以流读取: 内容由 httpx 按 Content-Encoding 透明解压，响应的 num_bytes_downloaded 是实际接收的字节数
+        with sbx.files.read(path, format="stream", gzip=True) as stream:
+            raw = b"".join(stream)
+            response = getattr(stream, "_response", None)
+            wire_bytes = getattr(response, "num_bytes_downloaded", None)
+    else:
+        tmp = f"/tmp/download_{uuid.uuid4().hex}{selected.suffix}"
+        compress = selected.compress_cmd.format(src=shlex.quote(path), dst=tmp, level=level)
+        sbx.commands.run(compress)
+        try:
+            payload = sbx.files.read(tmp, format="bytes")
+        finally:
+            sbx.commands.run(f"rm -f {tmp}")
+        raw = selected.decompress(payload)
+        wire_bytes = len(payload)
+
+    stats = {
+        "codec": selected.name if selected else None,
+        "level": level if selected else 0,
+        "raw_bytes": len(raw),
+        "wire_bytes": wire_bytes,
+        "ratio": (wire_bytes / len(raw) if raw else 1.0) if wire_bytes is not None else None,
+        "seconds": time.perf_counter() - start,
+    }
+    return (raw.decode("utf-8") if format == "text" else raw), stats
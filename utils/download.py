@@ -0,0 +1,192 @@
+"""
+大文件下载 - 流式写入预分配的本地文件，大文件按字节范围并行下载
+"""
+import hashlib
+import os
+import shlex
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from ucloud_sandbox import Sandbox
+
+from utils.upload import HASH_BLOCK_SIZE, remote_sha256
+
+
+DEFAULT_RANGE_SIZE = 32 * 1024 * 1024
+DEFAULT_PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+
+class DownloadError(Exception):
+    """下载失败 (范围重试耗尽、长度或校验不一致)"""
+
+
+def preallocate(path: str, size: int) -> int:
+    """
+    创建并预分配本地文件，返回可写的文件描述符
+
+    支持 posix_fallocate 的平台会真正分配磁盘块，磁盘不足时提前失败；
+    其他平台退化为 ftruncate 生成稀疏文件。
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if size > 0 and hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+    except OSError:
+        os.ftruncate(fd, size)
+    return fd
+
+
+def plan_ranges(size: int, range_size: int = DEFAULT_RANGE_SIZE) -> List[dict]:
+    """把 [0, size) 切分为若干字节范围"""
+    if range_size <= 0:
+        raise ValueError(f"range_size 必须大于 0: {range_size}")
+    return [
+        {"index": i, "offset": offset, "length": min(range_size, size - offset)}
+        for i, offset in enumerate(range(0, size, range_size))
+    ]
+
+
+def _write_stream(fd: int, chunks, offset: int) -> int:
+    """把流式数据块按偏移写入本地文件，返回写入的字节数"""
+    written = 0
+    for chunk in chunks:
+        view = memoryview(chunk)
+        while view:
+            n = os.pwrite(fd, view, offset + written)
+            view = view[n:]
+            written += n
+    return written
+
+
+def _download_range(
+    sbx: Sandbox,
+    remote_path: str,
+    fd: int,
+    part: dict,
+    tmp_dir: str,
+    retries: int,
+    retry_delay: float,
+) -> int:
+    """
+    下载一个字节范围: 沙箱内用 dd 截出该范围，再流式读取写入本地对应偏移
+
+    失败时只重试该范围，返回尝试次数。
+    """
+    part_path = f"{tmp_dir}/range_{part['index']:06d}"
+    quoted_part = shlex.quote(part_path)
+    for attempt in range(1, retries + 2):
+        try:
+            sbx.commands.run(
+                f"dd if={shlex.quote(remote_path)} of={quoted_part} bs=1M "
+                f"skip={part['offset']} count={part['length']} "
+                f"iflag=skip_bytes,count_bytes status=none"
+            )
+            # pwrite 失败时也要关闭流，释放 HTTP 连接
+            with sbx.files.read(part_path, format="stream") as stream:
+                written = _write_stream(fd, stream, part["offset"])
+            if written != part["length"]:
+                raise DownloadError(f"范围 {part['index']} 长度不一致: {written} != {part['length']}")
+            sbx.commands.run(f"rm -f {quoted_part}")
+            return attempt
+        except Exception as e:
+            if attempt > retries:
+                raise DownloadError(f"范围 {part['index']} 下载失败 (已重试 {retries} 次): {e}") from e
+            time.sleep(retry_delay * attempt)
+
+
+def local_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def download_file(
+    sbx: Sandbox,
+    remote_path: str,
+    local_path: str,
+    range_size: int = DEFAULT_RANGE_SIZE,
+    max_workers: int = 4,
+    parallel_threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+    retries: int = 3,
+    retry_delay: float = 1.0,
+    verify: bool = False,
+) -> dict:
+    """
+    下载沙箱文件到本地，内存占用与文件大小无关
+
+    先按远端大小预分配本地文件，数据块到达后直接写入对应偏移，不在内存中拼接。
+    小于 parallel_threshold 的文件用一个 files.read 流下载；
+    更大的文件按 range_size 切分，各范围在沙箱内用 dd 截出后并发读取。
+
+    Args:
+        sbx: 源沙箱
+        remote_path: 沙箱中的文件路径
+        local_path: 本地目标路径
+        range_size: 并行下载时每个范围的大小 (字节)
+        max_workers: 并发下载的范围数
+        parallel_threshold: 超过该大小时启用并行范围下载
+        retries: 单个范围的最大重试次数
+        retry_delay: 重试间隔基数 (秒)，按尝试次数线性递增
+        verify: 下载完成后是否比对 sha256
+
+    Returns:
+        dict: 下载统计 (size, ranges, attempts, parallel, seconds, mb_per_s)
+
+    Raises:
+        DownloadError: 范围重试耗尽、长度或校验不一致
+    """
+    start = time.perf_counter()
+    size = sbx.files.get_info(remote_path).size
+    parallel = size >= parallel_threshold and size > range_size
+
+    fd = preallocate(local_path, size)
+    try:
+        if parallel:
+            ranges = plan_ranges(size, range_size)
+            tmp_dir = f"/tmp/download_{uuid.uuid4().hex}"
+            sbx.files.make_dir(tmp_dir)
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    attempts = list(executor.map(
+                        lambda part: _download_range(
+                            sbx, remote_path, fd, part, tmp_dir, retries, retry_delay
+                        ),
+                        ranges,
+                    ))
+            finally:
+                try:
+                    sbx.commands.run(f"rm -rf {shlex.quote(tmp_dir)}")
+                except Exception:
+                    pass
+        else:
+            ranges = [{"index": 0, "offset": 0, "length": size}]
+            with sbx.files.read(remote_path, format="stream") as stream:
+                written = _write_stream(fd, stream, 0)
+            if written != size:
+                raise DownloadError(f"下载长度不一致: {written} != {size}")
+            attempts = [1]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    if verify:
+        expected = remote_sha256(sbx, remote_path)
+        actual = local_sha256(local_path)
+        if actual != expected:
+            raise DownloadError(f"校验失败: 沙箱 {expected} != 本地 {actual}")
+
+    seconds = time.perf_counter() - start
+    return {
+        "size": size,
+        "ranges": len(ranges),
+        "attempts": sum(attempts),
+        "parallel": parallel,
+        "seconds": seconds,
+        "mb_per_s": size / (1024 ** 2) / seconds if seconds > 0 else 0.0,
+    }
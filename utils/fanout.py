@@ -0,0 +1,245 @@
+"""
+多沙箱命令分发 - 基于 AsyncSandbox 在大量沙箱上并发执行同一条命令，结果完成即返回，
+最后汇总延迟百分位和失败分组
+
+连接和列出沙箱的方式可以注入 (connect / list_sandboxes 参数)，便于用进程内假沙箱做单元测试；
+connect_kwargs 透传给 AsyncSandbox.connect，其中的 ApiParams (domain / api_url / api_key 等)
+也会传给 AsyncSandbox.list，列出和连接使用同一个 API。
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from ucloud_sandbox import ApiParams, AsyncSandbox, SandboxQuery, SandboxState
+
+from utils.stats import PERCENTILES, percentile
+
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_TIMEOUT = 30.0
+
+
+class FanoutResult:
+    """单个沙箱上的执行结果"""
+
+    def __init__(
+        self,
+        sandbox_id: str,
+        exit_code: Optional[int],
+        stdout: str = "",
+        stderr: str = "",
+        error: Optional[BaseException] = None,
+        duration: float = 0.0,
+    ):
+        self.sandbox_id = sandbox_id
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.error = error
+        self.duration = duration
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.exit_code == 0
+
+    @property
+    def failure_key(self) -> Optional[str]:
+        """失败分组的键: 异常类型 + 首行信息，或退出码 + stderr 首行"""
+        if self.ok:
+            return None
+        if self.exit_code is not None and self.exit_code != 0:
+            first_line = (self.stderr.strip().splitlines() or [""])[0]
+            return f"exit {self.exit_code}: {first_line[:120]}"
+        message = (str(self.error).strip().splitlines() or [""])[0]
+        return f"{type(self.error).__name__}: {message[:120]}"
+
+    def as_dict(self) -> dict:
+        return {
+            "sandbox_id": self.sandbox_id,
+            "ok": self.ok,
+            "exit_code": self.exit_code,
+            "duration": self.duration,
+            "failure": self.failure_key,
+        }
+
+    def __repr__(self):
+        status = "ok" if self.ok else self.failure_key
+        return f"FanoutResult({self.sandbox_id}, {status}, {self.duration:.3f}s)"
+
+
+def summarize_results(results: List[FanoutResult], wall_seconds: Optional[float] = None) -> dict:
+    """
+    汇总分发结果
+
+    Returns:
+        dict: total / succeeded / failed / latency (mean/min/p50/p90/p99/max) /
+              failure_groups ({失败键: {"count", "sandbox_ids"}}，按数量降序)
+    """
+    durations = sorted(r.duration for r in results)
+    latency = {
+        "mean": sum(durations) / len(durations) if durations else 0.0,
+        "min": durations[0] if durations else 0.0,
+    }
+    for pct in PERCENTILES:
+        latency[f"p{pct}"] = percentile(durations, pct)
+    latency["max"] = durations[-1] if durations else 0.0
+
+    groups: Dict[str, dict] = {}
+    for result in results:
+        key = result.failure_key
+        if key is None:
+            continue
+        group = groups.setdefault(key, {"count": 0, "sandbox_ids": []})
+        group["count"] += 1
+        group["sandbox_ids"].append(result.sandbox_id)
+
+    succeeded = sum(1 for r in results if r.ok)
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "wall_seconds": wall_seconds,
+        "latency": latency,
+        "failure_groups": dict(sorted(groups.items(), key=lambda item: -item[1]["count"])),
+    }
+
+
+async def resolve_targets(
+    sandbox_ids: Optional[List[str]] = None,
+    metadata: Optional[Dict[str, str]] = None,
+    list_sandboxes: Callable = AsyncSandbox.list,
+    **api_params,
+) -> List[str]:
+    """
+    确定目标沙箱: 直接给出的 ID 列表，或 metadata 全部匹配的运行中沙箱
+
+    metadata 和状态筛选都交给 AsyncSandbox.list 的 query 在服务端完成。只列出 RUNNING 状态:
+    list 默认也返回已暂停的沙箱，而 connect 会恢复已暂停的沙箱，分发命令不应悄悄唤醒它们。
+    api_params 为透传给 list 的 ApiParams (domain / api_url / api_key 等)。
+    """
+    if sandbox_ids is not None:
+        return list(dict.fromkeys(sandbox_ids))
+    if metadata is None:
+        raise ValueError("必须指定 sandbox_ids 或 metadata")
+
+    paginator = list_sandboxes(
+        query=SandboxQuery(metadata=metadata, state=[SandboxState.RUNNING]),
+        **api_params,
+    )
+    targets = []
+    while True:
+        targets.extend(info.sandbox_id for info in await paginator.next_items())
+        if not paginator.has_next:
+            break
+    return targets
+
+
+async def _run_one(
+    sandbox_id: str,
+    cmd: str,
+    timeout: float,
+    semaphore: asyncio.Semaphore,
+    connect: Callable[..., Awaitable],
+    connect_kwargs: dict,
+) -> FanoutResult:
+    async with semaphore:
+        start = time.perf_counter()
+
+        async def execute():
+            sbx = await connect(sandbox_id, **connect_kwargs)
+            return await sbx.commands.run(cmd, timeout=timeout)
+
+        try:
+            result = await asyncio.wait_for(execute(), timeout)
+            return FanoutResult(
+                sandbox_id,
+                result.exit_code,
+                result.stdout,
+                result.stderr,
+                duration=time.perf_counter() - start,
+            )
+        except asyncio.TimeoutError as e:
+            error = TimeoutError(f"{timeout}s 内未完成")
+            error.__cause__ = e
+            return FanoutResult(sandbox_id, None, error=error, duration=time.perf_counter() - start)
+        except Exception as e:
+            # commands.run 在退出码非 0 时抛出 CommandExitException，其中带有退出码和输出
+            return FanoutResult(
+                sandbox_id,
+                getattr(e, "exit_code", None),
+                getattr(e, "stdout", "") or "",
+                getattr(e, "stderr", "") or "",
+                error=None if getattr(e, "exit_code", None) else e,
+                duration=time.perf_counter() - start,
+            )
+
+
+async def fan_out_iter(
+    cmd: str,
+    sandbox_ids: Optional[List[str]] = None,
+    metadata: Optional[Dict[str, str]] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    connect: Callable[..., Awaitable] = AsyncSandbox.connect,
+    list_sandboxes: Callable = AsyncSandbox.list,
+    **connect_kwargs,
+) -> AsyncIterator[FanoutResult]:
+    """
+    在多个沙箱上并发执行 cmd，按完成顺序 yield 每个沙箱的结果
+
+    提前停止迭代时会取消尚未完成的执行。
+
+    Args:
+        cmd: 要执行的命令
+        sandbox_ids: 目标沙箱 ID 列表
+        metadata: 未给出 sandbox_ids 时，按 metadata 列出运行中的沙箱
+        concurrency: 同时执行的沙箱数上限
+        timeout: 单个沙箱的超时时间 (秒，包括连接和执行)
+        connect: 连接沙箱的协程函数，默认 AsyncSandbox.connect
+        list_sandboxes: 列出沙箱的函数，默认 AsyncSandbox.list
+        connect_kwargs: 透传给 connect 的参数，其中的 ApiParams 同时传给 list_sandboxes
+    """
+    api_params = {k: v for k, v in connect_kwargs.items() if k in ApiParams.__annotations__}
+    targets = await resolve_targets(sandbox_ids, metadata, list_sandboxes, **api_params)
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.ensure_future(_run_one(sandbox_id, cmd, timeout, semaphore, connect, connect_kwargs))
+        for sandbox_id in targets
+    ]
+    try:
+        for future in asyncio.as_completed(tasks):
+            yield await future
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def fan_out(
+    cmd: str,
+    sandbox_ids: Optional[List[str]] = None,
+    metadata: Optional[Dict[str, str]] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    on_result: Optional[Callable[[FanoutResult], None]] = None,
+    **kwargs,
+) -> dict:
+    """
+    在多个沙箱上执行 cmd 并返回汇总报告
+
+    Args:
+        on_result: 每个沙箱完成时的回调
+        其余参数同 fan_out_iter
+
+    Returns:
+        dict: summarize_results 的报告，另含 results (每个沙箱的结果)
+    """
+    start = time.perf_counter()
+    results = []
+    async for result in fan_out_iter(cmd, sandbox_ids, metadata, concurrency, timeout, **kwargs):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    report = summarize_results(results, time.perf_counter() - start)
+    report["results"] = [r.as_dict() for r in results]
+    return report
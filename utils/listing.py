@@ -0,0 +1,186 @@
+"""
+流式递归列目录 - 在沙箱内用 find 过滤，边遍历边分页返回
+
+files.list(path, depth=...) 要等整个遍历结束才返回完整列表。这里把 glob、类型、大小、
+修改时间条件转成 find 表达式在沙箱内执行，不匹配的条目不会传输，结果随输出到达分页 yield。
+"""
+import posixpath
+import queue
+import shlex
+import threading
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Sequence, Union
+
+from ucloud_sandbox import EntryInfo, FileType, Sandbox
+
+
+DEFAULT_PAGE_SIZE = 500
+
+_FIND_TYPES = {
+    "file": "f",
+    "dir": "d",
+    "symlink": "l",
+}
+
+# find %y 输出的类型字符，其余类型 (设备、管道、套接字) 按普通文件处理
+_ENTRY_TYPES = {
+    "d": FileType.DIR,
+    "l": FileType.SYMLINK,
+}
+
+# 每个条目输出两个以 NUL 结尾的字段: "类型\t大小\t模式\t权限\t用户\t组\t修改时间\t链接目标" 和路径
+_PRINTF = r"%y\t%s\t%m\t%M\t%u\t%g\t%T@\t%l\0%p\0"
+
+_END = object()
+
+
+def _timestamp(value: Union[datetime, float, int]) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def find_command(
+    path: str,
+    pattern: Union[str, Sequence[str], None] = None,
+    type: Union[str, FileType, None] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    modified_after: Union[datetime, float, None] = None,
+    modified_before: Union[datetime, float, None] = None,
+    depth: Optional[int] = None,
+    exclude: Sequence[str] = (),
+) -> str:
+    """
+    把过滤条件转成 find 命令
+
+    Args:
+        path: 起始目录
+        pattern: 文件名通配符 (含 "/" 时匹配完整路径)，多个时任一匹配即可
+        type: "file" / "dir" / "symlink" 或 FileType
+        min_size / max_size: 文件大小范围 (字节，含边界)
+        modified_after / modified_before: 修改时间范围 (datetime 或 Unix 时间戳)
+        depth: 最大深度，1 表示只列直接子项 (与 files.list 的 depth 一致)
+        exclude: 不进入的目录名，例如 ("node_modules", ".git")
+    """
+    args = ["find", shlex.quote(path), "-mindepth", "1"]
+    if depth is not None:
+        args += ["-maxdepth", str(depth)]
+    if exclude:
+        names = " -o ".join(f"-name {shlex.quote(name)}" for name in exclude)
+        args += ["\\(", "-type", "d", "\\(", names, "\\)", "-prune", "\\)", "-o"]
+
+    tests = []
+    if pattern:
+        patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+        alternatives = " -o ".join(
+            f"{'-path' if '/' in p else '-name'} {shlex.quote(p)}" for p in patterns
+        )
+        tests.append(f"\\( {alternatives} \\)")
+    if type is not None:
+        key = type.value if isinstance(type, FileType) else type
+        if key not in _FIND_TYPES:
+            raise ValueError(f"type 必须是 {list(_FIND_TYPES)} 之一: {type!r}")
+        tests.append(f"-type {_FIND_TYPES[key]}")
+    if min_size:
+        tests.append(f"-size +{min_size - 1}c")
+    if max_size is not None:
+        tests.append(f"-size -{max_size + 1}c")
+    if modified_after is not None:
+        tests.append(f"-newermt @{_timestamp(modified_after):.6f}")
+    if modified_before is not None:
+        tests.append(f"! -newermt @{_timestamp(modified_before):.6f}")
+
+    args += tests
+    args += ["-printf", shlex.quote(_PRINTF)]
+    return " ".join(args)
+
+
+def _parse_entry(head: str, path: str) -> EntryInfo:
+    kind, size, mode, permissions, owner, group, mtime, target = head.split("\t", 7)
+    return EntryInfo(
+        name=posixpath.basename(path),
+        path=path,
+        type=_ENTRY_TYPES.get(kind, FileType.FILE),
+        size=int(size),
+        mode=int(mode, 8),
+        # %M 的首字符是类型，EntryInfo.permissions 只有 rwxr-xr-x 九位
+        permissions=permissions[1:],
+        owner=owner,
+        group=group,
+        modified_time=datetime.fromtimestamp(float(mtime), tz=timezone.utc),
+        symlink_target=target or None,
+    )
+
+
+def iter_entries(
+    sbx: Sandbox,
+    path: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    **filters,
+) -> Iterator[List[EntryInfo]]:
+    """
+    流式递归列出 path 下匹配条件的条目 (EntryInfo，与 files.list 一致)，每页最多 page_size 个
+
+    find 在后台运行，输出到达即解析；提前停止迭代时会终止沙箱内的 find 进程。
+    无权限读取的子目录会被跳过，path 不存在时抛出 CommandExitException。
+
+    Args:
+        sbx: 目标沙箱
+        path: 起始目录
+        page_size: 每页条目数
+        filters: 过滤条件，见 find_command
+    """
+    quoted = shlex.quote(path)
+    command = (
+        f"[ -d {quoted} ] || {{ echo \"not a directory: \"{quoted} >&2; exit 2; }}; "
+        f"{find_command(path, **filters)} 2>/dev/null; true"
+    )
+    tokens: "queue.Queue" = queue.Queue()
+    pending = [""]
+
+    def on_stdout(chunk: str):
+        parts = (pending[0] + chunk).split("\0")
+        pending[0] = parts.pop()
+        for part in parts:
+            tokens.put(part)
+
+    # timeout=0: 大目录树的 find 可能超过 SDK 默认的 60 秒，否则结果会被截断
+    handle = sbx.commands.run(command, background=True, timeout=0)
+
+    def wait():
+        try:
+            handle.wait(on_stdout=on_stdout)
+            tokens.put(_END)
+        except Exception as e:
+            tokens.put(e)
+
+    waiter = threading.Thread(target=wait, daemon=True)
+    waiter.start()
+
+    finished = False
+    try:
+        page: List[EntryInfo] = []
+        while True:
+            head = tokens.get()
+            if head is _END:
+                break
+            if isinstance(head, Exception):
+                raise head
+            page.append(_parse_entry(head, tokens.get()))
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+        finished = True
+    finally:
+        if not finished:
+            try:
+                sbx.commands.kill(handle.pid)
+            except Exception:
+                pass
+        waiter.join(timeout=5)
+
+
+def list_recursive(sbx: Sandbox, path: str, **filters) -> List[EntryInfo]:
+    """iter_entries 的非流式版本，返回所有匹配条目"""
+    return [entry for page in iter_entries(sbx, path, **filters) for entry in page]
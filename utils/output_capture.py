@@ -0,0 +1,270 @@
+"""
+有界内存的命令输出捕获 - 长时间运行、输出量巨大的命令只在本地保留头部和尾部，
+超过阈值的完整输出可落盘，并记录真实字节数
+
+commands.run (以及后台句柄的 wait) 会在 SDK 内部累积全部输出。run_bounded 让命令在沙箱内
+把 stdout / stderr 写入临时文件，本地按偏移量分块拉取新增内容，每次拉取的结果用完即释放，
+本地内存只取决于分块大小和捕获策略。on_stdout / on_stderr 回调照常收到 str 输出。
+"""
+import base64
+import codecs
+import shlex
+import time
+import uuid
+from typing import Callable, Optional
+
+from ucloud_sandbox import Sandbox
+
+from utils.shell_session import CommandOutput, ShellCommandError
+
+
+DEFAULT_HEAD_BYTES = 64 * 1024
+DEFAULT_TAIL_BYTES = 64 * 1024
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_POLL_INTERVAL = 0.2
+
+TRUNCATION_MARKER = "\n... [省略 {omitted} 字节] ...\n"
+
+
+class OutputCapture:
+    """
+    单个输出流的捕获策略
+
+    保留前 head_bytes 和最后 tail_bytes 字节；指定 spill_path 时，总量超过 spill_threshold
+    后把完整输出写入该文件 (阈值以内的部分先缓存在内存中，超过时一次写出)。
+
+    Args:
+        head_bytes: 保留的头部字节数
+        tail_bytes: 保留的尾部字节数
+        spill_path: 完整输出的落盘路径，None 表示不落盘
+        spill_threshold: 开始落盘的总字节数，默认等于 head_bytes + tail_bytes
+    """
+
+    def __init__(
+        self,
+        head_bytes: int = DEFAULT_HEAD_BYTES,
+        tail_bytes: int = DEFAULT_TAIL_BYTES,
+        spill_path: Optional[str] = None,
+        spill_threshold: Optional[int] = None,
+    ):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.spill_path = spill_path
+        self.spill_threshold = spill_threshold if spill_threshold is not None else head_bytes + tail_bytes
+        self.total_bytes = 0
+
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._unspilled = bytearray()
+        self._spill_file = None
+
+    @property
+    def truncated(self) -> bool:
+        """内存中的头部 + 尾部是否不是完整输出"""
+        return self.total_bytes > self.kept_bytes
+
+    @property
+    def kept_bytes(self) -> int:
+        """内存中保留的字节数 (_tail 可能暂存超过 tail_bytes 的数据，只计最后 tail_bytes 字节)"""
+        return len(self._head) + min(len(self._tail), self.tail_bytes)
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill_file is not None
+
+    def write(self, data: bytes):
+        self.total_bytes += len(data)
+
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            rest = data[room:]
+        else:
+            rest = data
+        if rest and self.tail_bytes > 0:
+            self._tail += rest
+            # 超过两倍容量时才裁剪，摊销 bytearray 前部删除的开销
+            if len(self._tail) > 2 * self.tail_bytes:
+                del self._tail[:-self.tail_bytes]
+
+        if self.spill_path is not None:
+            if self._spill_file is not None:
+                self._spill_file.write(data)
+            else:
+                self._unspilled += data
+                if self.total_bytes > self.spill_threshold:
+                    self._spill_file = open(self.spill_path, "wb")
+                    self._spill_file.write(self._unspilled)
+                    self._unspilled = bytearray()
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+
+    @property
+    def head(self) -> bytes:
+        return bytes(self._head)
+
+    @property
+    def tail(self) -> bytes:
+        return bytes(self._tail[-self.tail_bytes:]) if self.tail_bytes > 0 else b""
+
+    def text(self) -> str:
+        """头部 + 尾部的文本，截断时中间插入省略标记"""
+        head = self.head.decode("utf-8", errors="replace")
+        if not self.truncated:
+            return head + self.tail.decode("utf-8", errors="replace")
+        omitted = self.total_bytes - self.kept_bytes
+        return head + TRUNCATION_MARKER.format(omitted=omitted) + self.tail.decode("utf-8", errors="replace")
+
+    def summary(self) -> dict:
+        return {
+            "total_bytes": self.total_bytes,
+            "kept_bytes": self.kept_bytes,
+            "truncated": self.truncated,
+            "spill_path": self.spill_path if self.spilled else None,
+        }
+
+
+class BoundedResult:
+    """run_bounded 的结果"""
+
+    def __init__(self, exit_code: int, stdout: OutputCapture, stderr: OutputCapture, duration: float):
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+
+    def summary(self) -> dict:
+        return {
+            "exit_code": self.exit_code,
+            "duration": self.duration,
+            "stdout": self.stdout.summary(),
+            "stderr": self.stderr.summary(),
+        }
+
+    def __repr__(self):
+        return (
+            f"BoundedResult(exit_code={self.exit_code}, stdout_bytes={self.stdout.total_bytes}, "
+            f"stderr_bytes={self.stderr.total_bytes}, duration={self.duration:.3f})"
+        )
+
+
+def _read_command(work_dir: str, stdout_offset: int, stderr_offset: int, chunk_size: int) -> str:
+    """一次读取两个输出文件从偏移量开始的新增内容，以及退出码文件"""
+    def dd(name: str, offset: int) -> str:
+        return (
+            f"dd if={work_dir}/{name} bs=1M iflag=skip_bytes,count_bytes "
+            f"skip={offset} count={chunk_size} 2>/dev/null | base64 -w0; echo"
+        )
+    # 先读退出码再读输出: 读到退出码时，输出文件已经完整
+    return (
+        f"printf '%s\\n' \"$(cat {work_dir}/rc 2>/dev/null)\"; "
+        f"{dd('out', stdout_offset)}; {dd('err', stderr_offset)}"
+    )
+
+
+def run_bounded(
+    sbx: Sandbox,
+    cmd: str,
+    stdout: Optional[OutputCapture] = None,
+    stderr: Optional[OutputCapture] = None,
+    on_stdout: Optional[Callable[[str], None]] = None,
+    on_stderr: Optional[Callable[[str], None]] = None,
+    cwd: Optional[str] = None,
+    envs: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    check: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> BoundedResult:
+    """
+    以有界内存运行命令并捕获输出
+
+    Args:
+        sbx: 目标沙箱
+        cmd: shell 命令
+        stdout / stderr: 捕获策略，None 使用默认的头尾各 64KB
+        on_stdout / on_stderr: 输出回调，与 commands.run 的同名参数一致
+        cwd / envs: 工作目录和环境变量
+        timeout: 超时时间 (秒)，超时后终止命令并抛出 TimeoutError
+        check: 退出码非 0 时抛出 ShellCommandError (与 commands.run 行为一致)
+        chunk_size: 每次拉取每个输出流的最大字节数，决定单次拉取的内存占用
+        poll_interval: 没有新输出时的轮询间隔 (秒)
+
+    Returns:
+        BoundedResult
+    """
+    stdout = stdout or OutputCapture()
+    stderr = stderr or OutputCapture()
+    work_dir = f"/tmp/bounded_{uuid.uuid4().hex}"
+
+    kwargs = {}
+    if cwd is not None:
+        kwargs["cwd"] = cwd
+    if envs:
+        kwargs["envs"] = envs
+
+    # 后台命令默认受 commands.run 的 60 秒超时限制，这里改由本函数的 timeout 控制 (0 表示不限制)
+    kwargs["timeout"] = 0
+
+    start = time.perf_counter()
+    handle = sbx.commands.run(
+        f"mkdir -p {work_dir} && : > {work_dir}/out && : > {work_dir}/err; "
+        f"( eval {shlex.quote(cmd)} ) < /dev/null > {work_dir}/out 2> {work_dir}/err; "
+        f"echo $? > {work_dir}/rc.tmp && mv {work_dir}/rc.tmp {work_dir}/rc",
+        background=True,
+        **kwargs,
+    )
+
+    streams = (
+        (stdout, on_stdout, codecs.getincrementaldecoder("utf-8")(errors="replace")),
+        (stderr, on_stderr, codecs.getincrementaldecoder("utf-8")(errors="replace")),
+    )
+    exit_code = None
+    try:
+        while True:
+            if timeout is not None and time.perf_counter() - start > timeout:
+                sbx.commands.kill(handle.pid)
+                raise TimeoutError(f"命令在 {timeout}s 内未完成: {cmd}")
+
+            result = sbx.commands.run(
+                _read_command(work_dir, stdout.total_bytes, stderr.total_bytes, chunk_size)
+            )
+            rc_line, out_line, err_line = (result.stdout.split("\n") + ["", "", ""])[:3]
+            del result
+
+            got = 0
+            for (capture, callback, decoder), line in zip(streams, (out_line, err_line)):
+                data = base64.b64decode(line) if line else b""
+                got = max(got, len(data))
+                if data:
+                    capture.write(data)
+                    if callback is not None:
+                        text = decoder.decode(data)
+                        if text:
+                            callback(text)
+
+            if got >= chunk_size:
+                continue
+            if rc_line.strip():
+                exit_code = int(rc_line)
+                if got == 0:
+                    break
+                continue
+            time.sleep(poll_interval)
+    finally:
+        for capture, callback, decoder in streams:
+            tail = decoder.decode(b"", final=True)
+            if tail and callback is not None:
+                callback(tail)
+            capture.close()
+        try:
+            sbx.commands.run(f"rm -rf {work_dir}")
+        except Exception:
+            pass
+
+    bounded = BoundedResult(exit_code, stdout, stderr, time.perf_counter() - start)
+    if check and exit_code != 0:
+        raise ShellCommandError(cmd, CommandOutput(stdout.text(), stderr.text(), exit_code, bounded.duration))
+    return bounded
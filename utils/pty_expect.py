@@ -0,0 +1,250 @@
+"""
+expect 风格的 PTY 驱动 - 用模式等待代替固定 sleep，输出一匹配就返回
+
+后台线程通过 handle.wait(on_pty=...) 接收 PTY 输出，增量解码后追加到缓冲区；
+expect 只在新数据到达时重新匹配未消费的部分，匹配成功后消费到匹配结束位置。
+"""
+import codecs
+import re
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Pattern, Union
+
+from ucloud_sandbox import PtySize, Sandbox
+
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_SIZE = PtySize(rows=24, cols=80)
+
+# bash 默认提示符: 以 "$ " 或 "# " 结尾 (前面可能有颜色控制序列)
+DEFAULT_PROMPT = r"[$#] (?:\x1b\[[0-9;]*m)*$"
+
+PatternLike = Union[str, Pattern]
+
+
+class ExpectTimeout(TimeoutError):
+    """在超时时间内没有匹配到模式"""
+
+    def __init__(self, patterns: List[Pattern], timeout: float, buffer: str):
+        shown = ", ".join(repr(p.pattern) for p in patterns)
+        super().__init__(f"{timeout}s 内未匹配 {shown}，缓冲区末尾: {buffer[-200:]!r}")
+        self.patterns = patterns
+        self.buffer = buffer
+
+
+class PtyClosedError(EOFError):
+    """PTY 进程已退出，且剩余输出中没有匹配"""
+
+
+class PtyDriver:
+    """
+    expect 风格的 PTY 驱动
+
+    Args:
+        sbx: 目标沙箱
+        size: 终端大小
+        cwd / envs: 传给 sbx.pty.create
+        handle: 已创建的 PTY 句柄，指定时不再新建
+        timeout: expect 的默认超时时间 (秒)
+        on_output: 每块输出 (bytes) 的回调，在接收线程中调用
+        on_input: 每次发送输入 (bytes) 的回调，在调用方线程中调用
+        pty_timeout: 传给 sbx.pty.create 的 timeout，默认 0 (不限时)；SDK 默认的 60 秒会在一分钟后关闭终端
+        kwargs: 传给 sbx.pty.create 的其他参数，如 user
+
+    Example:
+        with PtyDriver(sbx) as pty:
+            pty.setup_prompt()
+            print(pty.run("ls -la"))
+            pty.sendline("python3")
+            pty.expect(r">>> ")
+    """
+
+    def __init__(
+        self,
+        sbx: Sandbox,
+        size: PtySize = DEFAULT_SIZE,
+        cwd: Optional[str] = None,
+        envs: Optional[Dict[str, str]] = None,
+        handle=None,
+        timeout: float = DEFAULT_TIMEOUT,
+        on_output: Optional[Callable[[bytes], None]] = None,
+        on_input: Optional[Callable[[bytes], None]] = None,
+        pty_timeout: float = 0,
+        **kwargs,
+    ):
+        self.sbx = sbx
+        self.timeout = timeout
+        self.prompt: Pattern = re.compile(DEFAULT_PROMPT)
+        self.echo = True
+        self.on_output = on_output
+        self.on_input = on_input
+
+        # 最近一次 expect 的结果: 匹配前的文本、匹配对象和匹配的模式序号
+        self.before = ""
+        self.match: Optional[re.Match] = None
+        self.match_index: Optional[int] = None
+
+        self._buffer = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        if handle is None:
+            kwargs["timeout"] = pty_timeout
+            if cwd is not None:
+                kwargs["cwd"] = cwd
+            if envs:
+                kwargs["envs"] = envs
+            handle = sbx.pty.create(size=size, **kwargs)
+        self._handle = handle
+        self.pid = handle.pid
+        self._thread = threading.Thread(target=self._wait, daemon=True, name=f"pty-driver-{self.pid}")
+        self._thread.start()
+
+    def _on_pty(self, data: bytes):
+        if self.on_output is not None:
+            self.on_output(data)
+        text = self._decoder.decode(data)
+        if text:
+            with self._cond:
+                self._buffer += text
+                self._cond.notify_all()
+
+    def _wait(self):
+        """后台线程: 接收 PTY 输出直到进程退出"""
+        try:
+            self._handle.wait(on_pty=self._on_pty)
+        except Exception as e:
+            # PTY 内的 shell 以非 0 退出码结束也会抛出，只记录不处理
+            self._error = e
+        finally:
+            with self._cond:
+                self._buffer += self._decoder.decode(b"", final=True)
+                self._closed = True
+                self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def buffer(self) -> str:
+        """尚未被 expect 消费的输出"""
+        with self._cond:
+            return self._buffer
+
+    def send(self, data: Union[str, bytes]):
+        if isinstance(data, str):
+            data = data.encode()
+        if self.on_input is not None:
+            self.on_input(data)
+        self.sbx.pty.send_stdin(self.pid, data)
+
+    def sendline(self, line: str = ""):
+        self.send(line + "\n")
+
+    def sendcontrol(self, char: str):
+        """发送控制字符，例如 sendcontrol("c") 发送 Ctrl-C"""
+        self.send(bytes([ord(char.lower()) - ord("a") + 1]))
+
+    def expect(
+        self,
+        pattern: Union[PatternLike, List[PatternLike]],
+        timeout: Optional[float] = None,
+    ) -> re.Match:
+        """
+        等待输出匹配 pattern (正则，或正则列表中的任意一个)
+
+        匹配成功后 before 为匹配之前的文本，match_index 为匹配的模式序号，
+        缓冲区消费到匹配结束位置。多个模式同时匹配时取位置最靠前的。
+
+        Raises:
+            ExpectTimeout: 超时未匹配
+            PtyClosedError: PTY 已退出且剩余输出不匹配
+        """
+        patterns = [re.compile(p) if isinstance(p, str) else p for p in (
+            pattern if isinstance(pattern, list) else [pattern]
+        )]
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                best = None
+                for index, regex in enumerate(patterns):
+                    match = regex.search(self._buffer)
+                    if match and (best is None or match.start() < best[1].start()):
+                        best = (index, match)
+                if best is not None:
+                    self.match_index, self.match = best
+                    self.before = self._buffer[:self.match.start()]
+                    self._buffer = self._buffer[self.match.end():]
+                    return self.match
+                if self._closed:
+                    raise PtyClosedError(f"PTY {self.pid} 已退出: {self._error or ''}")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ExpectTimeout(patterns, timeout, self._buffer)
+                self._cond.wait(remaining)
+
+    def expect_exact(self, text: str, timeout: Optional[float] = None) -> re.Match:
+        return self.expect(re.escape(text), timeout)
+
+    def expect_prompt(self, timeout: Optional[float] = None) -> str:
+        """等待提示符出现，返回提示符之前的输出"""
+        self.expect(self.prompt, timeout)
+        return self.before
+
+    def setup_prompt(self, echo: bool = False, timeout: Optional[float] = None, marker: Optional[str] = None):
+        """
+        把 shell 提示符设为唯一标记，之后 expect_prompt 不会误匹配命令输出
+
+        Args:
+            echo: 是否保留终端回显，关闭后 run 的输出不包含命令本身
+            marker: 提示符标记，默认随机生成；回放录像时需固定为录制时的值
+        """
+        marker = marker or f"__PTY_{uuid.uuid4().hex[:8]}__"
+        # 拆开引号，使回显的命令本身不匹配提示符
+        quoted = f"'{marker[:6]}''{marker[6:]}> '"
+        stty = "stty echo" if echo else "stty -echo"
+        # 关闭 readline 行编辑: 不再输出 bracketed paste 等控制序列，回显只由终端设置决定
+        self.sendline(f"set +o emacs +o vi; {stty}; PS1={quoted}; PS2=''; unset PROMPT_COMMAND")
+        self.prompt = re.compile(re.escape(f"{marker}> "))
+        self.echo = echo
+        self.expect_prompt(timeout)
+
+    def run(self, cmd: str, timeout: Optional[float] = None) -> str:
+        """
+        发送一行命令并等待提示符，返回命令输出 (换行统一为 \\n)
+
+        需要先调用 setup_prompt。
+        """
+        self.sendline(cmd)
+        output = self.expect_prompt(timeout).replace("\r\n", "\n")
+        if self.echo:
+            # 去掉回显的命令行
+            output = output.split("\n", 1)[1] if "\n" in output else ""
+        return output
+
+    def wait_closed(self, timeout: Optional[float] = None) -> bool:
+        """等待 PTY 进程退出，返回是否已退出"""
+        timeout = self.timeout if timeout is None else timeout
+        with self._cond:
+            return self._cond.wait_for(lambda: self._closed, timeout)
+
+    def close(self, timeout: float = 5):
+        """结束 PTY 进程"""
+        if not self._closed:
+            try:
+                self.sbx.pty.kill(self.pid)
+            except Exception:
+                pass
+        self._thread.join(timeout=timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,330 @@
+"""
+多 PTY 复用 - 在一个事件循环中驱动同一沙箱或多个沙箱的大量 PTY，不需要每个 PTY 一个接收线程
+
+每个 PTY 的输出进入按字节计的有界缓冲区。缓冲区满时 on_data 回调挂起，SDK 停止从该 PTY 的流中读取，
+背压经由传输层传回沙箱，其他 PTY 不受影响。接收端每收到 quantum 字节主动让出事件循环，
+PtyManager 迭代时按轮询顺序每次从一个 PTY 取最多 quantum 字节，输出多的 PTY 不会饿死输出少的 PTY。
+"""
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from ucloud_sandbox import AsyncSandbox, PtySize
+
+
+DEFAULT_SIZE = PtySize(rows=24, cols=80)
+# 每个 PTY 最多缓冲的输出字节数
+DEFAULT_MAX_BUFFER = 1024 * 1024
+# 接收端连续处理或迭代时一次取出的字节数上限
+DEFAULT_QUANTUM = 64 * 1024
+
+
+class AsyncPty:
+    """
+    PtyManager 管理的一个 PTY
+
+    输出可以用 read() / async for 逐个 PTY 读取，也可以通过 PtyManager 的 async for 统一读取，
+    同一个 PTY 不要同时使用两种方式。
+    """
+
+    def __init__(self, manager: "PtyManager", sbx: AsyncSandbox, key: Optional[str] = None):
+        self.sbx = sbx
+        self.key = key
+        self.pid: Optional[int] = None
+        self.handle = None
+        self.exit_code: Optional[int] = None
+        self.error: Optional[BaseException] = None
+
+        # 统计
+        self.bytes_received = 0
+        self.bytes_read = 0
+        self.max_buffered = 0
+        self.pauses = 0
+        self.paused_seconds = 0.0
+
+        self._manager = manager
+        self._chunks: Deque[bytes] = deque()
+        self._buffered = 0
+        self._since_yield = 0
+        self._closed = False
+        # 缓冲区有数据或 PTY 已退出
+        self._readable = asyncio.Event()
+        # 缓冲区低于上限
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._exited: Optional[asyncio.Task] = None
+
+    @property
+    def buffered(self) -> int:
+        return self._buffered
+
+    @property
+    def closed(self) -> bool:
+        """PTY 已退出 (缓冲区中可能还有未读取的输出)"""
+        return self._closed
+
+    async def _on_data(self, data: bytes):
+        """SDK 的 on_data 回调，在 PTY 的事件任务中执行"""
+        if self._buffered >= self._manager.max_buffer:
+            # 背压: 挂起回调，SDK 在此期间不再读取该 PTY 的流
+            self.pauses += 1
+            start = time.perf_counter()
+            await self._writable.wait()
+            self.paused_seconds += time.perf_counter() - start
+
+        self._push(data)
+
+        self._since_yield += len(data)
+        if self._since_yield >= self._manager.quantum:
+            # 流中已缓冲的数据不需要等待，不主动让出时一个 PTY 可以连续占用事件循环
+            self._since_yield = 0
+            await asyncio.sleep(0)
+
+    def _push(self, data: bytes):
+        self._chunks.append(data)
+        self._buffered += len(data)
+        self.bytes_received += len(data)
+        if self._buffered > self.max_buffered:
+            self.max_buffered = self._buffered
+        if self._buffered >= self._manager.max_buffer:
+            self._writable.clear()
+        if not self._readable.is_set():
+            self._readable.set()
+            self._manager._mark_ready(self)
+
+    def _take(self, limit: int) -> bytes:
+        """取出最多 limit 字节 (至少一个块)"""
+        parts = [self._chunks.popleft()]
+        size = len(parts[0])
+        while self._chunks and size + len(self._chunks[0]) <= limit:
+            chunk = self._chunks.popleft()
+            parts.append(chunk)
+            size += len(chunk)
+        self._buffered -= size
+        self.bytes_read += size
+        if self._buffered < self._manager.max_buffer:
+            self._writable.set()
+        if not self._chunks and not self._closed:
+            self._readable.clear()
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    async def _watch_exit(self):
+        try:
+            result = await self.handle.wait()
+            self.exit_code = result.exit_code
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.exit_code = getattr(e, "exit_code", None)
+            if self.exit_code is None:
+                self.error = e
+        finally:
+            self._closed = True
+            self._writable.set()
+            if not self._readable.is_set():
+                self._readable.set()
+                self._manager._mark_ready(self)
+
+    async def read(self, limit: Optional[int] = None) -> bytes:
+        """等待并返回下一段输出 (最多 limit 字节，默认 quantum)，PTY 退出且输出已读完时返回空字节串"""
+        await self._readable.wait()
+        if not self._chunks:
+            return b""
+        return self._take(limit or self._manager.quantum)
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self
+
+    async def __anext__(self) -> bytes:
+        data = await self.read()
+        if not data:
+            raise StopAsyncIteration
+        return data
+
+    async def send(self, data):
+        """发送输入，str 按 UTF-8 编码"""
+        if isinstance(data, str):
+            data = data.encode()
+        await self.sbx.pty.send_stdin(self.pid, data)
+
+    async def sendline(self, line: str = ""):
+        await self.send(line + "\n")
+
+    async def resize(self, size: PtySize):
+        await self.sbx.pty.resize(self.pid, size)
+
+    async def kill(self) -> bool:
+        return await self.sbx.pty.kill(self.pid)
+
+    async def wait(self) -> Optional[int]:
+        """等待 PTY 退出，返回退出码"""
+        await asyncio.shield(self._exited)
+        return self.exit_code
+
+    def __repr__(self):
+        return f"AsyncPty(key={self.key!r}, pid={self.pid}, buffered={self._buffered}, closed={self._closed})"
+
+
+class PtyManager:
+    """
+    在一个事件循环中管理多个沙箱的多个 PTY
+
+    Args:
+        max_buffer: 每个 PTY 最多缓冲的输出字节数，超过后暂停读取该 PTY
+        quantum: 每个 PTY 连续接收多少字节后让出事件循环，也是迭代时一次取出的字节数上限
+
+    Example:
+        async with PtyManager() as manager:
+            for sbx in sandboxes:
+                for _ in range(20):
+                    pty = await manager.create(sbx)
+                    await pty.sendline("top -b")
+            async for pty, data in manager:
+                if not data:
+                    print(pty.key, "exited", pty.exit_code)
+                    continue
+                ...
+    """
+
+    def __init__(self, max_buffer: int = DEFAULT_MAX_BUFFER, quantum: int = DEFAULT_QUANTUM):
+        self.max_buffer = max_buffer
+        self.quantum = quantum
+        self.ptys: Dict[str, AsyncPty] = {}
+        self._ready: Deque[AsyncPty] = deque()
+        self._ready_event = asyncio.Event()
+        # 首次调用 next 之后才维护轮询队列，只用 AsyncPty.read 读取时队列不会增长
+        self._iterating = False
+        self._closing = False
+        # 已移除的 PTY 的累计统计
+        self._retired = {"exited": 0, "bytes_received": 0, "max_buffered": 0, "pauses": 0, "paused_seconds": 0.0}
+
+    async def create(
+        self,
+        sbx: AsyncSandbox,
+        size: PtySize = DEFAULT_SIZE,
+        key: Optional[str] = None,
+        **kwargs,
+    ) -> AsyncPty:
+        """
+        在 sbx 中创建 PTY 并开始接收输出
+
+        Args:
+            key: PTY 的名称，默认为 "沙箱 ID:pid"
+            kwargs: 传给 sbx.pty.create 的 cwd / envs / user / timeout，timeout 默认 0 (不限时)
+        """
+        if key is not None and key in self.ptys:
+            raise ValueError(f"PTY 名称重复: {key}")
+        kwargs.setdefault("timeout", 0)
+        pty = AsyncPty(self, sbx, key)
+        pty.handle = await sbx.pty.create(size=size, on_data=pty._on_data, **kwargs)
+        pty.pid = pty.handle.pid
+        if pty.key is None:
+            pty.key = f"{sbx.sandbox_id}:{pty.pid}"
+        self.ptys[pty.key] = pty
+        pty._exited = asyncio.create_task(pty._watch_exit())
+        return pty
+
+    def _mark_ready(self, pty: AsyncPty):
+        if self._iterating:
+            self._ready.append(pty)
+            self._ready_event.set()
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Tuple[AsyncPty, bytes]]:
+        """
+        按轮询顺序返回下一个有输出的 PTY 及最多 quantum 字节的输出
+
+        PTY 退出且输出读完时返回一次 (pty, b"") 并从 ptys 中移除；
+        超时、没有未退出的 PTY 或 close 后返回 None。
+        """
+        if not self._iterating:
+            self._iterating = True
+            self._ready.extend(p for p in self.ptys.values() if p._readable.is_set())
+
+        while True:
+            while not self._ready:
+                # 已退出但未通知的 PTY 一定在轮询队列中
+                if self._closing or all(p.closed for p in self.ptys.values()):
+                    return None
+                self._ready_event.clear()
+                try:
+                    await asyncio.wait_for(self._ready_event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return None
+            pty = self._ready.popleft()
+            if pty._chunks or pty.closed:
+                break
+
+        if not pty._chunks:
+            # 已退出且输出读完
+            self._retire(pty)
+            return pty, b""
+        data = pty._take(self.quantum)
+        if pty._readable.is_set():
+            # 还有剩余输出或待通知的退出: 排到队尾，等其他 PTY 各取一次后再轮到
+            self._ready.append(pty)
+        return pty, data
+
+    def __aiter__(self) -> AsyncIterator[Tuple[AsyncPty, bytes]]:
+        return self
+
+    async def __anext__(self) -> Tuple[AsyncPty, bytes]:
+        item = await self.next()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+    def _retire(self, pty: AsyncPty):
+        if self.ptys.pop(pty.key, None) is None:
+            return
+        retired = self._retired
+        retired["exited"] += 1
+        retired["bytes_received"] += pty.bytes_received
+        retired["max_buffered"] = max(retired["max_buffered"], pty.max_buffered)
+        retired["pauses"] += pty.pauses
+        retired["paused_seconds"] += pty.paused_seconds
+
+    def stats(self) -> dict:
+        """缓冲与背压统计 (包含已退出的 PTY)，便于打印或写入 JSON"""
+        ptys = list(self.ptys.values())
+        retired = self._retired
+        return {
+            "ptys": len(ptys),
+            "exited": retired["exited"],
+            "buffered": sum(p.buffered for p in ptys),
+            "max_buffered": max([retired["max_buffered"]] + [p.max_buffered for p in ptys]),
+            "bytes_received": retired["bytes_received"] + sum(p.bytes_received for p in ptys),
+            "pauses": retired["pauses"] + sum(p.pauses for p in ptys),
+            "paused_seconds": retired["paused_seconds"] + sum(p.paused_seconds for p in ptys),
+        }
+
+    async def close(self):
+        """结束所有 PTY 并唤醒等待中的迭代"""
+        self._closing = True
+        self._ready_event.set()
+        ptys = list(self.ptys.values())
+        for pty in ptys:
+            # 唤醒因背压挂起的回调，让 SDK 能收到结束事件
+            pty._writable.set()
+        await asyncio.gather(*(self._kill(pty) for pty in ptys))
+        for pty in ptys:
+            self._retire(pty)
+
+    @staticmethod
+    async def _kill(pty: AsyncPty, timeout: float = 5):
+        if not pty.closed:
+            try:
+                await pty.kill()
+            except Exception:
+                pass
+        done, _ = await asyncio.wait([pty._exited], timeout=timeout)
+        if not done:
+            # 没有按时收到结束事件: 断开输出流
+            await pty.handle.disconnect()
+            await asyncio.gather(pty._exited, return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -0,0 +1,378 @@
+"""
+PTY 会话录制与回放 - asciicast v2 格式 (asciinema 可直接播放)
+
+录制时调用方线程只把 (时间, 类型, 数据) 放入队列，解码、JSON 编码和写文件都在后台写线程中完成，
+不会阻塞 PTY 接收线程。回放可以按指定倍速把输出送给 VT 屏幕模型，或者通过 ReplaySandbox
+作为假 PTY 供 PtyDriver 离线驱动，用于回归测试。
+"""
+import codecs
+import gzip
+import json
+import queue
+import threading
+import time
+from json.encoder import encode_basestring
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from ucloud_sandbox import PtySize
+
+
+# 事件类型: 输出、输入、调整大小、标记
+OUTPUT = "o"
+INPUT = "i"
+RESIZE = "r"
+MARKER = "m"
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+# 同一批次内间隔小于该值的连续输出合并为一个事件
+DEFAULT_MERGE_WINDOW = 0.005
+
+_STOP = object()
+
+
+def _open(path: str, mode: str):
+    """.gz 结尾的文件按 gzip 读写"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8", buffering=1024 * 1024)
+
+
+class PtyRecorder:
+    """
+    asciicast v2 录制器
+
+    output / input / resize / marker 可以在任意线程调用，只做一次入队。
+    写线程按 flush_interval 刷新文件，close 时写完队列中剩余的事件。
+
+    Args:
+        path: 输出文件路径，以 .gz 结尾时 gzip 压缩
+        width / height: 终端大小 (列数 / 行数)
+        title: 录像标题
+        env: 写入文件头的环境变量，例如 {"TERM": "xterm-256color", "SHELL": "/bin/bash"}
+        record_input: 是否记录输入事件
+        flush_interval: 刷新文件的间隔 (秒)
+        merge_window: 合并连续输出事件的时间窗口 (秒)，0 表示不合并
+
+    Example:
+        recorder = PtyRecorder("session.cast", 80, 24)
+        pty = PtyDriver(sbx, on_output=recorder.output, on_input=recorder.input)
+        ...
+        recorder.close()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        width: int,
+        height: int,
+        title: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        record_input: bool = True,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        merge_window: float = DEFAULT_MERGE_WINDOW,
+    ):
+        self.path = path
+        self.record_input = record_input
+        self.flush_interval = flush_interval
+        self.merge_window = merge_window
+
+        self.events = 0
+        self.bytes_recorded = 0
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._start = time.monotonic()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        header = {"version": 2, "width": width, "height": height, "timestamp": int(time.time())}
+        if title:
+            header["title"] = title
+        if env:
+            header["env"] = env
+        self._file = _open(path, "w")
+        self._file.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+        self._thread = threading.Thread(target=self._write_loop, daemon=True, name="pty-recorder")
+        self._thread.start()
+
+    @classmethod
+    def for_size(cls, path: str, size: PtySize, **kwargs) -> "PtyRecorder":
+        return cls(path, size.cols, size.rows, **kwargs)
+
+    # ---- 调用方线程: 只入队 ----
+
+    def output(self, data: bytes):
+        self._queue.put((time.monotonic() - self._start, OUTPUT, data))
+
+    def input(self, data: Union[str, bytes]):
+        if self.record_input:
+            self._queue.put((time.monotonic() - self._start, INPUT, data))
+
+    def resize(self, size: Union[PtySize, Tuple[int, int]]):
+        """记录调整大小，size 为 PtySize 或 (cols, rows)"""
+        cols, rows = (size.cols, size.rows) if isinstance(size, PtySize) else size
+        self._queue.put((time.monotonic() - self._start, RESIZE, f"{cols}x{rows}"))
+
+    def marker(self, label: str = ""):
+        self._queue.put((time.monotonic() - self._start, MARKER, label))
+
+    # ---- 写线程 ----
+
+    def _write_loop(self):
+        decoders = {
+            OUTPUT: codecs.getincrementaldecoder("utf-8")(errors="replace"),
+            INPUT: codecs.getincrementaldecoder("utf-8")(errors="replace"),
+        }
+        last_flush = time.monotonic()
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = None
+                batch = []
+                while item is not None:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                self._write_batch(batch, decoders)
+
+                now = time.monotonic()
+                if stopping or now - last_flush >= self.flush_interval:
+                    self._file.flush()
+                    last_flush = now
+        except Exception as e:
+            self._error = e
+        finally:
+            self._file.close()
+
+    def _write_batch(self, batch: List[tuple], decoders: Dict[str, codecs.IncrementalDecoder]):
+        pending = None  # 待合并的输出事件 [time, [text, ...]]
+        for timestamp, kind, data in batch:
+            if isinstance(data, bytes):
+                self.bytes_recorded += len(data)
+                data = decoders[kind].decode(data)
+                if not data:
+                    continue
+            if kind == OUTPUT and pending is not None and timestamp - pending[0] <= self.merge_window:
+                pending[1].append(data)
+                continue
+            if pending is not None:
+                self._write_event(pending[0], OUTPUT, "".join(pending[1]))
+                pending = None
+            if kind == OUTPUT:
+                pending = [timestamp, [data]]
+            else:
+                self._write_event(timestamp, kind, data)
+        if pending is not None:
+            self._write_event(pending[0], OUTPUT, "".join(pending[1]))
+
+    def _write_event(self, timestamp: float, kind: str, data: str):
+        # 分段写入缓冲区，避免为大块输出再拼接一次整行
+        write = self._file.write
+        write(f'[{timestamp:.6f}, "{kind}", ')
+        write(encode_basestring(data))
+        write("]\n")
+        self.events += 1
+
+    def close(self, timeout: Optional[float] = None):
+        """写完剩余事件并关闭文件"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Recording:
+    """读取的录像: header 为文件头，events 为 (时间, 类型, 数据) 列表"""
+
+    def __init__(self, header: dict, events: List[Tuple[float, str, str]]):
+        self.header = header
+        self.events = events
+
+    @property
+    def width(self) -> int:
+        return self.header["width"]
+
+    @property
+    def height(self) -> int:
+        return self.header["height"]
+
+    @property
+    def duration(self) -> float:
+        return self.events[-1][0] if self.events else 0.0
+
+    def output(self) -> str:
+        """所有输出拼接后的文本"""
+        return "".join(data for _, kind, data in self.events if kind == OUTPUT)
+
+
+def load_recording(path: str) -> Recording:
+    with _open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != 2:
+            raise ValueError(f"不支持的 asciicast 版本: {header.get('version')}")
+        events = [tuple(json.loads(line)) for line in f if line.strip()]
+    return Recording(header, events)
+
+
+def iter_timed(
+    events: List[Tuple[float, str, str]],
+    speed: float = 1.0,
+    max_idle: Optional[float] = None,
+) -> Iterator[Tuple[float, str, str]]:
+    """
+    按录制时的节奏逐个返回事件
+
+    Args:
+        speed: 回放倍速，0 表示不等待
+        max_idle: 两个事件之间最长等待 (录制时间，秒)，超过时压缩为 max_idle
+    """
+    start = time.monotonic()
+    elapsed = 0.0
+    previous = 0.0
+    for event in events:
+        gap = event[0] - previous
+        previous = event[0]
+        if max_idle is not None:
+            gap = min(gap, max_idle)
+        elapsed += gap
+        if speed > 0:
+            delay = start + elapsed / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        yield event
+
+
+def replay(
+    recording: Union[str, Recording],
+    target: Union[Callable[[str], None], object],
+    speed: float = 0,
+    max_idle: Optional[float] = None,
+) -> Recording:
+    """
+    把录像的输出送给 target
+
+    Args:
+        recording: 录像文件路径或 Recording
+        target: 接收输出文本的函数，或带 feed / resize 方法的对象 (例如 vt_screen.Screen)
+        speed: 回放倍速，默认 0 表示不等待
+        max_idle: 两个事件之间最长等待 (秒)
+
+    Returns:
+        Recording
+    """
+    if isinstance(recording, str):
+        recording = load_recording(recording)
+    feed = getattr(target, "feed", target)
+    resize = getattr(target, "resize", None)
+    for _, kind, data in iter_timed(recording.events, speed, max_idle):
+        if kind == OUTPUT:
+            feed(data)
+        elif kind == RESIZE and resize is not None:
+            cols, rows = (int(v) for v in data.split("x"))
+            resize(rows, cols)
+    return recording
+
+
+class _ReplayHandle:
+    """与 sbx.pty.create 返回的句柄接口一致的回放句柄"""
+
+    def __init__(self, pty: "_ReplayPty", pid: int):
+        self._pty = pty
+        self.pid = pid
+
+    def wait(self, on_pty: Optional[Callable[[bytes], None]] = None, **kwargs):
+        self._pty._play(on_pty)
+
+
+class _ReplayPty:
+    def __init__(self, sandbox: "ReplaySandbox"):
+        self._sandbox = sandbox
+        self._cond = threading.Condition()
+        self._inputs_sent = 0
+        self._killed = False
+        self.sent: List[bytes] = []
+
+    def create(self, size: Optional[PtySize] = None, **kwargs) -> _ReplayHandle:
+        return _ReplayHandle(self, self._sandbox.pid)
+
+    def send_stdin(self, pid: int, data: bytes):
+        with self._cond:
+            self.sent.append(data)
+            self._inputs_sent += 1
+            self._cond.notify_all()
+
+    def resize(self, pid: int, size: PtySize):
+        pass
+
+    def kill(self, pid: int) -> bool:
+        with self._cond:
+            killed, self._killed = self._killed, True
+            self._cond.notify_all()
+        return not killed
+
+    def _play(self, on_pty: Optional[Callable[[bytes], None]]):
+        sandbox = self._sandbox
+        inputs_seen = 0
+        for _, kind, data in iter_timed(sandbox.recording.events, sandbox.speed, sandbox.max_idle):
+            if self._killed:
+                return
+            if kind == INPUT and sandbox.wait_for_input:
+                # 录制时这里有一次输入: 等调用方真正发送输入后再继续回放后面的输出
+                inputs_seen += 1
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: self._killed or self._inputs_sent >= inputs_seen,
+                        sandbox.input_timeout,
+                    )
+            elif kind == OUTPUT and on_pty is not None:
+                on_pty(data.encode())
+
+
+class ReplaySandbox:
+    """
+    假沙箱: sbx.pty 按录像回放输出，用于离线回归测试
+
+    wait_for_input 为 True 时，录像中每个输入事件之后的输出要等调用方发送输入才继续回放，
+    回放节奏与调用方的交互保持一致 (录像中的一个输入事件对应调用方的一次 send_stdin)。
+    调用方发送的输入记录在 sbx.pty.sent 中。
+
+    录制时 setup_prompt 使用随机标记，回放时需传入录制时的 marker，否则提示符无法匹配。
+
+    Example:
+        sbx = ReplaySandbox("session.cast")
+        with PtyDriver(sbx) as pty:
+            pty.setup_prompt(marker="__PTY_TEST__")
+            assert "README.md" in pty.run("ls")
+    """
+
+    def __init__(
+        self,
+        recording: Union[str, Recording],
+        speed: float = 0,
+        max_idle: Optional[float] = None,
+        wait_for_input: bool = True,
+        input_timeout: Optional[float] = 30,
+    ):
+        self.recording = load_recording(recording) if isinstance(recording, str) else recording
+        self.speed = speed
+        self.max_idle = max_idle
+        self.wait_for_input = wait_for_input
+        self.input_timeout = input_timeout
+        self.pid = 1
+        self.pty = _ReplayPty(self)
@@ -0,0 +1,336 @@
+"""
+沙箱文件读取缓存 - 同一模板的多个沙箱重复读取相同参考文件时，从本地磁盘按内容哈希命中
+"""
+import hashlib
+import json
+import os
+import shlex
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from ucloud_sandbox import Sandbox
+
+
+# 校验模式，从最少到最多的远程调用
+TRUST = "trust"    # 信任模板不可变: 模板 ID + 路径命中即返回，不访问沙箱
+STAT = "stat"      # 每次读取前 files.get_info，按大小 + 修改时间判断是否变化
+HASH = "hash"      # 每次读取前在沙箱内计算 sha256，按内容哈希命中 (可跨模板共享)
+VALIDATION_MODES = (TRUST, STAT, HASH)
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "sandbox_read_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+INDEX_FILE = "index.json"
+
+# 未命中后至少间隔多久才把索引写回磁盘 (秒)，避免每次未命中都重写整个索引
+DEFAULT_SAVE_INTERVAL = 5.0
+
+
+class CacheStats:
+    """读取缓存统计信息 (命中率、节省的下载字节数、校验调用次数)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.validations = 0
+        self.bytes_from_cache = 0
+        self.bytes_downloaded = 0
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self) -> dict:
+        """导出统计信息，便于打印或写入 JSON"""
+        with self._lock:
+            reads = self.hits + self.misses
+            return {
+                "reads": reads,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / reads if reads else 0.0,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "validations": self.validations,
+                "bytes_from_cache": self.bytes_from_cache,
+                "bytes_downloaded": self.bytes_downloaded,
+            }
+
+
+class ReadCache:
+    """
+    内容寻址的本地读取缓存
+
+    文件内容按 sha256 存放在 cache_dir/blobs 下，索引把 "模板 ID + 路径" 映射到内容哈希
+    和校验信息，相同内容只存一份；HASH 模式直接按沙箱内计算的哈希查找。
+    总大小超过 max_bytes 时按最近最少使用淘汰。索引保存在 cache_dir/index.json，
+    进程重启后仍可命中；未命中写入的新内容最多每 save_interval 秒写回一次索引，
+    close() 或退出 with 块时写回剩余修改。未写回就退出时，blobs 下的内容在下次加载时
+    重新计入大小 (不会绕过淘汰)，只是对应的索引项需要重新下载一次。
+
+    Args:
+        cache_dir: 本地缓存目录
+        max_bytes: 缓存内容总大小上限
+        validation: 校验模式，TRUST / STAT / HASH
+        save_interval: 两次自动写回索引的最小间隔 (秒)，0 表示每次修改都写回
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        validation: str = STAT,
+        save_interval: float = DEFAULT_SAVE_INTERVAL,
+    ):
+        if validation not in VALIDATION_MODES:
+            raise ValueError(f"validation 必须是 {VALIDATION_MODES} 之一: {validation!r}")
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.validation = validation
+        self.save_interval = save_interval
+        self.stats = CacheStats()
+
+        self._lock = threading.RLock()
+        # 串行化索引写回，保证后写入磁盘的总是较新的快照
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        # "模板 ID:路径" -> {"digest": 内容哈希, "version": 校验信息}
+        self._entries: Dict[str, dict] = {}
+        # 内容哈希 -> 大小，按最近使用排序 (末尾最新)
+        self._blobs: "OrderedDict[str, int]" = OrderedDict()
+        self._templates: Dict[str, str] = {}
+
+        os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(self._blobs.values())
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest)
+
+    def _load_index(self):
+        path = os.path.join(self.cache_dir, INDEX_FILE)
+        try:
+            with open(path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        for digest, size in index.get("blobs", []):
+            if os.path.exists(self._blob_path(digest)):
+                self._blobs[digest] = size
+        self._entries = {
+            key: entry for key, entry in index.get("entries", {}).items()
+            if entry.get("digest") in self._blobs
+        }
+        self._adopt_orphans()
+
+    def _adopt_orphans(self):
+        """索引中没有的内容文件 (上次退出前未写回) 作为最久未使用项计入总大小"""
+        blobs_dir = os.path.join(self.cache_dir, "blobs")
+        orphans = []
+        for prefix in os.listdir(blobs_dir):
+            prefix_dir = os.path.join(blobs_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name.endswith(".tmp") or name in self._blobs:
+                    continue
+                try:
+                    orphans.append((name, os.path.getsize(os.path.join(prefix_dir, name))))
+                except OSError:
+                    pass
+        if not orphans:
+            return
+        self._blobs = OrderedDict(orphans + list(self._blobs.items()))
+        self._dirty = True
+        self._evict()
+
+    def save(self):
+        """把索引原子地写回磁盘 (同目录下的唯一临时文件 + os.replace)"""
+        path = os.path.join(self.cache_dir, INDEX_FILE)
+        with self._save_lock:
+            with self._lock:
+                index = {"entries": dict(self._entries), "blobs": list(self._blobs.items())}
+                self._dirty = False
+                self._last_save = time.monotonic()
+            fd, tmp = tempfile.mkstemp(prefix=f"{INDEX_FILE}.", suffix=".tmp", dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(index, f)
+                os.replace(tmp, path)
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+
+    def flush(self):
+        """索引有未写回的修改时写回磁盘"""
+        if self._dirty:
+            self.save()
+
+    def _mark_dirty(self):
+        """记录索引已修改，距上次写回超过 save_interval 时才写回"""
+        with self._lock:
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.save()
+
+    def template_id(self, sbx: Sandbox) -> str:
+        """沙箱的模板 ID，每个沙箱只查询一次"""
+        with self._lock:
+            cached = self._templates.get(sbx.sandbox_id)
+        if cached is None:
+            cached = sbx.get_info().template_id
+            with self._lock:
+                self._templates[sbx.sandbox_id] = cached
+        return cached
+
+    def _cache_key(self, sbx: Sandbox, path: str):
+        """
+        按校验模式生成 (索引键, 版本)
+
+        HASH 模式的索引键就是内容哈希；STAT 模式的版本为 "大小:修改时间"，
+        与索引中记录的版本不一致时视为过期。
+        """
+        if self.validation == HASH:
+            self.stats.incr("validations")
+            result = sbx.commands.run(f"sha256sum {shlex.quote(path)}")
+            return result.stdout.split()[0], ""
+        key = f"{self.template_id(sbx)}:{path}"
+        version = ""
+        if self.validation == STAT:
+            self.stats.incr("validations")
+            info = sbx.files.get_info(path)
+            version = f"{info.size}:{info.modified_time}"
+        return key, version
+
+    def _lookup(self, key: str, version: str) -> Optional[bytes]:
+        with self._lock:
+            if self.validation == HASH:
+                digest = key
+            else:
+                entry = self._entries.get(key)
+                if entry is None:
+                    return None
+                if entry["version"] != version:
+                    self.stats.incr("stale")
+                    return None
+                digest = entry["digest"]
+            if digest not in self._blobs:
+                return None
+            self._blobs.move_to_end(digest)
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            # 缓存目录被外部清理，按未命中处理
+            with self._lock:
+                self._blobs.pop(digest, None)
+                self._dirty = True
+            return None
+
+    def _store(self, key: str, version: str, content: bytes):
+        if len(content) > self.max_bytes:
+            return
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=f"{digest}.", suffix=".tmp", dir=os.path.dirname(blob_path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, blob_path)
+
+        with self._lock:
+            if self.validation != HASH:
+                self._entries[key] = {"digest": digest, "version": version}
+            self._blobs[digest] = len(content)
+            self._blobs.move_to_end(digest)
+            self._evict()
+        self._mark_dirty()
+
+    def _evict(self):
+        total = sum(self._blobs.values())
+        while total > self.max_bytes and self._blobs:
+            digest, size = self._blobs.popitem(last=False)
+            total -= size
+            self._entries = {k: v for k, v in self._entries.items() if v["digest"] != digest}
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+            self.stats.incr("evictions")
+
+    def read(self, sbx: Sandbox, path: str, format: str = "text") -> Union[str, bytes]:
+        """
+        读取沙箱文件，命中时从本地缓存返回
+
+        Args:
+            sbx: 源沙箱
+            path: 沙箱中的文件路径
+            format: "text" 返回字符串，"bytes" 返回 bytes (与 files.read 一致)
+        """
+        if format not in ("text", "bytes"):
+            raise ValueError(f"format 必须是 'text' 或 'bytes': {format!r}")
+
+        key, version = self._cache_key(sbx, path)
+        content = self._lookup(key, version)
+        if content is not None:
+            self.stats.incr("hits")
+            self.stats.incr("bytes_from_cache", len(content))
+        else:
+            self.stats.incr("misses")
+            content = bytes(sbx.files.read(path, format="bytes"))
+            self.stats.incr("bytes_downloaded", len(content))
+            self._store(key, version, content)
+        return content.decode("utf-8") if format == "text" else content
+
+    def invalidate(self, template_id: Optional[str] = None, path: Optional[str] = None):
+        """删除匹配模板 ID 和/或路径的索引项 (不删除内容，由 LRU 回收)"""
+        with self._lock:
+            for key in list(self._entries):
+                key_template, _, key_path = key.partition(":")
+                if template_id is not None and key_template != template_id:
+                    continue
+                if path is not None and key_path != path:
+                    continue
+                del self._entries[key]
+        self.save()
+
+    def clear(self):
+        """清空缓存内容和索引"""
+        with self._lock:
+            for digest in list(self._blobs):
+                try:
+                    os.remove(self._blob_path(digest))
+                except OSError:
+                    pass
+            self._blobs.clear()
+            self._entries.clear()
+        self.save()
+
+    def close(self):
+        """写回未保存的索引修改"""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,550 @@
+"""
+沙箱预热池 - 预先创建沙箱并租借给调用方，摊薄 Sandbox.create 的耗时
+"""
+import asyncio
+import posixpath
+import queue
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Dict, Generator, List, Optional, Tuple
+
+from ucloud_sandbox import AsyncSandbox, Sandbox
+
+
+# 归还后的处理策略
+RESET = "reset"        # 清理临时目录后放回池中
+DISCARD = "discard"    # 销毁沙箱，后台创建新的补充
+
+DEFAULT_SCRATCH_PATHS = ("/home/user", "/tmp")
+
+# 单条 rm 命令包含的最大路径数，避免超过 ARG_MAX
+DELETE_BATCH = 500
+
+
+class BaselineChanged(Exception):
+    """预热时已存在的文件在租借期间被修改或删除，删除新增文件无法恢复，沙箱需要销毁"""
+
+
+def snapshot_command(scratch_paths) -> str:
+    """列出 scratch_paths 下所有条目，每个条目输出 "类型\t大小\t修改时间\t路径" 并以 NUL 结尾"""
+    paths = " ".join(shlex.quote(p) for p in scratch_paths)
+    return f"find {paths} -mindepth 1 -printf '%y\\t%s\\t%T@\\t%p\\0' 2>/dev/null; true"
+
+
+def parse_snapshot(output: str) -> Dict[str, Tuple[str, str, str]]:
+    """解析 snapshot_command 的输出为 {路径: (类型, 大小, 修改时间)}"""
+    entries = {}
+    for record in output.split("\0"):
+        if record:
+            kind, size, mtime, path = record.split("\t", 3)
+            entries[path] = (kind, size, mtime)
+    return entries
+
+
+def plan_reset(baseline: Dict[str, tuple], current: Dict[str, tuple]) -> List[str]:
+    """
+    对比预热时与归还时的快照，返回需要删除的新增条目 (新增目录下的子项由 rm -rf 一并删除，不再列出)
+
+    目录只比较类型: 其修改时间随子项的增删变化，子项本身另有记录。
+
+    Raises:
+        BaselineChanged: 预热时已存在的条目被修改、删除或改变类型
+    """
+    changed = [
+        path for path, (kind, size, mtime) in baseline.items()
+        if path not in current
+        or current[path][0] != kind
+        or (kind != "d" and current[path] != (kind, size, mtime))
+    ]
+    if changed:
+        raise BaselineChanged(f"{len(changed)} 个预热时已存在的条目被修改或删除: {sorted(changed)[:5]}")
+    added = {path for path in current if path not in baseline}
+    return sorted(path for path in added if posixpath.dirname(path) not in added)
+
+
+def delete_commands(paths: List[str]) -> List[str]:
+    """按 DELETE_BATCH 分批生成删除命令"""
+    return [
+        "rm -rf -- " + " ".join(shlex.quote(path) for path in paths[i:i + DELETE_BATCH])
+        for i in range(0, len(paths), DELETE_BATCH)
+    ]
+
+
+class PoolStats:
+    """沙箱池统计信息 (命中、未命中、等待耗时)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.resets = 0
+        self.discarded = 0
+        self.create_failures = 0
+        self.wait_times: List[float] = []
+
+    def record_lease(self, hit: bool, wait: float):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.wait_times.append(wait)
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self) -> dict:
+        """导出统计信息，便于打印或写入 JSON"""
+        with self._lock:
+            leases = self.hits + self.misses
+            waits = sorted(self.wait_times)
+            return {
+                "leases": leases,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / leases if leases else 0.0,
+                "created": self.created,
+                "resets": self.resets,
+                "discarded": self.discarded,
+                "create_failures": self.create_failures,
+                "wait_total": sum(waits),
+                "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                "wait_max": waits[-1] if waits else 0.0,
+            }
+
+
+class SandboxPool:
+    """
+    同步沙箱预热池
+
+    为每个模板在后台维持 size 个空闲沙箱。lease() 优先取空闲沙箱 (命中)，
+    池空时同步创建 (未命中)。归还时按 on_release 策略处理：
+    RESET 终止新启动的进程、删除 scratch_paths 下预热后新增的文件并放回池中；
+    预热时已存在的文件被修改或删除 (无法恢复) 或清理失败时退化为 DISCARD；
+    DISCARD 销毁沙箱并在后台补充新的沙箱。
+
+    Args:
+        size: 每个模板的目标空闲沙箱数
+        templates: 启动时立即预热的模板列表，None 表示默认模板
+        timeout: 沙箱存活时间 (秒)，租借时会刷新
+        on_release: 归还策略，RESET 或 DISCARD
+        scratch_paths: RESET 时需要清理的目录
+        max_workers: 后台创建/清理线程数
+        create_kwargs: 透传给 Sandbox.create 的其他参数
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        templates: Optional[List[Optional[str]]] = None,
+        timeout: int = 300,
+        on_release: str = RESET,
+        scratch_paths=DEFAULT_SCRATCH_PATHS,
+        max_workers: int = 4,
+        **create_kwargs,
+    ):
+        if on_release not in (RESET, DISCARD):
+            raise ValueError(f"on_release 必须是 {RESET!r} 或 {DISCARD!r}: {on_release!r}")
+
+        self.size = size
+        self.timeout = timeout
+        self.on_release = on_release
+        self.scratch_paths = tuple(scratch_paths)
+        self.create_kwargs = create_kwargs
+        self.stats = PoolStats()
+
+        self._idle: Dict[Optional[str], queue.Queue] = {}
+        self._baseline_pids: Dict[str, set] = {}
+        self._baseline_files: Dict[str, dict] = {}
+        self._pending: Dict[Optional[str], int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sandbox-pool")
+
+        for template in templates or [None]:
+            self.warm(template)
+
+    def _create(self, template: Optional[str]) -> Sandbox:
+        """创建沙箱并记录预热时的进程和文件快照"""
+        kwargs = dict(self.create_kwargs)
+        if template is not None:
+            kwargs["template"] = template
+        sbx = Sandbox.create(timeout=self.timeout, **kwargs)
+        try:
+            # 模板自带的常驻进程 (如 jupyter) 在 reset 时需要保留
+            self._baseline_pids[sbx.sandbox_id] = {p.pid for p in sbx.commands.list()}
+            snapshot = sbx.commands.run(snapshot_command(self.scratch_paths)).stdout
+            self._baseline_files[sbx.sandbox_id] = parse_snapshot(snapshot)
+        except Exception:
+            self._kill(sbx)
+            raise
+        self.stats.incr("created")
+        return sbx
+
+    def _kill(self, sbx: Sandbox):
+        self._baseline_pids.pop(sbx.sandbox_id, None)
+        self._baseline_files.pop(sbx.sandbox_id, None)
+        try:
+            sbx.kill()
+        except Exception:
+            pass
+
+    def _queue(self, template: Optional[str]) -> queue.Queue:
+        with self._lock:
+            if template not in self._idle:
+                self._idle[template] = queue.Queue()
+                self._pending[template] = 0
+            return self._idle[template]
+
+    def _put_idle(self, template: Optional[str], sbx: Sandbox):
+        if self._closed:
+            self._kill(sbx)
+        else:
+            self._queue(template).put(sbx)
+
+    def _fill_one(self, template: Optional[str]):
+        """后台任务: 创建一个沙箱放入池中"""
+        try:
+            if not self._closed:
+                self._put_idle(template, self._create(template))
+        except Exception as e:
+            self.stats.incr("create_failures")
+            print(f"⚠ 预热沙箱失败 (template={template}): {e}")
+        finally:
+            with self._lock:
+                self._pending[template] -= 1
+
+    def warm(self, template: Optional[str] = None):
+        """在后台补充沙箱，使空闲数 + 创建中数量达到 size"""
+        idle = self._queue(template)
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.size - idle.qsize() - self._pending[template]
+            self._pending[template] += max(missing, 0)
+        for _ in range(missing):
+            self._executor.submit(self._fill_one, template)
+
+    def _reset(self, sbx: Sandbox):
+        """终止残留进程并删除预热后新增的文件，预热时已有的文件被改动时抛出 BaselineChanged"""
+        baseline = self._baseline_pids.get(sbx.sandbox_id, set())
+        for process in sbx.commands.list():
+            if process.pid not in baseline:
+                sbx.commands.kill(process.pid)
+        current = parse_snapshot(sbx.commands.run(snapshot_command(self.scratch_paths)).stdout)
+        for command in delete_commands(plan_reset(self._baseline_files[sbx.sandbox_id], current)):
+            sbx.commands.run(command)
+
+    def _recycle(self, template: Optional[str], sbx: Sandbox):
+        """后台任务: 清理归还的沙箱，失败时销毁并补充"""
+        try:
+            self._reset(sbx)
+            self.stats.incr("resets")
+            self._put_idle(template, sbx)
+        except Exception as e:
+            print(f"⚠ 清理沙箱 {sbx.sandbox_id} 失败，改为销毁: {e}")
+            self._discard(template, sbx)
+
+    def _discard(self, template: Optional[str], sbx: Sandbox):
+        self._kill(sbx)
+        self.stats.incr("discarded")
+        self.warm(template)
+
+    def acquire(self, template: Optional[str] = None) -> Sandbox:
+        """从池中取出一个沙箱，池空时同步创建"""
+        if self._closed:
+            raise RuntimeError("沙箱池已关闭")
+
+        start = time.perf_counter()
+        idle = self._queue(template)
+        hit = True
+        sbx = None
+        while sbx is None:
+            try:
+                sbx = idle.get_nowait()
+            except queue.Empty:
+                hit = False
+                sbx = self._create(template)
+                break
+            try:
+                # 空闲期间可能已超时，刷新存活时间的同时确认沙箱仍可用
+                sbx.set_timeout(self.timeout)
+            except Exception:
+                self._discard(template, sbx)
+                sbx = None
+
+        self.stats.record_lease(hit, time.perf_counter() - start)
+        self.warm(template)
+        return sbx
+
+    def release(self, sbx: Sandbox, template: Optional[str] = None, discard: bool = False):
+        """归还沙箱，清理或销毁在后台进行"""
+        if self._closed:
+            self._kill(sbx)
+        elif discard or self.on_release == DISCARD:
+            self._executor.submit(self._discard, template, sbx)
+        else:
+            self._executor.submit(self._recycle, template, sbx)
+
+    @contextmanager
+    def lease(self, template: Optional[str] = None) -> Generator[Sandbox, None, None]:
+        """
+        租借一个沙箱，退出上下文时自动归还
+
+        测试抛出异常时沙箱状态不可信，直接销毁而不放回池中。
+        """
+        sbx = self.acquire(template)
+        try:
+            yield sbx
+        except BaseException:
+            self.release(sbx, template, discard=True)
+            raise
+        else:
+            self.release(sbx, template)
+
+    def close(self):
+        """停止补充并销毁所有空闲沙箱"""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        for idle in list(self._idle.values()):
+            while True:
+                try:
+                    self._kill(idle.get_nowait())
+                except queue.Empty:
+                    break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class AsyncSandboxPool:
+    """
+    异步沙箱预热池
+
+    与 SandboxPool 的策略相同，但全部基于 asyncio：预热通过 asyncio.gather 并发创建，
+    所有创建都受 max_concurrent_creates 信号量限制，避免触发平台的创建频率限制。
+
+    Args:
+        size: 每个模板的目标空闲沙箱数，租借后在后台补充到该数量
+        max_size: 空闲沙箱上限 (高水位)，归还时超过该数量的沙箱直接销毁
+        timeout: 沙箱存活时间 (秒)，租借时会刷新
+        on_release: 归还策略，RESET 或 DISCARD
+        scratch_paths: RESET 时需要清理的目录
+        max_concurrent_creates: 同时进行中的 AsyncSandbox.create 数量上限
+        create_kwargs: 透传给 AsyncSandbox.create 的其他参数
+
+    Example:
+        async with AsyncSandboxPool(size=8) as pool:
+            await pool.prewarm("base")
+            async with pool.lease(template="base") as sbx:
+                await sbx.commands.run("echo hello")
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_size: Optional[int] = None,
+        timeout: int = 300,
+        on_release: str = RESET,
+        scratch_paths=DEFAULT_SCRATCH_PATHS,
+        max_concurrent_creates: int = 4,
+        **create_kwargs,
+    ):
+        if on_release not in (RESET, DISCARD):
+            raise ValueError(f"on_release 必须是 {RESET!r} 或 {DISCARD!r}: {on_release!r}")
+        if max_size is not None and max_size < size:
+            raise ValueError(f"max_size ({max_size}) 不能小于 size ({size})")
+
+        self.size = size
+        self.max_size = max_size if max_size is not None else size
+        self.timeout = timeout
+        self.on_release = on_release
+        self.scratch_paths = tuple(scratch_paths)
+        self.create_kwargs = create_kwargs
+        self.stats = PoolStats()
+
+        self._idle: Dict[Optional[str], List[AsyncSandbox]] = {}
+        self._pending: Dict[Optional[str], int] = {}
+        self._baseline_pids: Dict[str, set] = {}
+        self._baseline_files: Dict[str, dict] = {}
+        self._create_semaphore = asyncio.Semaphore(max_concurrent_creates)
+        self._tasks: set = set()
+        self._closed = False
+
+    def _idle_list(self, template: Optional[str]) -> List[AsyncSandbox]:
+        if template not in self._idle:
+            self._idle[template] = []
+            self._pending[template] = 0
+        return self._idle[template]
+
+    def _spawn(self, coro):
+        """启动后台任务并保留引用，close() 时统一等待"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _create(self, template: Optional[str]) -> AsyncSandbox:
+        """在信号量限制下创建沙箱并记录预热时的进程和文件快照"""
+        kwargs = dict(self.create_kwargs)
+        if template is not None:
+            kwargs["template"] = template
+        async with self._create_semaphore:
+            sbx = await AsyncSandbox.create(timeout=self.timeout, **kwargs)
+        try:
+            # 模板自带的常驻进程 (如 jupyter) 在 reset 时需要保留
+            self._baseline_pids[sbx.sandbox_id] = {p.pid for p in await sbx.commands.list()}
+            snapshot = (await sbx.commands.run(snapshot_command(self.scratch_paths))).stdout
+            self._baseline_files[sbx.sandbox_id] = parse_snapshot(snapshot)
+        except Exception:
+            await self._kill(sbx)
+            raise
+        self.stats.incr("created")
+        return sbx
+
+    async def _kill(self, sbx: AsyncSandbox):
+        self._baseline_pids.pop(sbx.sandbox_id, None)
+        self._baseline_files.pop(sbx.sandbox_id, None)
+        try:
+            await sbx.kill()
+        except Exception:
+            pass
+
+    async def _put_idle(self, template: Optional[str], sbx: AsyncSandbox):
+        idle = self._idle_list(template)
+        if self._closed or len(idle) >= self.max_size:
+            await self._kill(sbx)
+            self.stats.incr("discarded")
+        else:
+            idle.append(sbx)
+
+    async def _fill_one(self, template: Optional[str]):
+        try:
+            if not self._closed:
+                await self._put_idle(template, await self._create(template))
+        except Exception as e:
+            self.stats.incr("create_failures")
+            print(f"⚠ 预热沙箱失败 (template={template}): {e}")
+        finally:
+            self._pending[template] -= 1
+
+    def _missing(self, template: Optional[str], target: int) -> int:
+        idle = self._idle_list(template)
+        return max(target - len(idle) - self._pending[template], 0)
+
+    async def prewarm(self, template: Optional[str] = None, count: Optional[int] = None):
+        """
+        并发创建沙箱，直到空闲数 + 创建中数量达到 count (默认 size)
+
+        等待本次发起的创建全部完成后返回。
+        """
+        if self._closed:
+            raise RuntimeError("沙箱池已关闭")
+        target = min(count if count is not None else self.size, self.max_size)
+        missing = self._missing(template, target)
+        self._pending[template] += missing
+        await asyncio.gather(*(self._fill_one(template) for _ in range(missing)))
+
+    def _refill(self, template: Optional[str]):
+        """在后台补充到 size，不等待"""
+        if self._closed:
+            return
+        missing = self._missing(template, self.size)
+        self._pending[template] += missing
+        for _ in range(missing):
+            self._spawn(self._fill_one(template))
+
+    async def acquire(self, template: Optional[str] = None) -> AsyncSandbox:
+        """从池中取出一个沙箱，池空时直接创建"""
+        if self._closed:
+            raise RuntimeError("沙箱池已关闭")
+
+        start = time.perf_counter()
+        idle = self._idle_list(template)
+        hit = True
+        sbx = None
+        while sbx is None:
+            if not idle:
+                hit = False
+                sbx = await self._create(template)
+                break
+            sbx = idle.pop()
+            try:
+                # 空闲期间可能已超时，刷新存活时间的同时确认沙箱仍可用
+                await sbx.set_timeout(self.timeout)
+            except Exception:
+                await self._kill(sbx)
+                self.stats.incr("discarded")
+                sbx = None
+
+        self.stats.record_lease(hit, time.perf_counter() - start)
+        self._refill(template)
+        return sbx
+
+    async def _recycle(self, template: Optional[str], sbx: AsyncSandbox):
+        try:
+            baseline = self._baseline_pids.get(sbx.sandbox_id, set())
+            await asyncio.gather(*(
+                sbx.commands.kill(p.pid)
+                for p in await sbx.commands.list()
+                if p.pid not in baseline
+            ))
+            current = parse_snapshot((await sbx.commands.run(snapshot_command(self.scratch_paths))).stdout)
+            for command in delete_commands(plan_reset(self._baseline_files[sbx.sandbox_id], current)):
+                await sbx.commands.run(command)
+            self.stats.incr("resets")
+            await self._put_idle(template, sbx)
+        except Exception as e:
+            print(f"⚠ 清理沙箱 {sbx.sandbox_id} 失败，改为销毁: {e}")
+            await self._discard(template, sbx)
+
+    async def _discard(self, template: Optional[str], sbx: AsyncSandbox):
+        await self._kill(sbx)
+        self.stats.incr("discarded")
+        self._refill(template)
+
+    def release(self, sbx: AsyncSandbox, template: Optional[str] = None, discard: bool = False):
+        """归还沙箱，清理或销毁在后台任务中进行"""
+        if self._closed or discard or self.on_release == DISCARD:
+            self._spawn(self._discard(template, sbx))
+        else:
+            self._spawn(self._recycle(template, sbx))
+
+    @asynccontextmanager
+    async def lease(self, template: Optional[str] = None) -> AsyncGenerator[AsyncSandbox, None]:
+        """
+        租借一个沙箱，退出上下文时自动归还
+
+        任务抛出异常时沙箱状态不可信，直接销毁而不放回池中。
+        """
+        sbx = await self.acquire(template)
+        try:
+            yield sbx
+        except BaseException:
+            self.release(sbx, template, discard=True)
+            raise
+        else:
+            self.release(sbx, template)
+
+    async def close(self):
+        """停止补充，等待后台任务结束并销毁所有空闲沙箱"""
+        self._closed = True
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        idle = [sbx for sandboxes in self._idle.values() for sbx in sandboxes]
+        self._idle.clear()
+        await asyncio.gather(*(self._kill(sbx) for sbx in idle))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
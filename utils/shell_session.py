@@ -0,0 +1,221 @@
+"""
+持久 shell 会话 - 在一个长驻 bash 进程中顺序执行命令，避免每条命令都新建进程
+
+命令通过 stdin 发送给后台 bash，用唯一的哨兵行标记每条命令输出的结束和退出码。
+cd、export 等状态在命令之间保留，stdout 和 stderr 分别收集。
+"""
+import re
+import shlex
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from ucloud_sandbox import Sandbox
+
+
+DEFAULT_SHELL = "bash --noprofile --norc"
+
+# 会话启动时定义的包装函数。直接用 "{ eval ...; }" 时，eval 内的语法错误会打乱 bash
+# 的解析状态，导致下一行的 "{" 不再被识别为关键字；改为普通函数调用则不受影响
+_EVAL_FUNCTION = '__session_eval() { eval "$1"; }\n'
+
+
+class CommandOutput:
+    """单条命令的执行结果，字段与 commands.run 返回的 CommandResult 对应，额外记录耗时"""
+
+    def __init__(self, stdout: str, stderr: str, exit_code: int, duration: float):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+        self.duration = duration
+
+    def __repr__(self):
+        return (
+            f"CommandOutput(exit_code={self.exit_code}, "
+            f"stdout={self.stdout[:40]!r}, stderr={self.stderr[:40]!r}, duration={self.duration:.3f})"
+        )
+
+
+class ShellCommandError(Exception):
+    """命令以非 0 退出码结束 (check=True 时抛出)"""
+
+    def __init__(self, command: str, result: CommandOutput):
+        super().__init__(f"命令退出码 {result.exit_code}: {command}\n{result.stderr}")
+        self.command = command
+        self.result = result
+        self.exit_code = result.exit_code
+        self.stdout = result.stdout
+        self.stderr = result.stderr
+
+
+class SessionClosedError(Exception):
+    """会话的 shell 进程已退出"""
+
+
+class ShellSession:
+    """
+    基于一个长驻 shell 进程的命令会话
+
+    线程安全: 多个线程共用同一会话时命令依次执行；需要并行时创建多个会话。
+    命令的 stdin 重定向到 /dev/null，不会读走后续命令；命令内执行 exit 会结束会话。
+    后台任务 (cmd &) 在命令返回后的输出会混入下一条命令的结果。
+
+    Args:
+        sbx: 目标沙箱
+        cwd: 初始工作目录
+        envs: 初始环境变量
+        shell: 启动的 shell 命令
+        kwargs: 传给 commands.run 的 user / timeout 等，timeout 默认 0 (会话不限时，
+                否则 SDK 默认的 60 秒超时会在一分钟后关闭会话)
+
+    Example:
+        with ShellSession(sbx) as session:
+            session.run("cd /home/user && export MODE=test")
+            result = session.run("pwd; echo $MODE")
+            print(result.stdout)  # /home/user\\ntest\\n
+    """
+
+    def __init__(
+        self,
+        sbx: Sandbox,
+        cwd: Optional[str] = None,
+        envs: Optional[Dict[str, str]] = None,
+        shell: str = DEFAULT_SHELL,
+        **kwargs,
+    ):
+        self.sbx = sbx
+        self.commands_run = 0
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._stdout = ""
+        self._stderr = ""
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        if cwd is not None:
+            kwargs["cwd"] = cwd
+        if envs:
+            kwargs["envs"] = envs
+        kwargs.setdefault("timeout", 0)
+        self._handle = sbx.commands.run(shell, background=True, stdin=True, **kwargs)
+        self.pid = self._handle.pid
+        self._thread = threading.Thread(target=self._wait, daemon=True, name=f"shell-session-{self.pid}")
+        self._thread.start()
+        sbx.commands.send_stdin(self.pid, _EVAL_FUNCTION)
+
+    def _on_stdout(self, data: str):
+        with self._cond:
+            self._stdout += data
+            self._cond.notify_all()
+
+    def _on_stderr(self, data: str):
+        with self._cond:
+            self._stderr += data
+            self._cond.notify_all()
+
+    def _wait(self):
+        """后台线程: 接收 shell 的输出直到进程退出"""
+        try:
+            self._handle.wait(on_stdout=self._on_stdout, on_stderr=self._on_stderr)
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def run(
+        self,
+        cmd: str,
+        envs: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = 60,
+        check: bool = True,
+    ) -> CommandOutput:
+        """
+        在会话中执行一条命令
+
+        Args:
+            cmd: shell 命令，可以包含多行
+            envs: 只对本条命令生效的环境变量
+            timeout: 超时时间 (秒)，超时后会话被关闭
+            check: 退出码非 0 时抛出 ShellCommandError (与 commands.run 行为一致)
+
+        Returns:
+            CommandOutput
+        """
+        sentinel = f"__SHELL_SESSION_{uuid.uuid4().hex}__"
+        prefix = " ".join(f"{k}={shlex.quote(v)}" for k, v in (envs or {}).items())
+        # 哨兵前总是输出一个换行，解析时去掉，以区分输出末尾是否有换行
+        script = (
+            f"{prefix} __session_eval {shlex.quote(cmd)} < /dev/null; "
+            f"__rc=$?; printf '\\n%s %d\\n' {sentinel} \"$__rc\"; printf '\\n%s\\n' {sentinel} >&2\n"
+        )
+        stdout_end = re.compile(rf"\n{sentinel} (\d+)\n")
+        stderr_end = f"\n{sentinel}\n"
+
+        with self._lock:
+            if self._closed:
+                raise SessionClosedError(f"shell 会话已结束: {self._error or '进程已退出'}")
+            start = time.perf_counter()
+            self.sbx.commands.send_stdin(self.pid, script)
+
+            deadline = None if timeout is None else time.monotonic() + timeout
+            with self._cond:
+                while True:
+                    out_match = stdout_end.search(self._stdout)
+                    err_index = self._stderr.find(stderr_end)
+                    if out_match and err_index >= 0:
+                        break
+                    if self._closed:
+                        raise SessionClosedError(f"命令执行期间 shell 会话结束: {cmd}")
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                if not (out_match and err_index >= 0):
+                    self._closed = True
+                    self._kill()
+                    raise TimeoutError(f"命令在 {timeout}s 内未完成，会话已关闭: {cmd}")
+
+                stdout = self._stdout[:out_match.start()]
+                stderr = self._stderr[:err_index]
+                self._stdout = self._stdout[out_match.end():]
+                self._stderr = self._stderr[err_index + len(stderr_end):]
+
+            self.commands_run += 1
+            result = CommandOutput(stdout, stderr, int(out_match.group(1)), time.perf_counter() - start)
+
+        if check and result.exit_code != 0:
+            raise ShellCommandError(cmd, result)
+        return result
+
+    def _kill(self):
+        try:
+            self.sbx.commands.kill(self.pid)
+        except Exception:
+            pass
+
+    def close(self):
+        """结束 shell 进程"""
+        if not self._closed:
+            try:
+                self.sbx.commands.send_stdin(self.pid, "exit 0\n")
+            except Exception:
+                pass
+            self._thread.join(timeout=5)
+            if not self._closed:
+                self._kill()
+                self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,16 @@
+"""
+统计工具 - 最近秩法百分位，供 utils 与 benchmarks 共用 (不加载 .env，不依赖 benchmarks)
+"""
+import math
+from typing import List
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法计算百分位，sorted_values 需已排序"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
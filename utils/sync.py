@@ -0,0 +1,198 @@
+"""
+目录增量同步 - 比较本地与沙箱两侧的内容哈希，只上传变更文件并删除多余文件
+"""
+import fnmatch
+import hashlib
+import os
+import posixpath
+import re
+import shlex
+import time
+from typing import Dict, List, Optional
+
+from ucloud_sandbox import Sandbox
+
+from utils.upload import HASH_BLOCK_SIZE
+
+
+DEFAULT_BATCH_FILES = 64
+DEFAULT_BATCH_BYTES = 16 * 1024 * 1024
+
+# 单条 rm 命令包含的最大路径数，避免超过 ARG_MAX
+DELETE_BATCH = 500
+
+# sha256sum 对含反斜杠、换行或回车的文件名在行首加 "\"，并把这三个字符转义为 \\、\n、\r
+_SHA256SUM_ESCAPES = {"\\": "\\", "n": "\n", "r": "\r"}
+_SHA256SUM_ESCAPE = re.compile(r"\\(.)")
+
+
+def is_excluded(rel_path: str, exclude: List[str]) -> bool:
+    """相对路径或其任一级目录名匹配 exclude 中的通配符时排除"""
+    parts = rel_path.split("/")
+    for pattern in exclude:
+        if fnmatch.fnmatch(rel_path, pattern):
+            return True
+        if any(fnmatch.fnmatch(part, pattern) for part in parts):
+            return True
+    return False
+
+
+def local_hashes(local_dir: str, exclude: Optional[List[str]] = None) -> Dict[str, dict]:
+    """
+    计算本地目录下所有文件的 sha256
+
+    Returns:
+        dict: {相对路径 (posix 分隔符): {"sha256": 哈希, "size": 大小}}
+    """
+    exclude = exclude or []
+    result = {}
+    for root, dirs, files in os.walk(local_dir):
+        rel_root = os.path.relpath(root, local_dir)
+        rel_root = "" if rel_root == "." else rel_root.replace(os.sep, "/")
+        dirs[:] = [
+            d for d in dirs
+            if not is_excluded(posixpath.join(rel_root, d), exclude)
+        ]
+        for name in files:
+            rel_path = posixpath.join(rel_root, name)
+            if is_excluded(rel_path, exclude):
+                continue
+            digest = hashlib.sha256()
+            size = 0
+            with open(os.path.join(root, name), "rb") as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                    digest.update(block)
+                    size += len(block)
+            result[rel_path] = {"sha256": digest.hexdigest(), "size": size}
+    return result
+
+
+def remote_hashes(sbx: Sandbox, sandbox_dir: str) -> Dict[str, str]:
+    """
+    一条命令计算沙箱目录下所有文件的 sha256
+
+    Returns:
+        dict: {相对路径: 哈希}，目录不存在时为空
+    """
+    result = sbx.commands.run(
+        f"cd {shlex.quote(sandbox_dir)} 2>/dev/null && "
+        f"find . -type f -print0 | xargs -0 -r sha256sum || true"
+    )
+    hashes = {}
+    # 不用 splitlines: 文件名中的 \x0b、\x1c 等字符不会被 sha256sum 转义，也不是行分隔符
+    for line in result.stdout.split("\n"):
+        escaped = line.startswith("\\")
+        digest, sep, path = line[escaped:].partition("  ")
+        if not sep:
+            continue
+        if escaped:
+            path = _SHA256SUM_ESCAPE.sub(lambda m: _SHA256SUM_ESCAPES.get(m.group(1), m.group(0)), path)
+        if path.startswith("./"):
+            path = path[2:]
+        hashes[path] = digest
+    return hashes
+
+
+def _stale_dirs(paths: List[str]) -> List[str]:
+    """被删除文件的各级上级目录 (不含同步根目录)，深的在前，便于逐级 rmdir"""
+    dirs = set()
+    for path in paths:
+        parent = posixpath.dirname(path)
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            parent = posixpath.dirname(parent)
+    return sorted(dirs, key=lambda d: (-d.count("/"), d))
+
+
+def _batches(paths: List[str], files: Dict[str, dict], max_files: int, max_bytes: int):
+    """按文件数和字节数上限把待上传文件分组"""
+    batch: List[str] = []
+    batch_bytes = 0
+    for path in paths:
+        size = files[path]["size"]
+        if batch and (len(batch) >= max_files or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(path)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def sync_dir(
+    sbx: Sandbox,
+    local_dir: str,
+    sandbox_dir: str,
+    delete: bool = True,
+    exclude: Optional[List[str]] = None,
+    batch_files: int = DEFAULT_BATCH_FILES,
+    batch_bytes: int = DEFAULT_BATCH_BYTES,
+    full: bool = False,
+) -> dict:
+    """
+    把本地目录增量同步到沙箱目录
+
+    1. 计算本地文件哈希，并用一条 find | sha256sum 命令获取沙箱侧哈希
+    2. 只把新增或内容变化的文件按批次通过 files.write_files 上传
+    3. delete=True 时删除沙箱中本地已不存在的文件，以及这些文件的上级目录中因此变空的目录
+
+    Args:
+        sbx: 目标沙箱
+        local_dir: 本地目录
+        sandbox_dir: 沙箱目录
+        delete: 是否删除沙箱侧多余的文件
+        exclude: 排除的通配符 (匹配相对路径或任一级目录名，如 ".git"、"*.pyc")
+        batch_files: 每批上传的最大文件数
+        batch_bytes: 每批上传的最大字节数 (单个文件超过时独占一批)
+        full: 忽略哈希，全部重新上传 (用于和全量上传对比)
+
+    Returns:
+        dict: 同步统计 (files_total, uploaded, unchanged, deleted, batches,
+              bytes_total, bytes_uploaded, bytes_saved, seconds)
+    """
+    start = time.perf_counter()
+    sandbox_dir = sandbox_dir.rstrip("/") or "/"
+
+    local = local_hashes(local_dir, exclude)
+    remote = remote_hashes(sbx, sandbox_dir)
+
+    changed = sorted(
+        path for path, entry in local.items()
+        if full or remote.get(path) != entry["sha256"]
+    )
+    stale = sorted(path for path in remote if path not in local) if delete else []
+    if exclude:
+        # 被排除的文件不属于同步范围，也不应被删除
+        stale = [path for path in stale if not is_excluded(path, exclude)]
+
+    batches = 0
+    for batch in _batches(changed, local, batch_files, batch_bytes):
+        entries = []
+        for path in batch:
+            with open(os.path.join(local_dir, *path.split("/")), "rb") as f:
+                entries.append({"path": posixpath.join(sandbox_dir, path), "data": f.read()})
+        sbx.files.write_files(entries)
+        batches += 1
+
+    for i in range(0, len(stale), DELETE_BATCH):
+        quoted = " ".join(shlex.quote(path) for path in stale[i:i + DELETE_BATCH])
+        sbx.commands.run(f"cd {shlex.quote(sandbox_dir)} && rm -f -- {quoted}")
+    # 只尝试删除被删文件的上级目录，rmdir 跳过非空目录；沙箱中原有的其他空目录保持不变
+    dirs = _stale_dirs(stale)
+    for i in range(0, len(dirs), DELETE_BATCH):
+        quoted = " ".join(shlex.quote(path) for path in dirs[i:i + DELETE_BATCH])
+        sbx.commands.run(f"cd {shlex.quote(sandbox_dir)} && {{ rmdir -- {quoted} 2>/dev/null; true; }}")
+
+    bytes_total = sum(entry["size"] for entry in local.values())
+    bytes_uploaded = sum(local[path]["size"] for path in changed)
+    return {
+        "files_total": len(local),
+        "uploaded": len(changed),
+        "unchanged": len(local) - len(changed),
+        "deleted": len(stale),
+        "batches": batches,
+        "bytes_total": bytes_total,
+        "bytes_uploaded": bytes_uploaded,
+        "bytes_saved": bytes_total - bytes_uploaded,
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,179 @@
+"""
+目录树打包传输 - 把整个目录打成 tar 流一次上传/下载，沙箱内用一条 tar 命令解包/打包
+"""
+import gzip
+import os
+import shlex
+import tarfile
+import tempfile
+import time
+import uuid
+from typing import Optional
+
+from ucloud_sandbox import Sandbox
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIONS = (None, "gzip", "zstd")
+
+# 本地 tar 流超过该大小时落盘，避免大目录全部驻留内存
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+# 沙箱内解包/打包命令中的解压/压缩部分
+_EXTRACT_FILTERS = {
+    None: "tar -xf {archive} -C {target}",
+    "gzip": "tar -xzf {archive} -C {target}",
+    "zstd": "zstd -dc {archive} | tar -xf - -C {target}",
+}
+_CREATE_FILTERS = {
+    None: "tar -cf {archive} -C {source} .",
+    "gzip": "tar -czf {archive} -C {source} .",
+    "zstd": "tar -cf - -C {source} . | zstd -q -o {archive}",
+}
+
+
+def _check_compression(compression: Optional[str]):
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"不支持的压缩方式: {compression!r}，可选 {COMPRESSIONS}")
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("zstd 压缩需要安装 zstandard: pip install zstandard")
+
+
+def _archive_suffix(compression: Optional[str]) -> str:
+    return {None: ".tar", "gzip": ".tar.gz", "zstd": ".tar.zst"}[compression]
+
+
+def pack_dir(local_dir: str, fileobj, compression: Optional[str] = None, level: Optional[int] = None):
+    """
+    以流模式把目录打包写入 fileobj
+
+    使用 tarfile 的流模式 (w|)，边遍历边写出，不需要可回退的输出。
+    """
+    _check_compression(compression)
+    if compression == "zstd":
+        cctx = zstandard.ZstdCompressor(level=level if level is not None else 3)
+        with cctx.stream_writer(fileobj, closefd=False) as writer:
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                tar.add(local_dir, arcname=".")
+    elif compression == "gzip":
+        # tarfile 的 w|gz 流模式在 3.12 之前不支持 compresslevel，改为外包一层 GzipFile
+        with gzip.GzipFile(
+            fileobj=fileobj,
+            mode="wb",
+            compresslevel=level if level is not None else 6,
+        ) as writer:
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                tar.add(local_dir, arcname=".")
+    else:
+        with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+            tar.add(local_dir, arcname=".")
+
+
+def unpack_archive(fileobj, local_dir: str, compression: Optional[str] = None):
+    """以流模式解包到 local_dir，拒绝绝对路径和越界路径"""
+    _check_compression(compression)
+    os.makedirs(local_dir, exist_ok=True)
+    if compression == "zstd":
+        reader = zstandard.ZstdDecompressor().stream_reader(fileobj)
+        mode = "r|"
+    else:
+        reader = fileobj
+        mode = "r|gz" if compression == "gzip" else "r|"
+    with tarfile.open(fileobj=reader, mode=mode) as tar:
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(local_dir, filter="data")
+        else:
+            root = os.path.realpath(local_dir)
+            for member in tar:
+                target = os.path.realpath(os.path.join(local_dir, member.name))
+                if os.path.commonpath([root, target]) != root:
+                    raise tarfile.TarError(f"归档包含越界路径: {member.name}")
+                tar.extract(member, local_dir)
+
+
+def upload_tree(
+    sbx: Sandbox,
+    local_dir: str,
+    sandbox_dir: str,
+    compression: Optional[str] = "gzip",
+    level: Optional[int] = None,
+) -> dict:
+    """
+    把本地目录打包为一个 tar 流上传，并在沙箱内用一条命令解包
+
+    Args:
+        sbx: 目标沙箱
+        local_dir: 本地目录
+        sandbox_dir: 沙箱中的目标目录 (不存在时自动创建)
+        compression: None / "gzip" / "zstd" (zstd 需要本地 zstandard 和沙箱内 zstd 命令)
+        level: 压缩级别，None 使用各算法的默认值
+
+    Returns:
+        dict: 传输统计 (files, bytes_raw, bytes_sent, seconds)
+    """
+    _check_compression(compression)
+    start = time.perf_counter()
+
+    files = 0
+    bytes_raw = 0
+    for root, _, names in os.walk(local_dir):
+        for name in names:
+            files += 1
+            bytes_raw += os.path.getsize(os.path.join(root, name))
+
+    archive = f"/tmp/upload_{uuid.uuid4().hex}{_archive_suffix(compression)}"
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        pack_dir(local_dir, spool, compression, level)
+        bytes_sent = spool.tell()
+        spool.seek(0)
+        sbx.files.write(archive, spool)
+
+    quoted_target = shlex.quote(sandbox_dir)
+    extract = _EXTRACT_FILTERS[compression].format(archive=archive, target=quoted_target)
+    sbx.commands.run(f"mkdir -p {quoted_target} && {extract}; status=$?; rm -f {archive}; exit $status")
+
+    return {
+        "files": files,
+        "bytes_raw": bytes_raw,
+        "bytes_sent": bytes_sent,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def download_tree(
+    sbx: Sandbox,
+    sandbox_dir: str,
+    local_dir: str,
+    compression: Optional[str] = "gzip",
+) -> dict:
+    """
+    在沙箱内把目录打包为一个 tar 文件，一次流式下载后在本地解包
+
+    Returns:
+        dict: 传输统计 (bytes_received, seconds)
+    """
+    _check_compression(compression)
+    start = time.perf_counter()
+
+    archive = f"/tmp/download_{uuid.uuid4().hex}{_archive_suffix(compression)}"
+    create = _CREATE_FILTERS[compression].format(archive=archive, source=shlex.quote(sandbox_dir))
+    sbx.commands.run(create)
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+            with sbx.files.read(archive, format="stream") as stream:
+                for chunk in stream:
+                    spool.write(chunk)
+            bytes_received = spool.tell()
+            spool.seek(0)
+            unpack_archive(spool, local_dir, compression)
+    finally:
+        sbx.commands.run(f"rm -f {archive}")
+
+    return {
+        "bytes_received": bytes_received,
+        "seconds": time.perf_counter() - start,
+    }
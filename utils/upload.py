@@ -0,0 +1,306 @@
+"""
+大文件上传 - 内存映射零拷贝上传、按字节范围分块并行上传并在沙箱内拼接
+"""
+import hashlib
+import io
+import mmap
+import os
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ucloud_sandbox import Sandbox
+
+
+DEFAULT_PART_SIZE = 32 * 1024 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """分块上传失败 (分块重试耗尽或校验不一致)"""
+
+
+class MmapReader(io.RawIOBase):
+    """
+    基于内存映射的只读文件流
+
+    作为 io.RawIOBase 交给 files.write，SDK 与 httpx 按块调用 read()，
+    每块从映射中复制一次，不会把整个文件读入 Python 堆，文件页由操作系统按需换入换出，
+    峰值内存不随文件大小增长。offset/length 可以只暴露文件的一个字节范围，供分块上传使用。
+    fileno() 不可用，httpx 通过 seek/tell 得到的长度是字节范围的长度而不是整个文件的大小。
+    """
+
+    def __init__(self, path: str, offset: int = 0, length: Optional[int] = None):
+        super().__init__()
+        self.name = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if length is None:
+            length = size - offset
+        if offset < 0 or length < 0 or offset + length > size:
+            self._file.close()
+            raise ValueError(f"范围 [{offset}, {offset + length}) 超出文件大小 {size}")
+
+        # mmap 的偏移量必须按分配粒度对齐，多映射的前缀通过 _start 跳过
+        aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
+        self._start = offset - aligned
+        self._length = length
+        self._pos = 0
+        if length:
+            self._mmap = mmap.mmap(
+                self._file.fileno(),
+                self._start + length,
+                access=mmap.ACCESS_READ,
+                offset=aligned,
+            )
+            self._view = memoryview(self._mmap)
+        else:
+            self._mmap = None
+            self._view = memoryview(b"")
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _next_range(self, size: int):
+        self._checkClosed()
+        start = self._start + self._pos
+        end = self._start + min(self._pos + size, self._length)
+        self._pos = end - self._start
+        return start, end
+
+    def readinto(self, b) -> int:
+        start, end = self._next_range(len(b))
+        b[:end - start] = self._view[start:end]
+        return end - start
+
+    def read(self, size: int = -1) -> bytes:
+        # 直接从映射切片生成 bytes，省去 RawIOBase.read 经由 bytearray 的第二次复制
+        if size is None or size < 0:
+            size = self._length - self._pos
+        start, end = self._next_range(size)
+        return self._view[start:end].tobytes()
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._length
+        self._pos = min(max(offset, 0), self._length)
+        return self._pos
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._pos
+
+    def close(self):
+        if self.closed:
+            return
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+        super().close()
+
+
+def upload_mmap(sbx: Sandbox, local_path: str, remote_path: str):
+    """
+    以内存映射方式上传本地文件，不把文件读入 bytes / BytesIO
+
+    Returns:
+        files.write 的返回值
+    """
+    with MmapReader(local_path) as reader:
+        return sbx.files.write(remote_path, reader)
+
+
+def plan_parts(local_path: str, part_size: int = DEFAULT_PART_SIZE) -> dict:
+    """
+    顺序读取一遍本地文件，计算整体和每个分块的 sha256
+
+    Returns:
+        dict: {"size": 总大小, "sha256": 整体哈希, "parts": [{"index", "offset", "length", "sha256"}]}
+    """
+    if part_size <= 0:
+        raise ValueError(f"part_size 必须大于 0: {part_size}")
+
+    size = os.path.getsize(local_path)
+    total_hash = hashlib.sha256()
+    parts = []
+
+    with open(local_path, "rb") as f:
+        offset = 0
+        index = 0
+        while offset < size or index == 0:
+            length = min(part_size, size - offset)
+            part_hash = hashlib.sha256()
+            remaining = length
+            while remaining > 0:
+                block = f.read(min(HASH_BLOCK_SIZE, remaining))
+                if not block:
+                    raise UploadError(f"读取 {local_path} 时文件被截断")
+                part_hash.update(block)
+                total_hash.update(block)
+                remaining -= len(block)
+            parts.append({
+                "index": index,
+                "offset": offset,
+                "length": length,
+                "sha256": part_hash.hexdigest(),
+            })
+            offset += length
+            index += 1
+
+    return {"size": size, "sha256": total_hash.hexdigest(), "parts": parts}
+
+
+def part_name(index: int) -> str:
+    """分块文件名，定宽编号保证 shell 通配符按顺序展开"""
+    return f"part_{index:06d}"
+
+
+def remote_part_hashes(sbx: Sandbox, parts_dir: str) -> Dict[str, str]:
+    """一次命令获取沙箱中已存在分块的 sha256，用于断点续传"""
+    result = sbx.commands.run(
+        f"cd {shlex.quote(parts_dir)} 2>/dev/null && sha256sum part_* 2>/dev/null || true"
+    )
+    hashes = {}
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        if len(fields) == 2:
+            hashes[fields[1].lstrip("*")] = fields[0]
+    return hashes
+
+
+def remote_sha256(sbx: Sandbox, remote_path: str) -> str:
+    """计算沙箱中文件的 sha256"""
+    result = sbx.commands.run(f"sha256sum {shlex.quote(remote_path)}")
+    return result.stdout.split()[0]
+
+
+def _read_part(local_path: str, part: dict, use_mmap: bool = False):
+    if use_mmap:
+        return MmapReader(local_path, part["offset"], part["length"])
+    with open(local_path, "rb") as f:
+        f.seek(part["offset"])
+        data = f.read(part["length"])
+    if len(data) != part["length"]:
+        raise UploadError(f"读取分块 {part['index']} 时文件被截断")
+    return data
+
+
+def _upload_part(
+    sbx: Sandbox,
+    local_path: str,
+    parts_dir: str,
+    part: dict,
+    retries: int,
+    retry_delay: float,
+    use_mmap: bool = False,
+) -> int:
+    """上传单个分块，失败时只重试该分块，返回尝试次数"""
+    remote_part = f"{parts_dir}/{part_name(part['index'])}"
+    for attempt in range(1, retries + 2):
+        try:
+            data = _read_part(local_path, part, use_mmap)
+            try:
+                sbx.files.write(remote_part, data)
+            finally:
+                if use_mmap:
+                    data.close()
+            return attempt
+        except Exception as e:
+            if attempt > retries:
+                raise UploadError(f"分块 {part['index']} 上传失败 (已重试 {retries} 次): {e}") from e
+            time.sleep(retry_delay * attempt)
+
+
+def upload_file(
+    sbx: Sandbox,
+    local_path: str,
+    remote_path: str,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_workers: int = 4,
+    retries: int = 3,
+    retry_delay: float = 1.0,
+    verify: bool = True,
+    keep_parts: bool = False,
+    use_mmap: bool = False,
+) -> dict:
+    """
+    分块并行上传本地文件到沙箱
+
+    分块上传到 {remote_path}.parts/ 下，全部完成后用一条 cat 命令拼接为目标文件。
+    若之前的上传中断，分块目录会保留下来，再次调用时哈希一致的分块直接跳过，只补传缺失或损坏的分块。
+
+    Args:
+        sbx: 目标沙箱
+        local_path: 本地文件路径
+        remote_path: 沙箱中的目标路径
+        part_size: 分块大小 (字节)，内存占用约为 part_size * max_workers
+        max_workers: 并发上传的分块数
+        retries: 单个分块的最大重试次数
+        retry_delay: 重试间隔基数 (秒)，按尝试次数线性递增
+        verify: 拼接后是否校验整体 sha256
+        keep_parts: 成功后是否保留分块目录
+        use_mmap: 分块以 MmapReader 方式上传，内存占用不再随 part_size * max_workers 增长
+
+    Returns:
+        dict: 上传统计 (size, parts, uploaded_parts, skipped_parts, attempts, sha256, seconds, mb_per_s)
+
+    Raises:
+        UploadError: 分块重试耗尽或校验不一致，此时分块目录保留以便续传
+    """
+    start = time.perf_counter()
+    plan = plan_parts(local_path, part_size)
+    parts_dir = f"{remote_path}.parts"
+
+    sbx.files.make_dir(parts_dir)
+    existing = remote_part_hashes(sbx, parts_dir)
+    pending: List[dict] = [
+        part for part in plan["parts"]
+        if existing.get(part_name(part["index"])) != part["sha256"]
+    ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        attempts = list(executor.map(
+            lambda part: _upload_part(sbx, local_path, parts_dir, part, retries, retry_delay, use_mmap),
+            pending,
+        ))
+
+    names = " ".join(part_name(part["index"]) for part in plan["parts"])
+    quoted_dir = shlex.quote(parts_dir)
+    quoted_target = shlex.quote(remote_path)
+    sbx.commands.run(
+        f"cd {quoted_dir} && cat {names} > {quoted_target}.tmp && mv {quoted_target}.tmp {quoted_target}"
+    )
+
+    if verify:
+        actual = remote_sha256(sbx, remote_path)
+        if actual != plan["sha256"]:
+            raise UploadError(f"校验失败: 本地 {plan['sha256']} != 沙箱 {actual}")
+
+    if not keep_parts:
+        sbx.commands.run(f"rm -rf {quoted_dir}")
+
+    seconds = time.perf_counter() - start
+    return {
+        "size": plan["size"],
+        "parts": len(plan["parts"]),
+        "uploaded_parts": len(pending),
+        "skipped_parts": len(plan["parts"]) - len(pending),
+        "attempts": sum(attempts),
+        "sha256": plan["sha256"],
+        "seconds": seconds,
+        "mb_per_s": plan["size"] / (1024 ** 2) / seconds if seconds > 0 else 0.0,
+    }
@@ -0,0 +1,718 @@
+"""
+增量 VT100 屏幕模型 - 按块接收 PTY 输出，维护与 PtySize 一致的字符网格，并记录发生变化的行
+
+解析器是一个跨块保持状态的状态机，控制序列被切断在两块之间也能正确处理；
+连续的可打印 ASCII 文本整段写入网格，不逐字符处理。每次读取屏幕只取网格当前内容，
+不需要重新解析历史输出。
+"""
+import codecs
+import re
+import threading
+import unicodedata
+from array import array
+from collections import deque
+from functools import lru_cache
+from typing import Deque, List, NamedTuple, Optional, Set, Tuple, Union
+
+from ucloud_sandbox import PtySize
+
+
+DEFAULT_HISTORY = 1000
+
+# 单元格属性打包为一个整数: 低 8 位为样式标志，其后 9 位前景色、9 位背景色 (0 表示默认色，否则为色号 + 1)
+BOLD = 1 << 0
+DIM = 1 << 1
+ITALIC = 1 << 2
+UNDERLINE = 1 << 3
+BLINK = 1 << 4
+REVERSE = 1 << 5
+HIDDEN = 1 << 6
+STRIKE = 1 << 7
+
+_FG_SHIFT = 8
+_BG_SHIFT = 17
+_COLOR_MASK = 0x1FF
+_FG_MASK = _COLOR_MASK << _FG_SHIFT
+_BG_MASK = _COLOR_MASK << _BG_SHIFT
+
+# SGR 参数 -> 样式标志
+_SGR_SET = {1: BOLD, 2: DIM, 3: ITALIC, 4: UNDERLINE, 5: BLINK, 7: REVERSE, 8: HIDDEN, 9: STRIKE}
+_SGR_RESET = {22: BOLD | DIM, 23: ITALIC, 24: UNDERLINE, 25: BLINK, 27: REVERSE, 28: HIDDEN, 29: STRIKE}
+
+# 解析状态
+_GROUND, _ESC, _CSI, _OSC, _OSC_ESC, _STRING, _STRING_ESC, _CHARSET = range(8)
+
+# 普通状态下的快速路径，一次匹配一个完整记号: 可以整段写入的文本 (不含 C0 控制字符和 DEL)、
+# 完整的 CSI 序列、CRLF、单个控制字符。被切断在块末尾的 CSI 由状态机继续处理
+_TOKEN = re.compile(
+    r"([^\x00-\x1f\x7f]+)"
+    r"|\x1b\[([\x20-\x3f]*)([\x40-\x7e])"
+    r"|(\r\n)"
+    r"|([\x00-\x1f\x7f])"
+)
+# 混合文本中的 ASCII 片段，其余字符逐个按宽度处理
+_ASCII_OR_CHAR = re.compile(r"([\x20-\x7e]+)|(.)", re.DOTALL)
+# CSI 的参数和中间字节
+_CSI_BODY = re.compile(r"[\x20-\x3f]*")
+
+
+class Cell(NamedTuple):
+    """单元格内容，fg / bg 为 256 色色号，None 表示默认色"""
+    char: str
+    fg: Optional[int]
+    bg: Optional[int]
+    flags: int
+
+
+@lru_cache(maxsize=4096)
+def char_width(char: str) -> int:
+    """字符占用的列数: 组合字符 0，东亚宽字符 2，其余 1"""
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+def _rgb_to_256(r: int, g: int, b: int) -> int:
+    """真彩色映射到 256 色的 6x6x6 色块"""
+    def level(v):
+        return max(0, min(5, round(v / 255 * 5)))
+    return 16 + 36 * level(r) + 6 * level(g) + level(b)
+
+
+@lru_cache(maxsize=4096)
+def _parse_params(params: str) -> Tuple[str, Tuple[int, ...]]:
+    """解析 CSI 参数，返回 (私有前缀, 数字参数)；同样的参数串反复出现，结果缓存"""
+    private = ""
+    if params and params[0] in "?<=>":
+        private, params = params[0], params[1:]
+    # 去掉中间字节 (例如 DECSCUSR 的空格)
+    params = params.rstrip(" !\"#$%&'()*+,-./")
+    if not params:
+        return private, ()
+    return private, tuple(int(p) if p.isdigit() else 0 for p in params.replace(":", ";").split(";"))
+
+
+def _set_color(attr: int, code: int, color: int) -> int:
+    if code == 38:
+        return (attr & ~_FG_MASK) | ((color + 1) << _FG_SHIFT)
+    return (attr & ~_BG_MASK) | ((color + 1) << _BG_SHIFT)
+
+
+@lru_cache(maxsize=4096)
+def _apply_sgr(attr: int, args: Tuple[int, ...]) -> int:
+    """在属性 attr 上应用 SGR 参数，返回新属性"""
+    i = 0
+    while i < len(args):
+        code = args[i]
+        if code == 0:
+            attr = 0
+        elif code in _SGR_SET:
+            attr |= _SGR_SET[code]
+        elif code in _SGR_RESET:
+            attr &= ~_SGR_RESET[code]
+        elif 30 <= code <= 37 or 90 <= code <= 97:
+            attr = _set_color(attr, 38, code - 30 if code < 90 else code - 90 + 8)
+        elif 40 <= code <= 47 or 100 <= code <= 107:
+            attr = _set_color(attr, 48, code - 40 if code < 100 else code - 100 + 8)
+        elif code == 39:
+            attr &= ~_FG_MASK
+        elif code == 49:
+            attr &= ~_BG_MASK
+        elif code in (38, 48):
+            # 38;5;n 为 256 色，38;2;r;g;b 为真彩色
+            if i + 2 < len(args) and args[i + 1] == 5:
+                attr = _set_color(attr, code, args[i + 2] & 0xFF)
+                i += 2
+            elif i + 4 < len(args) and args[i + 1] == 2:
+                attr = _set_color(attr, code, _rgb_to_256(*args[i + 2:i + 5]))
+                i += 4
+        i += 1
+    return attr
+
+
+class Screen:
+    """
+    VT100 / xterm 子集的屏幕模型
+
+    支持光标移动、擦除、插入删除行和字符、滚动区域、SGR 颜色样式、自动换行、
+    备用屏幕 (1049/1047/47)、保存恢复光标、宽字符；OSC 只记录窗口标题，其余查询类序列忽略。
+    可以在 PTY 接收线程中 feed，在其他线程中读取。
+
+    Args:
+        rows / cols: 屏幕大小，应与 sbx.pty.create / sbx.pty.resize 使用的 PtySize 一致
+        history: 主屏幕滚出顶部的行保留的最大行数
+
+    Example:
+        screen = Screen.from_size(size)
+        pty = PtyDriver(sbx, size=size, on_output=screen.feed)
+        ...
+        for row in screen.take_dirty():
+            redraw(row, screen.line(row))
+    """
+
+    def __init__(self, rows: int = 24, cols: int = 80, history: int = DEFAULT_HISTORY):
+        if rows < 1 or cols < 1:
+            raise ValueError(f"屏幕大小必须大于 0: {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.history: Deque[str] = deque(maxlen=history)
+        self.title = ""
+        self.bytes_fed = 0
+
+        self._lock = threading.Lock()
+        self._state = _GROUND
+        self._params = ""
+        self._osc = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.reset()
+
+    @classmethod
+    def from_size(cls, size: PtySize, **kwargs) -> "Screen":
+        return cls(size.rows, size.cols, **kwargs)
+
+    def reset(self):
+        """恢复初始状态 (RIS)"""
+        self._chars = [self._blank_chars() for _ in range(self.rows)]
+        self._attrs = [self._blank_attrs() for _ in range(self.rows)]
+        self._saved_screen = None
+        self.alternate = False
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.cursor_visible = True
+        self.autowrap = True
+        self._wrap_pending = False
+        self._attr = 0
+        self._saved_cursor = (0, 0, 0)
+        self._top = 0
+        self._bottom = self.rows - 1
+        self.dirty: Set[int] = set(range(self.rows))
+
+    def _blank_chars(self) -> List[str]:
+        return [" "] * self.cols
+
+    def _blank_attrs(self, attr: int = 0) -> array:
+        return array("I", [attr]) * self.cols
+
+    # ---- 读取 ----
+
+    def line(self, row: int) -> str:
+        """第 row 行的文本 (不含宽字符占位，去掉行尾空格)"""
+        with self._lock:
+            return "".join(self._chars[row]).rstrip()
+
+    @property
+    def display(self) -> List[str]:
+        """所有行的文本"""
+        with self._lock:
+            return ["".join(chars).rstrip() for chars in self._chars]
+
+    def text(self) -> str:
+        return "\n".join(self.display).rstrip("\n")
+
+    def cell(self, row: int, col: int) -> Cell:
+        with self._lock:
+            attr = self._attrs[row][col]
+            fg = (attr >> _FG_SHIFT) & _COLOR_MASK
+            bg = (attr >> _BG_SHIFT) & _COLOR_MASK
+            return Cell(self._chars[row][col], fg - 1 if fg else None, bg - 1 if bg else None, attr & 0xFF)
+
+    def take_dirty(self) -> List[int]:
+        """返回上次调用以来内容变化的行号 (升序) 并清空记录"""
+        with self._lock:
+            rows, self.dirty = sorted(self.dirty), set()
+            return rows
+
+    # ---- 大小 ----
+
+    def resize(self, rows: Union[int, PtySize], cols: Optional[int] = None):
+        """
+        调整屏幕大小，与 sbx.pty.resize 配合使用
+
+        缩小行数时如果光标会超出屏幕，顶部的行滚入 history；列数变化时截断或补空格。
+        """
+        if isinstance(rows, PtySize):
+            rows, cols = rows.rows, rows.cols
+        if rows < 1 or cols < 1:
+            raise ValueError(f"屏幕大小必须大于 0: {rows}x{cols}")
+        with self._lock:
+            overflow = self.cursor_y - rows + 1
+            if overflow > 0:
+                for chars in self._chars[:overflow]:
+                    if not self.alternate:
+                        self.history.append("".join(chars).rstrip())
+                del self._chars[:overflow]
+                del self._attrs[:overflow]
+                self.cursor_y -= overflow
+
+            self._chars, self._attrs = self._reshape(self._chars, self._attrs, rows, cols)
+            if self._saved_screen is not None:
+                self._saved_screen = self._reshape(*self._saved_screen, rows, cols)
+
+            self.rows = rows
+            self.cols = cols
+            self._top = 0
+            self._bottom = rows - 1
+            self.cursor_x = min(self.cursor_x, cols - 1)
+            self.cursor_y = min(self.cursor_y, rows - 1)
+            self._wrap_pending = False
+            self.dirty = set(range(rows))
+
+    @staticmethod
+    def _reshape(chars_rows, attrs_rows, rows, cols):
+        chars_rows = chars_rows[:rows]
+        attrs_rows = attrs_rows[:rows]
+        for chars, attrs in zip(chars_rows, attrs_rows):
+            if len(chars) > cols:
+                del chars[cols:]
+                del attrs[cols:]
+                # 截断到宽字符中间时清掉孤立的左半边
+                if chars[-1] and char_width(chars[-1][0]) == 2:
+                    chars[-1] = " "
+            elif len(chars) < cols:
+                chars.extend(" " * (cols - len(chars)))
+                attrs.extend(array("I", [0]) * (cols - len(attrs)))
+        while len(chars_rows) < rows:
+            chars_rows.append([" "] * cols)
+            attrs_rows.append(array("I", [0]) * cols)
+        return chars_rows, attrs_rows
+
+    # ---- 输入 ----
+
+    def feed(self, data: Union[bytes, str]):
+        """输入一块 PTY 输出，可以在任意位置切断"""
+        with self._lock:
+            if isinstance(data, bytes):
+                self.bytes_fed += len(data)
+                data = self._decoder.decode(data)
+            else:
+                self.bytes_fed += len(data.encode())
+            self._parse(data)
+
+    def _parse(self, text: str):
+        i = 0
+        n = len(text)
+        while i < n:
+            state = self._state
+            if state == _GROUND:
+                match = _TOKEN.match(text, i)
+                i = match.end()
+                kind = match.lastindex
+                if kind == 1:
+                    self._draw(match.group(1))
+                elif kind == 3:
+                    if match.group(3) == "m":
+                        # SGR 最常见，跳过 _csi 的分派
+                        private, args = _parse_params(match.group(2))
+                        if not private:
+                            self._attr = _apply_sgr(self._attr, args or (0,))
+                    else:
+                        self._csi(match.group(2), match.group(3))
+                elif kind == 4:
+                    self.cursor_x = 0
+                    self._index()
+                elif match.group(5) == "\x1b":
+                    self._state = _ESC
+                else:
+                    self._control(match.group(5))
+
+            elif state == _CSI:
+                match = _CSI_BODY.match(text, i)
+                self._params += match.group()
+                i = match.end()
+                if i < n:
+                    ch = text[i]
+                    i += 1
+                    if ch == "\x1b":
+                        self._state = _ESC
+                    elif ch < "\x20":
+                        # CSI 中间夹的 C0 控制字符照常执行
+                        self._control(ch)
+                    else:
+                        self._state = _GROUND
+                        self._csi(self._params, ch)
+
+            elif state == _ESC:
+                ch = text[i]
+                i += 1
+                self._state = _GROUND
+                if ch == "[":
+                    self._state = _CSI
+                    self._params = ""
+                elif ch == "]":
+                    self._state = _OSC
+                    self._osc = ""
+                elif ch in "P^_X":
+                    self._state = _STRING
+                elif ch in "()*+#":
+                    # 字符集选择 / DECALN 等带一个参数字符的序列
+                    self._state = _CHARSET
+                else:
+                    self._esc(ch)
+
+            elif state in (_OSC, _STRING):
+                end = i
+                while end < n and text[end] not in "\x07\x1b":
+                    end += 1
+                if state == _OSC:
+                    self._osc += text[i:end]
+                i = end
+                if i < n:
+                    ch = text[i]
+                    i += 1
+                    if ch == "\x07":
+                        self._end_string(state)
+                    else:
+                        self._state = _OSC_ESC if state == _OSC else _STRING_ESC
+
+            elif state in (_OSC_ESC, _STRING_ESC):
+                # ESC \ 结束字符串；其他字符视为新的转义序列
+                ch = text[i]
+                if ch == "\\":
+                    i += 1
+                    self._end_string(_OSC if state == _OSC_ESC else _STRING)
+                else:
+                    self._end_string(_OSC if state == _OSC_ESC else _STRING)
+                    self._state = _ESC
+
+            else:  # _CHARSET: 字符集选择只有一个字符，忽略
+                i += 1
+                self._state = _GROUND
+
+    def _end_string(self, state: int):
+        self._state = _GROUND
+        if state == _OSC:
+            code, _, value = self._osc.partition(";")
+            if code in ("0", "2"):
+                self.title = value
+            self._osc = ""
+
+    # ---- 绘制 ----
+
+    def _draw(self, text: str):
+        if not text.isascii():
+            for ascii_run, ch in _ASCII_OR_CHAR.findall(text):
+                if ascii_run:
+                    self._draw(ascii_run)
+                else:
+                    self._draw_char(ch)
+            return
+
+        cols = self.cols
+        attr = self._attr
+        x = self.cursor_x
+        length = len(text)
+        if not self._wrap_pending and x + length < cols:
+            # 常见情况: 整段写在当前行内
+            y = self.cursor_y
+            self._chars[y][x:x + length] = text
+            self._attrs[y][x:x + length] = array("I", [attr]) * length
+            self.dirty.add(y)
+            self.cursor_x = x + length
+            return
+
+        pos = 0
+        total = len(text)
+        while pos < total:
+            if self._wrap_pending:
+                if self.autowrap:
+                    self._wrap()
+                else:
+                    # 不自动换行时剩余字符都覆盖最后一列
+                    self._chars[self.cursor_y][cols - 1] = text[-1]
+                    self._attrs[self.cursor_y][cols - 1] = attr
+                    self.dirty.add(self.cursor_y)
+                    return
+            x = self.cursor_x
+            chunk = text[pos:pos + cols - x]
+            length = len(chunk)
+            self._chars[self.cursor_y][x:x + length] = chunk
+            self._attrs[self.cursor_y][x:x + length] = array("I", [attr]) * length
+            self.dirty.add(self.cursor_y)
+            pos += length
+            if x + length >= cols:
+                self.cursor_x = cols - 1
+                self._wrap_pending = True
+            else:
+                self.cursor_x = x + length
+
+    def _draw_char(self, ch: str):
+        width = char_width(ch)
+        y = self.cursor_y
+        if width == 0:
+            # 组合字符附加到前一个单元格
+            x = self.cursor_x if self._wrap_pending else self.cursor_x - 1
+            if x >= 0:
+                if self._chars[y][x] == "" and x > 0:
+                    x -= 1
+                self._chars[y][x] += ch
+                self.dirty.add(y)
+            return
+
+        if self._wrap_pending:
+            if self.autowrap:
+                self._wrap()
+            else:
+                self.cursor_x = self.cols - width
+            self._wrap_pending = False
+        if width == 2 and self.cursor_x == self.cols - 1:
+            if self.autowrap:
+                self._chars[self.cursor_y][self.cursor_x] = " "
+                self._wrap()
+            else:
+                self.cursor_x -= 1
+        if width > self.cols:
+            return
+
+        y, x = self.cursor_y, self.cursor_x
+        chars = self._chars[y]
+        attrs = self._attrs[y]
+        chars[x] = ch
+        attrs[x] = self._attr
+        if width == 2:
+            # 宽字符的右半边用空字符串占位
+            chars[x + 1] = ""
+            attrs[x + 1] = self._attr
+        self.dirty.add(y)
+        if x + width >= self.cols:
+            self.cursor_x = self.cols - 1
+            self._wrap_pending = True
+        else:
+            self.cursor_x = x + width
+
+    def _wrap(self):
+        self._wrap_pending = False
+        self.cursor_x = 0
+        self._index()
+
+    # ---- 控制字符与转义序列 ----
+
+    def _control(self, ch: str):
+        if ch == "\r":
+            self.cursor_x = 0
+            self._wrap_pending = False
+        elif ch in "\n\x0b\x0c":
+            self._index()
+        elif ch == "\x08":
+            if self._wrap_pending:
+                self._wrap_pending = False
+            elif self.cursor_x > 0:
+                self.cursor_x -= 1
+        elif ch == "\t":
+            self.cursor_x = min((self.cursor_x // 8 + 1) * 8, self.cols - 1)
+            self._wrap_pending = False
+        # 其余控制字符 (BEL、SO/SI 等) 不影响屏幕内容
+
+    def _esc(self, ch: str):
+        if ch == "7":
+            self._save_cursor()
+        elif ch == "8":
+            self._restore_cursor()
+        elif ch == "D":
+            self._index()
+        elif ch == "E":
+            self.cursor_x = 0
+            self._index()
+        elif ch == "M":
+            self._reverse_index()
+        elif ch == "c":
+            self.reset()
+            self.history.clear()
+        # ESC = / ESC > (小键盘模式) 等忽略
+
+    def _save_cursor(self):
+        self._saved_cursor = (self.cursor_x, self.cursor_y, self._attr)
+
+    def _restore_cursor(self):
+        x, y, self._attr = self._saved_cursor
+        self.cursor_x = min(x, self.cols - 1)
+        self.cursor_y = min(y, self.rows - 1)
+        self._wrap_pending = False
+
+    def _index(self):
+        """光标下移一行，位于滚动区域底部时区域内容上滚"""
+        self._wrap_pending = False
+        if self.cursor_y == self._bottom:
+            self._scroll_up(1, keep_history=True)
+        elif self.cursor_y < self.rows - 1:
+            self.cursor_y += 1
+
+    def _reverse_index(self):
+        self._wrap_pending = False
+        if self.cursor_y == self._top:
+            self._scroll_down(1)
+        elif self.cursor_y > 0:
+            self.cursor_y -= 1
+
+    def _scroll_up(self, count: int, top: Optional[int] = None, keep_history: bool = False):
+        """区域 [top, 滚动区域底部] 内容上移 count 行；keep_history 时主屏幕顶部滚出的行进入 history"""
+        top = self._top if top is None else top
+        bottom = self._bottom
+        count = min(count, bottom - top + 1)
+        if keep_history and top == 0 and not self.alternate:
+            for chars in self._chars[:count]:
+                self.history.append("".join(chars).rstrip())
+        del self._chars[top:top + count]
+        del self._attrs[top:top + count]
+        blank = self._attr & _BG_MASK
+        for _ in range(count):
+            self._chars.insert(bottom - count + 1, self._blank_chars())
+            self._attrs.insert(bottom - count + 1, self._blank_attrs(blank))
+        self.dirty.update(range(top, bottom + 1))
+
+    def _scroll_down(self, count: int, top: Optional[int] = None):
+        top = self._top if top is None else top
+        bottom = self._bottom
+        count = min(count, bottom - top + 1)
+        del self._chars[bottom - count + 1:bottom + 1]
+        del self._attrs[bottom - count + 1:bottom + 1]
+        blank = self._attr & _BG_MASK
+        for _ in range(count):
+            self._chars.insert(top, self._blank_chars())
+            self._attrs.insert(top, self._blank_attrs(blank))
+        self.dirty.update(range(top, bottom + 1))
+
+    def _erase(self, row: int, start: int, end: int):
+        """把 row 行 [start, end) 的单元格置为空白 (保留当前背景色)"""
+        if start >= end:
+            return
+        self._chars[row][start:end] = [" "] * (end - start)
+        self._attrs[row][start:end] = array("I", [self._attr & _BG_MASK]) * (end - start)
+        self.dirty.add(row)
+
+    def _csi(self, params: str, final: str):
+        private, args = _parse_params(params)
+
+        def arg(index: int = 0, default: int = 1) -> int:
+            value = args[index] if index < len(args) else 0
+            return value or default
+
+        if private == "?":
+            if final in "hl":
+                self._set_private_modes(args, final == "h")
+            return
+        if private:
+            return
+
+        y, x = self.cursor_y, self.cursor_x
+        if final != "m":
+            self._wrap_pending = False
+
+        if final == "m":
+            self._attr = _apply_sgr(self._attr, args or (0,))
+        elif final in "Hf":
+            self.cursor_y = min(arg(0) - 1, self.rows - 1)
+            self.cursor_x = min(arg(1) - 1, self.cols - 1)
+        elif final == "A":
+            self.cursor_y = max(y - arg(), self._top if y >= self._top else 0)
+        elif final == "B":
+            self.cursor_y = min(y + arg(), self._bottom if y <= self._bottom else self.rows - 1)
+        elif final in "Ca":
+            self.cursor_x = min(x + arg(), self.cols - 1)
+        elif final == "D":
+            self.cursor_x = max(x - arg(), 0)
+        elif final == "E":
+            self.cursor_y = min(y + arg(), self.rows - 1)
+            self.cursor_x = 0
+        elif final == "F":
+            self.cursor_y = max(y - arg(), 0)
+            self.cursor_x = 0
+        elif final in "G`":
+            self.cursor_x = min(arg() - 1, self.cols - 1)
+        elif final == "d":
+            self.cursor_y = min(arg() - 1, self.rows - 1)
+        elif final == "J":
+            mode = arg(0, 0)
+            if mode == 0:
+                self._erase(y, x, self.cols)
+                for row in range(y + 1, self.rows):
+                    self._erase(row, 0, self.cols)
+            elif mode == 1:
+                for row in range(y):
+                    self._erase(row, 0, self.cols)
+                self._erase(y, 0, x + 1)
+            elif mode in (2, 3):
+                for row in range(self.rows):
+                    self._erase(row, 0, self.cols)
+                if mode == 3:
+                    self.history.clear()
+        elif final == "K":
+            mode = arg(0, 0)
+            if mode == 0:
+                self._erase(y, x, self.cols)
+            elif mode == 1:
+                self._erase(y, 0, x + 1)
+            elif mode == 2:
+                self._erase(y, 0, self.cols)
+        elif final == "X":
+            self._erase(y, x, min(x + arg(), self.cols))
+        elif final == "@":
+            count = min(arg(), self.cols - x)
+            chars, attrs = self._chars[y], self._attrs[y]
+            chars[x:x] = [" "] * count
+            attrs[x:x] = array("I", [self._attr & _BG_MASK]) * count
+            del chars[self.cols:]
+            del attrs[self.cols:]
+            # 被挤出右边界的宽字符只剩左半边
+            if char_width(chars[-1][:1] or " ") == 2:
+                chars[-1] = " "
+            self.dirty.add(y)
+        elif final == "P":
+            count = min(arg(), self.cols - x)
+            chars, attrs = self._chars[y], self._attrs[y]
+            del chars[x:x + count]
+            del attrs[x:x + count]
+            chars.extend([" "] * count)
+            attrs.extend(array("I", [self._attr & _BG_MASK]) * count)
+            # 删除到宽字符中间时留下的右半边占位
+            if chars[x] == "":
+                chars[x] = " "
+            self.dirty.add(y)
+        elif final == "L":
+            if self._top <= y <= self._bottom:
+                self._scroll_down(arg(), top=y)
+                self.cursor_x = 0
+        elif final == "M":
+            if self._top <= y <= self._bottom:
+                self._scroll_up(arg(), top=y)
+                self.cursor_x = 0
+        elif final == "S":
+            self._scroll_up(arg())
+        elif final == "T":
+            self._scroll_down(arg())
+        elif final == "r":
+            top = arg(0) - 1
+            bottom = min(arg(1, self.rows), self.rows) - 1
+            if top < bottom:
+                self._top, self._bottom = top, bottom
+                self.cursor_x = self.cursor_y = 0
+        elif final == "s":
+            self._save_cursor()
+        elif final == "u":
+            self._restore_cursor()
+        # DSR (n)、DA (c)、窗口操作 (t) 等查询类序列不影响屏幕，忽略
+
+    def _set_private_modes(self, modes: List[int], enabled: bool):
+        for mode in modes:
+            if mode == 25:
+                self.cursor_visible = enabled
+            elif mode == 7:
+                self.autowrap = enabled
+            elif mode in (47, 1047, 1049):
+                if mode == 1049 and enabled:
+                    self._save_cursor()
+                self._switch_screen(enabled)
+                if mode == 1049 and not enabled:
+                    self._restore_cursor()
+
+    def _switch_screen(self, alternate: bool):
+        if alternate == self.alternate:
+            return
+        if alternate:
+            self._saved_screen = (self._chars, self._attrs)
+            self._chars = [self._blank_chars() for _ in range(self.rows)]
+            self._attrs = [self._blank_attrs() for _ in range(self.rows)]
+        else:
+            self._chars, self._attrs = self._saved_screen
+            self._saved_screen = None
+        self.alternate = alternate
+        self.dirty = set(range(self.rows))
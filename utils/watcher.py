@@ -0,0 +1,381 @@
+"""
+目录监听 - 在 watch_dir 之上按时间窗口批量投递事件，合并同一路径的重复修改事件，
+用有界环形缓冲区承接突发事件并在溢出时显式通知
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from ucloud_sandbox import AsyncSandbox, FilesystemEventType, Sandbox
+
+
+DEFAULT_WINDOW = 0.1
+DEFAULT_CAPACITY = 10000
+DEFAULT_POLL_INTERVAL = 0.05
+
+# 可以合并进同一路径上未投递的 CREATE / WRITE 事件的类型
+MERGEABLE_TYPES = (FilesystemEventType.WRITE, FilesystemEventType.CHMOD)
+
+
+class WatchEvent:
+    """合并后的文件系统事件"""
+
+    def __init__(self, name: str, type: FilesystemEventType, received_at: float):
+        self.name = name
+        self.type = type
+        # 合并进该事件的原始事件数
+        self.count = 1
+        # 本地接收时间 (time.perf_counter)
+        self.first_seen = received_at
+        self.last_seen = received_at
+
+    def __repr__(self):
+        return f"WatchEvent(name={self.name!r}, type={self.type}, count={self.count})"
+
+
+class WatchBatch:
+    """一个时间窗口内的事件批次"""
+
+    def __init__(self, events: List[WatchEvent], dropped: int):
+        self.events = events
+        # 自上一批以来因缓冲区满而丢弃的事件数；非 0 时调用方应重新扫描目录
+        self.dropped = dropped
+        self.delivered_at = time.perf_counter()
+
+    @property
+    def overflow(self) -> bool:
+        return self.dropped > 0
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __repr__(self):
+        return f"WatchBatch(events={len(self.events)}, dropped={self.dropped})"
+
+
+class EventBuffer:
+    """
+    有界环形事件缓冲区
+
+    同一路径上尚未投递的 CREATE / WRITE 事件会吸收后续的 WRITE / CHMOD 事件，
+    只增加计数。缓冲区满时丢弃最旧的事件并累计 dropped，由下一批次带出。
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, coalesce: bool = True):
+        if capacity < 1:
+            raise ValueError(f"capacity 必须大于 0: {capacity}")
+        self.capacity = capacity
+        self.coalesce = coalesce
+        self._lock = threading.Lock()
+        self._events: "OrderedDict[int, WatchEvent]" = OrderedDict()
+        # 路径 -> 可继续合并的未投递事件序号
+        self._mergeable: Dict[str, int] = {}
+        self._seq = 0
+        self._dropped = 0
+
+        self.received = 0
+        self.coalesced = 0
+        self.dropped_total = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._events)
+
+    def push(self, name: str, type: FilesystemEventType, received_at: Optional[float] = None):
+        received_at = received_at if received_at is not None else time.perf_counter()
+        with self._lock:
+            self.received += 1
+            if self.coalesce and type in MERGEABLE_TYPES:
+                seq = self._mergeable.get(name)
+                if seq is not None:
+                    event = self._events[seq]
+                    event.count += 1
+                    event.last_seen = received_at
+                    self.coalesced += 1
+                    return
+
+            if len(self._events) >= self.capacity:
+                old_seq, old = self._events.popitem(last=False)
+                if self._mergeable.get(old.name) == old_seq:
+                    del self._mergeable[old.name]
+                self._dropped += 1
+                self.dropped_total += 1
+
+            self._seq += 1
+            self._events[self._seq] = WatchEvent(name, type, received_at)
+            if type in (FilesystemEventType.CREATE, FilesystemEventType.WRITE):
+                self._mergeable[name] = self._seq
+            else:
+                # REMOVE / RENAME 之后的修改不能再合并进更早的事件
+                self._mergeable.pop(name, None)
+
+    def drain(self, max_events: Optional[int] = None) -> WatchBatch:
+        """取出最多 max_events 个事件组成批次"""
+        with self._lock:
+            events = []
+            while self._events and (max_events is None or len(events) < max_events):
+                seq, event = self._events.popitem(last=False)
+                if self._mergeable.get(event.name) == seq:
+                    del self._mergeable[event.name]
+                events.append(event)
+            dropped, self._dropped = self._dropped, 0
+            return WatchBatch(events, dropped)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped_total,
+                "buffered": len(self._events),
+            }
+
+
+class DirWatcher:
+    """
+    同步目录监听
+
+    后台线程从 watch_dir 句柄读取事件写入 EventBuffer；调用方迭代得到 WatchBatch。
+    第一个事件到达后再等待 window 秒 (或攒满 max_batch 个事件) 才投递，
+    窗口内同一路径的多次修改合并为一个事件。
+
+    Args:
+        sbx: 目标沙箱
+        path: 监听的目录
+        window: 批次时间窗口 (秒)
+        capacity: 缓冲区容量，超过时丢弃最旧的事件并在下一批次中报告
+        max_batch: 单个批次的最大事件数
+        recursive: 是否递归监听子目录
+        coalesce: 是否合并同一路径的重复修改事件
+        poll_interval: 句柄只支持轮询 (get_new_events) 时的轮询间隔
+
+    Example:
+        with DirWatcher(sbx, "/home/user/project", window=0.2) as watcher:
+            for batch in watcher:
+                if batch.overflow:
+                    rescan()
+                for event in batch:
+                    print(event.name, event.type, event.count)
+    """
+
+    def __init__(
+        self,
+        sbx: Sandbox,
+        path: str,
+        window: float = DEFAULT_WINDOW,
+        capacity: int = DEFAULT_CAPACITY,
+        max_batch: Optional[int] = None,
+        recursive: bool = False,
+        coalesce: bool = True,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self.poll_interval = poll_interval
+        self.buffer = EventBuffer(capacity, coalesce)
+
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._handle = sbx.files.watch_dir(path, recursive=recursive)
+        self._thread = threading.Thread(target=self._pump, daemon=True, name="dir-watcher")
+        self._thread.start()
+
+    def _push(self, event):
+        self.buffer.push(event.name, event.type)
+        with self._cond:
+            self._cond.notify_all()
+
+    def _pump(self):
+        """后台线程: 把句柄中的事件写入缓冲区"""
+        try:
+            if hasattr(self._handle, "get_new_events"):
+                while not self._stopped.is_set():
+                    for event in self._handle.get_new_events():
+                        self._push(event)
+                    self._stopped.wait(self.poll_interval)
+            else:
+                for event in self._handle:
+                    if self._stopped.is_set():
+                        break
+                    self._push(event)
+        except Exception as e:
+            if not self._stopped.is_set():
+                self._error = e
+        finally:
+            with self._cond:
+                self._stopped.set()
+                self._cond.notify_all()
+
+    def next_batch(self, timeout: Optional[float] = None) -> Optional[WatchBatch]:
+        """
+        等待下一个批次
+
+        Returns:
+            WatchBatch，超时或监听已停止且缓冲区为空时返回 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not len(self.buffer):
+                if self._stopped.is_set():
+                    if self._error is not None:
+                        raise self._error
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            window_end = time.monotonic() + self.window
+            while not self._stopped.is_set():
+                if self.max_batch is not None and len(self.buffer) >= self.max_batch:
+                    break
+                remaining = window_end - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.buffer.drain(self.max_batch)
+
+    def __iter__(self) -> Iterator[WatchBatch]:
+        while True:
+            batch = self.next_batch()
+            if batch is None:
+                return
+            yield batch
+
+    def stop(self):
+        """停止监听，已缓冲的事件仍可通过 next_batch 取出"""
+        self._stopped.set()
+        try:
+            self._handle.stop()
+        except Exception:
+            pass
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class AsyncDirWatcher:
+    """
+    异步目录监听，语义同 DirWatcher，通过 async for 迭代批次
+
+    事件回调运行在事件循环中，不需要后台线程。监听流因错误结束时，缓冲区取空后迭代抛出该错误。
+
+    Example:
+        watcher = await AsyncDirWatcher.start(sbx, "/home/user/project", window=0.2)
+        async for batch in watcher:
+            ...
+        await watcher.stop()
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        capacity: int = DEFAULT_CAPACITY,
+        max_batch: Optional[int] = None,
+        coalesce: bool = True,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self.buffer = EventBuffer(capacity, coalesce)
+        self._available = asyncio.Event()
+        self._stopped = False
+        self._error: Optional[BaseException] = None
+        self._handle = None
+
+    @classmethod
+    async def start(
+        cls,
+        sbx: AsyncSandbox,
+        path: str,
+        recursive: bool = False,
+        on_exit: Optional[Callable] = None,
+        timeout: float = 0,
+        **kwargs,
+    ) -> "AsyncDirWatcher":
+        """
+        开始监听 path，kwargs 为 window / capacity / max_batch / coalesce
+
+        Args:
+            on_exit: 监听结束时的回调，参数为结束监听的错误 (正常结束或 stop 时为 None)
+            timeout: 监听的最长时间 (秒)，默认 0 不限时；SDK 默认的 60 秒会在一分钟后关闭监听流
+        """
+        watcher = cls(**kwargs)
+        watcher._handle = await sbx.files.watch_dir(
+            path,
+            on_event=watcher._on_event,
+            recursive=recursive,
+            on_exit=lambda error: watcher._on_exit(error, on_exit),
+            timeout=timeout,
+        )
+        return watcher
+
+    def _on_event(self, event):
+        self.buffer.push(event.name, event.type)
+        self._available.set()
+
+    async def _on_exit(self, error: Optional[Exception], callback: Optional[Callable]):
+        """监听流结束: 标记停止并唤醒等待中的迭代，再调用调用方的 on_exit"""
+        if error is not None and not self._stopped:
+            self._error = error
+        self._stopped = True
+        self._available.set()
+        if callback is not None:
+            result = callback(error)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def next_batch(self, timeout: Optional[float] = None) -> Optional[WatchBatch]:
+        """等待下一个批次，超时或已停止且缓冲区为空时返回 None"""
+        while not len(self.buffer):
+            if self._stopped:
+                if self._error is not None:
+                    raise self._error
+                return None
+            self._available.clear()
+            try:
+                await asyncio.wait_for(self._available.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        loop = asyncio.get_running_loop()
+        window_end = loop.time() + self.window
+        while not self._stopped:
+            if self.max_batch is not None and len(self.buffer) >= self.max_batch:
+                break
+            remaining = window_end - loop.time()
+            if remaining <= 0:
+                break
+            self._available.clear()
+            try:
+                await asyncio.wait_for(self._available.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self.buffer.drain(self.max_batch)
+
+    def __aiter__(self) -> AsyncIterator[WatchBatch]:
+        return self
+
+    async def __anext__(self) -> WatchBatch:
+        batch = await self.next_batch()
+        if batch is None:
+            raise StopAsyncIteration
+        return batch
+
+    async def stop(self):
+        """停止监听并唤醒等待中的迭代"""
+        self._stopped = True
+        self._available.set()
+        if self._handle is not None:
+            await self._handle.stop()